@@ -0,0 +1,330 @@
+# cli.py
+"""
+Консольный режим Tab2SQL: читает CSV или Excel (из файла или stdin) и потоково пишет SQL
+в stdout или файл. Не импортирует tkinter, поэтому подходит для контейнеров и cron.
+
+С опциями --timings и --profile замеряет этапы (загрузка, определение типов, генерация,
+форматирование значений, шаблон) и профилирует выбранные этапы cProfile или pyinstrument;
+с --memory добавляет в замеры пик и остаток памяти этапов и размер колонок DataFrame.
+С --pipeline генерирует SQL конвейером и выводит загрузку этапов (чтение, форматирование, запись).
+С --max-failure-rate перед генерацией проверяет колонки на выборке значений и не генерирует SQL,
+если в какой-то колонке доля ошибок больше допустимой.
+
+С опцией --watch отслеживает папку и перегенерирует SQL для новых и измененных файлов
+(`tab2sql --watch exports -o sql`); работает до Ctrl+C.
+
+Коды возврата:
+    0 — SQL сгенерирован без ошибок форматирования (или их не больше --max-errors)
+    1 — есть ошибки форматирования значений (такие значения заменены на NULL)
+        или проверка выборки не пройдена (--max-failure-rate, SQL не генерируется)
+    2 — неверные аргументы или ошибка чтения файла
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+from utils.errors import (
+    LoadDataError,
+    DataProcessingError,
+    SQLFormatterError,
+    SQLOutputError,
+    ColumnOverrideError,
+    DiagnosticsError,
+    ArrowStorageError,
+)
+
+EXIT_OK = 0
+EXIT_FORMATTING_ERRORS = 1
+EXIT_USAGE_ERROR = 2
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="tab2sql",
+        description="Преобразование CSV и Excel в SQL-запросы INSERT",
+        epilog="Пример: tab2sql data.csv -d ';' --type id=int --name id=user_id -o data.sql.gz"
+    )
+    parser.add_argument("input", nargs="?", help="Путь к CSV/Excel файлу или «-» для чтения из stdin")
+    parser.add_argument("-o", "--output", help="Файл для SQL (.sql, .sql.gz, .sql.zst); по умолчанию stdout")
+    parser.add_argument("-t", "--template", default="Тип 1", help="SQL шаблон (по умолчанию «Тип 1»)")
+    parser.add_argument("--table", help="Имя таблицы (по умолчанию — имя файла или листа)")
+    parser.add_argument("-d", "--delimiter", default=";", help="Разделитель CSV (по умолчанию «;»)")
+    parser.add_argument("--no-header", action="store_true", help="В CSV нет строки заголовка")
+    parser.add_argument("-s", "--sheet", help="Лист Excel (имя или номер с 0; по умолчанию первый)")
+    parser.add_argument("--stdin-format", choices=["csv", "xlsx", "xls"], default="csv",
+                        help="Формат данных из stdin (по умолчанию csv)")
+    parser.add_argument("--type", action="append", default=[], metavar="COLUMN=TYPE",
+                        help="Тип колонки (ключ или название, см. --list-types); можно указывать несколько раз")
+    parser.add_argument("--name", action="append", default=[], metavar="COLUMN=NEW_NAME",
+                        help="Новое имя колонки; можно указывать несколько раз")
+    parser.add_argument("--exclude", action="append", default=[], metavar="COLUMN",
+                        help="Исключить колонку; можно указывать несколько раз")
+    parser.add_argument("--storage", choices=["pandas", "arrow"], default="pandas",
+                        help="Хранение данных при генерации: pandas или arrow (компактнее, нужен pyarrow)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Читать строки, форматировать значения и писать SQL одновременно в отдельных потоках")
+    parser.add_argument("--format-workers", type=int, default=1,
+                        help="Количество потоков форматирования для --pipeline (по умолчанию 1)")
+    parser.add_argument("--no-cache", action="store_true", help="Не использовать кэш разобранных листов Excel")
+    parser.add_argument("--clear-cache", action="store_true", help="Очистить кэш разобранных листов Excel")
+    parser.add_argument("--level", type=int, help="Уровень сжатия для .gz/.zst")
+    parser.add_argument("--max-errors", type=int, default=0,
+                        help="Допустимое количество ошибок форматирования для кода возврата 0")
+    parser.add_argument("--max-failure-rate", type=float, metavar="RATE",
+                        help="Перед генерацией проверить колонки на выборке значений и не генерировать SQL, "
+                             "если доля ошибок в колонке больше RATE (например, 0.2)")
+    parser.add_argument("--show-errors", type=int, default=10,
+                        help="Сколько примеров ошибок вывести в stderr (по умолчанию 10)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Отслеживать папку input и писать SQL в папку --output")
+    parser.add_argument("--pattern", action="append", default=[],
+                        help="Шаблон имен файлов для --watch (по умолчанию *.csv, *.xlsx, *.xls)")
+    parser.add_argument("--extension", default=".sql",
+                        help="Расширение SQL файлов для --watch (.sql, .sql.gz, .sql.zst)")
+    parser.add_argument("--interval", type=float, default=2.0, help="Период опроса папки, секунды")
+    parser.add_argument("--workers", type=int, default=2, help="Количество одновременных конвертаций")
+    parser.add_argument("--timings", metavar="FILE",
+                        help="Записать замеры этапов в JSON файл («-» — в stderr)")
+    parser.add_argument("--profile", action="append", default=[], metavar="STAGE",
+                        help="Профилировать этап: load, inference, generate или * (все этапы); можно повторять")
+    parser.add_argument("--memory", action="store_true",
+                        help="Замерять память этапов (tracemalloc, замедляет генерацию); вывод как у --timings")
+    parser.add_argument("--profiler", choices=["cprofile", "pyinstrument"], default="cprofile",
+                        help="Профилировщик для --profile (по умолчанию cprofile)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Не выводить статистику в stderr")
+    parser.add_argument("--list-templates", action="store_true", help="Показать доступные SQL шаблоны")
+    parser.add_argument("--list-types", action="store_true", help="Показать доступные типы колонок")
+    return parser
+
+
+def parse_assignments(values: list[str], option: str) -> dict[str, str]:
+    """
+    Разбирает значения вида COLUMN=VALUE.
+    :param values: Значения опции
+    :param option: Имя опции (для сообщения об ошибке)
+    :return: Словарь {колонка: значение}
+    :raises ColumnOverrideError: Если значение не в формате COLUMN=VALUE
+    """
+    assignments = {}
+    for value in values:
+        column, separator, new_value = value.partition("=")
+        if not separator or not column or not new_value:
+            raise ColumnOverrideError(f"{option}: ожидается COLUMN=VALUE, получено «{value}»")
+        assignments[column] = new_value
+    return assignments
+
+
+def read_stdin(stdin_format: str) -> str:
+    """
+    Сохраняет данные из stdin во временный файл, чтобы прочитать их загрузчиками приложения.
+    :param stdin_format: Формат данных
+    :return: Путь к временному файлу
+    """
+    with tempfile.NamedTemporaryFile(prefix="tab2sql_stdin_", suffix=f".{stdin_format}", delete=False) as file:
+        shutil.copyfileobj(sys.stdin.buffer, file)
+        return file.name
+
+
+def print_errors(errors, show_errors: int) -> None:
+    sys.stderr.write(f"Ошибок форматирования: {errors.total}\n")
+    for line in errors.iter_summary():
+        sys.stderr.write(f"  {line}\n")
+    for message in errors.get_messages(0, show_errors):
+        sys.stderr.write(f"  {message}\n")
+
+
+def run(args: argparse.Namespace) -> int:
+    """
+    Загружает данные, применяет настройки колонок и записывает SQL.
+    :param args: Аргументы командной строки
+    :return: Код возврата
+    """
+    from services.data_processing import DataProcessing
+    from services.load_data import DataLoaderFactory
+    from services.output import SQLFileWriter
+    from services.pipeline import SQLPipeline
+    from services.sheet_cache import SheetCache
+    from utils import SQLFormatterFactory
+    from utils.logger import ErrorCollector
+    from utils.diagnostics import Diagnostics
+    from utils.sql_formatter import RenderStats
+
+    diagnostics = Diagnostics(
+        name="tab2sql",
+        enabled=bool(args.timings or args.profile or args.memory),
+        profile_stages=args.profile,
+        profiler=args.profiler,
+        trace_memory=args.memory
+    )
+    factory = SQLFormatterFactory()
+    factory.get_renderer(args.template)
+    types = parse_assignments(args.type, "--type")
+    names = parse_assignments(args.name, "--name")
+
+    from_stdin = args.input == "-"
+    file_path = read_stdin(args.stdin_format) if from_stdin else args.input
+    try:
+        load_options = {}
+        if os.path.splitext(file_path)[1].lower() == ".csv":
+            load_options = {"delimiter": args.delimiter, "header": not args.no_header}
+        elif args.sheet is not None:
+            load_options = {"sheet_name": int(args.sheet) if args.sheet.isdigit() else args.sheet}
+        with diagnostics.span("load", size_bytes=os.path.getsize(file_path)) as span:
+            cache = None if args.no_cache or from_stdin else SheetCache()
+            df, table_name = DataLoaderFactory().load_data(file_path=file_path, cache=cache, **load_options)
+            span.rows = len(df)
+        diagnostics.record_memory_usage("load", df)
+    finally:
+        if from_stdin:
+            os.remove(file_path)
+
+    table_name = args.table or ("data" if from_stdin else str(table_name))
+    with diagnostics.span("inference", rows=len(df)):
+        dp = DataProcessing(df, table_name.lower(), storage=args.storage)
+        del df
+    dp.apply_overrides(types, names, args.exclude)
+    if args.max_failure_rate is not None:
+        report = dp.validate(threshold=args.max_failure_rate)
+        if not report.passed:
+            sys.stderr.write("Проверка выборки не пройдена, SQL не сгенерирован:\n")
+            sys.stderr.write("".join(f"  {line}\n" for line in report.iter_summary()))
+            return EXIT_FORMATTING_ERRORS
+
+    errors = ErrorCollector()
+    stats = RenderStats()
+    pipeline = None
+    if args.pipeline:
+        pipeline = SQLPipeline(dp, factory.get_renderer(args.template), workers=args.format_workers)
+
+    def write_sql(stream) -> None:
+        if pipeline is not None:
+            pipeline.write(stream, errors, stats)
+        else:
+            factory.write_sql(stream, dp.table.name, dp.valid_columns, dp.iter_values(errors), args.template, stats)
+
+    with diagnostics.span("generate") as span:
+        if args.output:
+            with SQLFileWriter(args.output, level=args.level) as writer:
+                write_sql(writer)
+            span.size_bytes = writer.raw_bytes
+        else:
+            write_sql(sys.stdout)
+            sys.stdout.write("\n")
+            sys.stdout.flush()
+        span.rows = stats.rows
+        diagnostics.add("format", stats.format_seconds, rows=stats.rows)
+        diagnostics.add("render", stats.render_seconds, rows=stats.rows, size_bytes=span.size_bytes)
+        if pipeline is not None:
+            pipeline.add_spans(diagnostics)
+    if diagnostics.enabled:
+        write_diagnostics(diagnostics, args.timings or ("-" if args.memory else None))
+
+    if not args.quiet:
+        sys.stderr.write(
+            f"Строк: {stats.rows} · значения: {stats.format_seconds:.2f} с · шаблон: {stats.render_seconds:.2f} с\n"
+        )
+        if pipeline is not None:
+            sys.stderr.write("".join(f"{line}\n" for line in pipeline.iter_report()))
+    if errors.total:
+        print_errors(errors, args.show_errors)
+    return EXIT_FORMATTING_ERRORS if errors.total > args.max_errors else EXIT_OK
+
+
+def write_diagnostics(diagnostics, timings: str | None) -> None:
+    """
+    Записывает замеры этапов в JSON файл или stderr. Без --timings в stderr выводятся только профили.
+    :param diagnostics: Замеры этапов
+    :param timings: Путь к JSON файлу, «-» или None
+    """
+    if timings == "-":
+        diagnostics.dump(sys.stderr)
+        sys.stderr.write("\n")
+    elif timings:
+        with open(timings, "w", encoding="utf-8") as file:
+            diagnostics.dump(file)
+    else:
+        for name, report in diagnostics.profiles.items():
+            sys.stderr.write(f"Профиль этапа «{name}»:\n{report}\n")
+
+
+def watch(args: argparse.Namespace) -> int:
+    """
+    Запускает отслеживание папки до прерывания пользователем.
+    :param args: Аргументы командной строки
+    :return: Код возврата
+    """
+    import time
+    from services.watcher import FolderWatcher
+    from utils import SQLFormatterFactory
+
+    SQLFormatterFactory().get_renderer(args.template)
+    if not os.path.isdir(args.input):
+        raise NotADirectoryError(f"Папка «{args.input}» не найдена")
+
+    def log(message: str) -> None:
+        if not args.quiet:
+            sys.stderr.write(f"{time.strftime('%H:%M:%S')} {message}\n")
+            sys.stderr.flush()
+
+    watcher = FolderWatcher(
+        directory=args.input,
+        output_directory=args.output,
+        sql_formatter=args.template,
+        patterns=tuple(pattern.lower() for pattern in args.pattern) or FolderWatcher.PATTERNS,
+        load_options={"delimiter": args.delimiter, "header": not args.no_header},
+        extension=args.extension,
+        compression_level=args.level,
+        workers=max(1, args.workers),
+        interval=args.interval,
+        log=log
+    )
+    watcher.run()
+    return EXIT_OK
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+        sys.stderr.reconfigure(encoding="utf-8")
+
+    if args.clear_cache:
+        from services.sheet_cache import SheetCache
+        from utils.utils import format_bytes
+        files, size = SheetCache().clear()
+        sys.stderr.write(f"Кэш листов очищен: файлов {files}, {format_bytes(size)}\n")
+        if not args.input:
+            return EXIT_OK
+    if args.list_templates or args.list_types:
+        from utils import SQLFormatterFactory, ValueFormatterFactory
+        if args.list_templates:
+            sys.stdout.write("\n".join(SQLFormatterFactory().types) + "\n")
+        if args.list_types:
+            sys.stdout.write("\n".join(f"{key}\t{name}" for key, name in ValueFormatterFactory().types.items()) + "\n")
+        return EXIT_OK
+    if not args.input:
+        parser.error("укажите входной файл или «-» для чтения из stdin")
+    if args.watch and not args.output:
+        parser.error("для --watch укажите папку для SQL в --output")
+    if args.max_failure_rate is not None and not 0 <= args.max_failure_rate <= 1:
+        parser.error("--max-failure-rate: ожидается доля от 0 до 1")
+
+    try:
+        return watch(args) if args.watch else run(args)
+    except BrokenPipeError:
+        # Вывод закрыт получателем (например, `| head`): подавляем ошибку при закрытии stdout
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return EXIT_OK
+    except (
+        LoadDataError, DataProcessingError, SQLFormatterError, SQLOutputError, ColumnOverrideError,
+        DiagnosticsError, ArrowStorageError, OSError
+    ) as e:
+        sys.stderr.write(f"tab2sql: {e}\n")
+        return EXIT_USAGE_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,41 @@
+import fnmatch
+import json
+import os
+import threading
+import time
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, Text, Canvas
+from tkinter import ttk, filedialog, messagebox, Text
 from tkinter.ttk import Button, Frame, Entry, Label, Checkbutton, Combobox
 
-import pandas as pd
-
+from gui import tasks
+from gui.sql_viewer import SQLViewer
 from models.app import AppModel
-from services import DataLoaderFactory, DataProcessing
+from services import Job, JobRunner, SQLDocument, SQLFileWriter, SQLShardWriter
+from services.profiles import ColumnProfile, ProfileStore
 from utils import messages
-from utils.errors import CSVParseError, CSVIsEmptyError
-from utils.logger import VALUE_FORMATTER_ERRORS
-from utils.sql_formatter import SQLFormatterFactory
-from utils.utils import resource_path
+from utils.diagnostics import Diagnostics
+from utils.errors import (
+    CSVParseError,
+    CSVIsEmptyError,
+    DataProcessingError,
+    SQLFormatterError,
+    SQLOutputError,
+    ShardingError,
+    JobRunnerBusyError,
+    ValueFormatterError,
+)
+from utils.logger import ErrorCollector
+from utils.sql_formatter import SQLFormatterFactory, RenderStats
+from utils.utils import resource_path, format_bytes, preload_modules
 from utils.value_formatter import ValueFormatterFactory
 from utils.widget_builder import WidgetBuilder
 
 
 class MainWindow(tk.Tk):
-    def __init__(self):
+    # Модули, которые загружаются в фоне после показа окна, чтобы первая загрузка файла не ждала импорта
+    PRELOAD_MODULES = ("pandas", "openpyxl", "services.data_processing", "services.load_data", "services.workbook")
+
+    def __init__(self, preload: bool = True):
         super().__init__()
         self.title("Tab2SQL")
         self.iconbitmap(resource_path("favicon.ico"))
@@ -24,8 +43,11 @@ class MainWindow(tk.Tk):
         self.minsize(1200, 500)
         self.builder = WidgetBuilder()
         self.model = AppModel()
+        self.model.job_runner = JobRunner(self)
 
         self._create_widgets()
+        if preload:
+            self.after_idle(self._start_preload)
 
     def _create_widgets(self) -> None:
         main_frame = self._get_main_frame()
@@ -35,6 +57,84 @@ class MainWindow(tk.Tk):
     def _get_main_frame(self) -> Frame:
         return self.builder.frame(self, pack_options={'fill': 'both', 'expand': True})
 
+    def _start_preload(self) -> None:
+        threading.Thread(target=preload_modules, args=(self.PRELOAD_MODULES,), name="preload", daemon=True).start()
+
+
+def submit_job(model: AppModel, job: Job, on_success, on_error=None, on_cancel=None) -> bool:
+    """
+    Запускает фоновую задачу; если уже выполняется другая, показывает предупреждение.
+    Если отмечено «Профилировать следующую операцию», этапы задачи профилируются cProfile,
+    а если отмечено «Замерять память» — для этапов замеряется память.
+    :return: True, если задача запущена
+    """
+    if model.profile_next_var.get():
+        job.diagnostics.profile_stages = {"*"}
+    job.diagnostics.trace_memory = model.trace_memory_var.get()
+    try:
+        model.job_runner.submit(job, on_success=on_success, on_error=on_error, on_cancel=on_cancel)
+    except JobRunnerBusyError:
+        messagebox.showwarning("Предупреждение", messages.JOB_IN_PROGRESS)
+        return False
+    model.profile_next_var.set(False)
+    return True
+
+
+def save_column_profile(model: AppModel) -> None:
+    """
+    Сохраняет настройки колонок текущего файла как профиль, чтобы при следующем открытии
+    файла с тем же шаблоном имени и заголовком они применились автоматически.
+    """
+    dp = model.data_processing
+    if dp is None or not model.file_path:
+        return
+    dp.pin_date_formats()
+    # Имя таблицы сохраняется, только если пользователь его изменил: иначе следующий файл или лист
+    # с тем же заголовком получил бы имя текущего
+    table_name = dp.table.name if dp.table.name != dp.source_table_name else None
+    profile = ColumnProfile.from_columns(model.file_path, dp.table.columns, model.get_load_options(), table_name)
+    try:
+        ProfileStore().save(profile)
+    except OSError as e:
+        messagebox.showwarning("Профиль колонок", messages.PROFILE_SAVE_ERROR.format(error=e))
+        return
+    model.column_profile = profile
+
+
+def get_compression_level(model: AppModel, compression: str | None) -> int | None:
+    """
+    Возвращает уровень сжатия из настроек, ограниченный диапазоном алгоритма сжатия файла
+    (уровень мог быть выбран для другого алгоритма, например 19 для zstd при сохранении в .gz).
+    :param model: Модель приложения
+    :param compression: Алгоритм сжатия файла или None
+    :return: Уровень сжатия или None для файла без сжатия
+    """
+    if compression is None:
+        return None
+    min_level, max_level, _ = SQLFileWriter.LEVELS[compression]
+    return min(max(model.compression_level_var.get(), min_level), max_level)
+
+
+def confirm_sample_validation(model: AppModel, parent=None) -> bool:
+    """
+    Проверяет колонки на выборке значений перед генерацией. Если в каких-то колонках доля ошибок
+    больше допустимой, спрашивает, продолжать ли генерацию.
+    :return: True, если генерацию можно запускать
+    """
+    try:
+        report = model.data_processing.validate()
+    except (DataProcessingError, ValueFormatterError):
+        messagebox.showerror("Ошибка генерации", messages.SQL_GENERATION_ERROR, parent=parent)
+        return False
+    if report.passed:
+        return True
+    return messagebox.askyesno(
+        "Проверка колонок",
+        messages.SAMPLE_VALIDATION_FAILED.format(threshold=report.threshold, columns="\n".join(report.iter_summary())),
+        icon="warning",
+        parent=parent
+    )
+
 
 class SettingsFrame:
     def __init__(self, parent, builder: WidgetBuilder, model: AppModel, code_frame):
@@ -45,7 +145,9 @@ class SettingsFrame:
 
         self.file_parse_options_frame = None
         self.table_name_frame = None
+        self.columns_tools_frame = None
         self.columns_config_frame = None
+        self.save_sql_frame = None
 
         self._create_widgets()
 
@@ -58,7 +160,20 @@ class SettingsFrame:
         self.table_name_frame = TableNameFrame(
             settings_frame, self.builder, self.model, code_frame=self.code_frame
         )
-        GenerateSQLFrame(settings_frame, self.builder, self.model, code_frame=self.code_frame)
+        GenerateSQLFrame(
+            settings_frame,
+            self.builder,
+            self.model,
+            code_frame=self.code_frame,
+            save_callback=self._on_save_requested,
+            generated_callback=self._on_sql_generated
+        )
+        self.save_sql_frame = SaveSQLFrame(
+            settings_frame, self.builder, self.model, code_frame=self.code_frame, generated_callback=self._on_sql_generated
+        )
+        self.columns_tools_frame = ColumnsToolsFrame(
+            settings_frame, self.builder, self.model, update_callback=self._on_columns_changed
+        )
         HeadersFrame(settings_frame, self.builder, self.model)
         self.columns_config_frame = ColumnsConfigFrame(settings_frame, self.builder, self.model)
 
@@ -68,12 +183,25 @@ class SettingsFrame:
     def _on_file_selected(self) -> None:
         self.file_parse_options_frame.update()
         self.table_name_frame.update()
+        self.columns_tools_frame.update()
         self.columns_config_frame.update()
 
     def _on_sheet_changed(self) -> None:
         self.table_name_frame.update()
+        self.columns_tools_frame.update()
         self.columns_config_frame.update()
 
+    def _on_columns_changed(self) -> None:
+        self.columns_config_frame.refresh()
+
+    def _on_save_requested(self) -> None:
+        # Колонки уже проверены на выборке перед оценкой размера скрипта
+        self.save_sql_frame.save_sql(validated=True)
+
+    def _on_sql_generated(self) -> None:
+        save_column_profile(self.model)
+        self.columns_tools_frame.update()
+
 
 class FileSettingsFrame:
     def __init__(self, parent, builder: WidgetBuilder, model: AppModel, update_callback):
@@ -117,23 +245,49 @@ class FileSettingsFrame:
             filetypes=[("Excel and CSV files", "*.xlsx *.xls *.csv")]
         )
         if file_path:
-            self.model.file_path = file_path
-            self.model.data_processing = None
-            self._set_file_name_entry()
-            self.model.get_extension()
-            try:
-                df, table_name = self._load_data()
-                if df is None:
-                    return
-                if df.empty:
-                    raise CSVIsEmptyError
-                self.model.data_processing = DataProcessing(df, table_name.lower())
-            except CSVParseError:
-                messagebox.showerror("Ошибка парсинга CSV", messages.CSV_PARSE_ERROR)
-            except CSVIsEmptyError:
-                messagebox.showerror("Данные отсутствуют", messages.DATA_NOT_EXISTS)
-            finally:
-                self.update_callback()
+            load_options = {}
+            if os.path.splitext(file_path)[1].lower() == ".csv":
+                load_options = {'delimiter': self.model.delimiter_var.get(), 'header': self.model.header_var.get()}
+            submit_job(
+                self.model,
+                Job("Загрузка файла", tasks.load_table, file_path, True, **load_options),
+                on_success=lambda result: self._on_file_loaded(file_path, *result),
+                on_error=lambda error: self._on_file_load_error(file_path, error)
+            )
+
+    def _on_file_loaded(self, file_path, data_processing, sheet_names, load_options, profile) -> None:
+        self._set_file_path(file_path)
+        self.model.sheet_names = sheet_names
+        if sheet_names:
+            self.model.selected_sheet_var.set(load_options.get("sheet_name", sheet_names[0]))
+        if "delimiter" in load_options:
+            # Параметры могли быть взяты из профиля колонок
+            self.model.delimiter_var.set(load_options["delimiter"])
+            self.model.header_var.set(load_options["header"])
+        if data_processing.table.data.empty:
+            messagebox.showerror("Данные отсутствуют", messages.DATA_NOT_EXISTS)
+        else:
+            self.model.data_processing = data_processing
+            self.model.column_profile = profile
+        self.update_callback()
+
+    def _on_file_load_error(self, file_path, error) -> None:
+        self._set_file_path(file_path)
+        self.model.sheet_names = []
+        if isinstance(error, CSVParseError):
+            messagebox.showerror("Ошибка парсинга CSV", messages.CSV_PARSE_ERROR)
+        elif isinstance(error, CSVIsEmptyError):
+            messagebox.showerror("Данные отсутствуют", messages.DATA_NOT_EXISTS)
+        else:
+            messagebox.showerror("Ошибка загрузки", str(error))
+        self.update_callback()
+
+    def _set_file_path(self, file_path) -> None:
+        self.model.file_path = file_path
+        self.model.data_processing = None
+        self.model.column_profile = None
+        self.model.get_extension()
+        self._set_file_name_entry()
 
     def _set_file_name_entry(self) -> None:
         self.file_name_entry.config(state="normal")
@@ -142,27 +296,6 @@ class FileSettingsFrame:
         self.file_name_entry.xview_moveto(1.0)
         self.file_name_entry.config(state="readonly")
 
-    def _load_data(self) -> tuple[pd.DataFrame, str]:
-        df = None
-        table_name = None
-        if self.model.file_extension == ".csv":
-            try:
-                df, table_name = DataLoaderFactory().load_data(
-                    file_path=self.model.file_path,
-                    delimiter=self.model.delimiter_var.get(),
-                    header=self.model.header_var.get()
-                )
-            except CSVParseError:
-                messagebox.showerror("Ошибка парсинга CSV", messages.CSV_PARSE_ERROR)
-                table_name = self.model.get_csv_table_name()
-        elif self.model.file_extension in (".xlsx", ".xls"):
-            self.model.get_sheet_names()
-            df, table_name = DataLoaderFactory().load_data(
-                file_path=self.model.file_path,
-                sheet_name=self.model.selected_sheet_var.get()
-            )
-        return df, table_name
-
 
 class FileParseOptionsFrame:
     def __init__(self, parent, builder: WidgetBuilder, model: AppModel, update_callback):
@@ -258,23 +391,31 @@ class CSVOptionsFrame:
             pack_options={'side': 'left', 'padx': 5}
         )
 
-    def _on_csv_options_change(self, event):
+    def _on_csv_options_change(self, event=None):
         if self.model.file_path and self.model.file_extension == ".csv":
             delimiter = self.model.delimiter_var.get()
             header = self.model.header_var.get()
-            try:
-                df, table_name = DataLoaderFactory().load_data(
-                    file_path=self.model.file_path,
-                    delimiter=delimiter,
-                    header=header
-                )
-                self.model.data_processing = DataProcessing(df, table_name.lower())
-                messagebox.showinfo("Смена разделителя", messages.DELIMITER_CHANGED.format(delimiter=delimiter))
-            except CSVParseError:
-                messagebox.showerror("Ошибка парсинга CSV", messages.CSV_PARSE_ERROR)
-                self.model.data_processing = None
-            finally:
-                self.update_callback()
+            submit_job(
+                self.model,
+                Job("Загрузка CSV", tasks.load_table, self.model.file_path, delimiter=delimiter, header=header),
+                on_success=lambda result: self._on_csv_reloaded(delimiter, result[0], result[3]),
+                on_error=self._on_csv_reload_error
+            )
+
+    def _on_csv_reloaded(self, delimiter, data_processing, profile):
+        self.model.data_processing = data_processing
+        self.model.column_profile = profile
+        messagebox.showinfo("Смена разделителя", messages.DELIMITER_CHANGED.format(delimiter=delimiter))
+        self.update_callback()
+
+    def _on_csv_reload_error(self, error):
+        if isinstance(error, CSVParseError):
+            messagebox.showerror("Ошибка парсинга CSV", messages.CSV_PARSE_ERROR)
+        else:
+            messagebox.showerror("Ошибка загрузки", str(error))
+        self.model.data_processing = None
+        self.model.column_profile = None
+        self.update_callback()
 
 
 class ExcelOptionsFrame:
@@ -290,6 +431,9 @@ class ExcelOptionsFrame:
         self._create_widgets()
 
     def update_options(self):
+        if not self.model.sheet_names:
+            self.hide()
+            return
         self.sheet_combobox["values"] = self.model.sheet_names
         current = self.model.selected_sheet_var.get()
         if current and current in self.model.sheet_names:
@@ -306,6 +450,8 @@ class ExcelOptionsFrame:
         self.excel_options_frame = self._get_excel_options_frame()
         self._get_sheet_label()
         self.sheet_combobox = self._get_sheet_combobox()
+        self._get_all_sheets_button()
+        self._get_clear_cache_button()
 
     def _get_excel_options_frame(self) -> Frame:
         return self.builder.frame(self.parent, pack_options={'padx': 10, 'pady': 5, 'fill': 'x'})
@@ -322,18 +468,138 @@ class ExcelOptionsFrame:
         sheet_combobox.bind("<<ComboboxSelected>>", lambda event: self._load_excel())
         return sheet_combobox
 
+    def _get_all_sheets_button(self) -> Button:
+        return self.builder.button(
+            self.excel_options_frame,
+            text="Все листы",
+            command=self._convert_all_sheets,
+            pack_options={'side': 'left', 'padx': 5}
+        )
+
+    def _get_clear_cache_button(self) -> Button:
+        return self.builder.button(
+            self.excel_options_frame,
+            text="Очистить кэш",
+            command=self._clear_cache,
+            pack_options={'side': 'right', 'padx': 5}
+        )
+
+    def _clear_cache(self):
+        from services.sheet_cache import SheetCache
+        cache = SheetCache()
+        size = format_bytes(cache.size_bytes)
+        if not messagebox.askyesno("Кэш листов", messages.SHEET_CACHE_CLEAR.format(size=size)):
+            return
+        _, size = cache.clear()
+        messagebox.showinfo("Кэш листов", messages.SHEET_CACHE_CLEARED.format(size=format_bytes(size)))
+
+    def _convert_all_sheets(self):
+        if not (self.model.file_path and self.model.file_extension in (".xlsx", ".xls")):
+            return
+        one_file = messagebox.askyesnocancel("Все листы", messages.ALL_SHEETS_MODE)
+        if one_file is None:
+            return
+        if one_file:
+            destination = filedialog.asksaveasfilename(
+                title="Сохранить SQL",
+                defaultextension=".sql",
+                filetypes=SaveSQLFrame.FILE_TYPES
+            )
+        else:
+            destination = filedialog.askdirectory(title="Каталог для файлов")
+        if not destination:
+            return
+        column_plans, table_names = {}, {}
+        if self.model.data_processing is not None:
+            sheet_name = self.model.selected_sheet_var.get()
+            column_plans[sheet_name] = self.model.data_processing.table.columns
+            table_names[sheet_name] = self.model.data_processing.table.name
+        from services.workbook import WorkbookConverter
+        converter = WorkbookConverter(
+            self.model.file_path,
+            sql_formatter=self.model.sql_template_type_var.get(),
+            column_plans=column_plans,
+            table_names=table_names,
+            compression_level=get_compression_level(self.model, SQLFileWriter.detect_compression(destination))
+        )
+        started = time.perf_counter()
+        submit_job(
+            self.model,
+            Job(
+                "Конвертация всех листов",
+                tasks.convert_all_sheets,
+                converter,
+                destination,
+                "combined" if one_file else "per_sheet"
+            ),
+            on_success=lambda results: self._show_report(results, time.perf_counter() - started),
+            on_error=self._on_convert_error
+        )
+
+    @staticmethod
+    def _on_convert_error(error):
+        if isinstance(error, SQLOutputError):
+            messagebox.showerror("Ошибка сохранения", str(error))
+        else:
+            messagebox.showerror("Ошибка генерации", messages.SQL_GENERATION_ERROR)
+
+    def _show_report(self, results, seconds):
+        report_window = tk.Toplevel(self.parent)
+        report_window.geometry("800x400")
+        report_window.title("Конвертация всех листов")
+        report_text, _ = self.builder.scrolled_text(
+            parent=report_window,
+            wrap="none",
+            pack_options={'padx': 10, 'pady': 5, 'fill': 'both', 'expand': True}
+        )
+        lines = [messages.ALL_SHEETS_REPORT.format(
+            sheets=len(results), rows=sum(result.rows for result in results), seconds=seconds
+        ), ""]
+        for result in results:
+            if result.skipped:
+                lines.append(messages.SHEET_SKIPPED_LINE.format(sheet_name=result.sheet_name))
+                continue
+            lines.append(messages.SHEET_REPORT_LINE.format(
+                sheet_name=result.sheet_name,
+                rows=result.rows,
+                load_seconds=result.load_seconds,
+                format_seconds=result.format_seconds,
+                render_seconds=result.render_seconds,
+                errors=result.errors.total
+            ))
+        errors = [f"[{result.sheet_name}] {error}" for result in results for error in result.errors.get_messages()]
+        if errors:
+            lines.extend(["", *errors])
+        report_text.insert(tk.END, "\n".join(lines))
+        report_text.config(state="disabled")
+
     def _load_excel(self):
         sheet_name = self.sheet_combobox.get()
-        self.model.selected_sheet_var.set(sheet_name)
         if self.model.file_path and self.model.file_extension in (".xlsx", ".xls"):
-            df, table_name = DataLoaderFactory().load_data(
-                file_path=self.model.file_path,
-                sheet_name=sheet_name
+            started = submit_job(
+                self.model,
+                Job("Загрузка листа", tasks.load_table, self.model.file_path, sheet_name=sheet_name),
+                on_success=lambda result: self._on_sheet_loaded(sheet_name, result[0], result[3]),
+                on_error=self._on_sheet_load_error,
+                on_cancel=self._restore_sheet
             )
-            if df.empty:
-                messagebox.showerror("Ошибка", messages.DATA_NOT_EXISTS)
-            self.model.data_processing = DataProcessing(df, table_name.lower())
-            self.update_callback()
+            if not started:
+                self._restore_sheet()
+
+    def _on_sheet_loaded(self, sheet_name, data_processing, profile):
+        self.model.selected_sheet_var.set(sheet_name)
+        if data_processing.table.data.empty:
+            messagebox.showerror("Ошибка", messages.DATA_NOT_EXISTS)
+        self.model.data_processing = data_processing
+        self.model.column_profile = profile
+        self.update_callback()
+
+    def _on_sheet_load_error(self, error):
+        messagebox.showerror("Ошибка загрузки", str(error))
+        self._restore_sheet()
+
+    def _restore_sheet(self):
+        self.sheet_combobox.set(self.model.selected_sheet_var.get())
 
 
 class TableNameFrame:
@@ -416,11 +682,16 @@ class TableNameFrame:
 
 
 class GenerateSQLFrame:
-    def __init__(self, parent, builder: WidgetBuilder, model: AppModel, code_frame):
+    # Скрипты больше этого размера предлагается сохранять сразу в файл, а не во временный файл окна просмотра
+    TEXT_WIDGET_MAX_BYTES = 500 * 1024 * 1024
+
+    def __init__(self, parent, builder: WidgetBuilder, model: AppModel, code_frame, save_callback, generated_callback):
         self.parent = parent
         self.builder = builder
         self.model = model
         self.code_frame = code_frame
+        self.save_callback = save_callback
+        self.generated_callback = generated_callback
 
         self.generate_sql_frame = None
         self.sql_template_combobox = None
@@ -432,6 +703,7 @@ class GenerateSQLFrame:
         self._get_sql_template_label()
         self.sql_template_combobox = self._get_sql_template_combobox()
         self._get_generate_sql_button()
+        self._get_estimate_button()
 
     def _get_generate_sql_frame(self) -> Frame:
         return self.builder.frame(self.parent, pack_options={'padx': 10, 'pady': 5, 'fill': 'x'})
@@ -445,6 +717,7 @@ class GenerateSQLFrame:
             textvariable=self.model.sql_template_type_var,
             values=SQLFormatterFactory().types,
             state="readonly",
+            width=14,
             pack_options={'side': 'left', 'padx': 5}
         )
         sql_template_combobox.bind("<<ComboboxSelected>>", lambda event: self._set_sql_template)
@@ -458,28 +731,471 @@ class GenerateSQLFrame:
             pack_options={'side': 'right', 'padx': 5}
         )
 
+    def _get_estimate_button(self):
+        return self.builder.button(
+            self.generate_sql_frame,
+            text="Оценка",
+            command=self._show_estimate,
+            pack_options={'side': 'right', 'padx': 5}
+        )
+
     def _set_sql_template(self, event):
         self.model.sql_template_type_var.set(self.sql_template_combobox.get())
 
+    def _show_estimate(self):
+        if self.model.data_processing is None:
+            messagebox.showwarning("Предупреждение", messages.TABLE_NOT_EXIST)
+            return
+        estimate = self.model.data_processing.estimate(self.model.sql_template_type_var.get())
+        slowest = sorted(estimate.columns, key=lambda column: column.us_per_value, reverse=True)[:5]
+        columns = "\n".join(
+            messages.SQL_ESTIMATE_COLUMN.format(
+                column_name=column.column_name,
+                column_type=ValueFormatterFactory().types.get(column.column_type, column.column_type),
+                us_per_value=column.us_per_value,
+                bytes_per_value=column.bytes_per_value
+            )
+            for column in slowest
+        )
+        messagebox.showinfo("Оценка генерации", messages.SQL_ESTIMATE.format(
+            rows=estimate.rows,
+            sample_rows=estimate.sample_rows,
+            size=format_bytes(estimate.estimated_bytes),
+            seconds=estimate.estimated_seconds,
+            columns=columns
+        ))
+
     def _generate_sql(self):
         if self.model.data_processing is None:
             messagebox.showwarning("Предупреждение", messages.TABLE_NOT_EXIST)
             return
-        VALUE_FORMATTER_ERRORS.clear()
         dp = self.model.data_processing
+        if not confirm_sample_validation(self.model):
+            return
         try:
-            sql_code = SQLFormatterFactory().get_sql(
-                table_name=dp.table.name,
-                columns=dp.valid_columns,
-                values=dp.valid_values,
-                sql_formatter=self.model.sql_template_type_var.get()
-            )
-        except Exception:
+            estimate = dp.estimate(self.model.sql_template_type_var.get())
+        except (DataProcessingError, ValueFormatterError, SQLFormatterError):
             messagebox.showerror("Ошибка генерации", messages.SQL_GENERATION_ERROR)
             return
-        self.model.sql_script = sql_code
-        self.code_frame.update_code(sql_code)
+        if estimate.estimated_bytes > self.TEXT_WIDGET_MAX_BYTES:
+            save_to_file = messagebox.askyesnocancel("Большой скрипт", messages.SQL_TOO_LARGE_FOR_VIEWER.format(
+                size=format_bytes(estimate.estimated_bytes),
+                seconds=estimate.estimated_seconds
+            ))
+            if save_to_file is None:
+                return
+            if save_to_file:
+                self.save_callback()
+                return
+        job = Job("Генерация SQL", tasks.generate_sql, dp, self.model.sql_template_type_var.get())
+        submit_job(
+            self.model,
+            job,
+            on_success=lambda result: self._on_sql_generated(*result, diagnostics=job.diagnostics),
+            on_error=lambda error: messagebox.showerror("Ошибка генерации", messages.SQL_GENERATION_ERROR)
+        )
+
+    def _on_sql_generated(self, document, stats, errors, diagnostics: Diagnostics | None = None):
+        if self.model.sql_document is not None:
+            self.model.sql_document.close()
+        self.model.sql_document = document
+        self.model.errors = errors
+        self.generated_callback()
+        self.code_frame.update_code(document, diagnostics)
         self.code_frame.code_buttons_frame.update_errors_button()
+        self.code_frame.code_buttons_frame.update_stats(stats)
+
+
+class SaveSQLFrame:
+    FILE_TYPES = [("SQL", "*.sql"), ("SQL (gzip)", "*.sql.gz"), ("SQL (zstd)", "*.sql.zst")]
+
+    def __init__(self, parent, builder: WidgetBuilder, model: AppModel, code_frame, generated_callback):
+        self.parent = parent
+        self.builder = builder
+        self.model = model
+        self.code_frame = code_frame
+        self.generated_callback = generated_callback
+
+        self.save_sql_frame = None
+        self.compression_level_spinbox = None
+
+        self._create_widgets()
+
+    def _create_widgets(self):
+        self.save_sql_frame = self._get_save_sql_frame()
+        self._get_compression_label()
+        self._get_compression_combobox()
+        self._get_compression_level_label()
+        self.compression_level_spinbox = self._get_compression_level_spinbox()
+        self._get_save_sql_button()
+        self._get_save_shards_button()
+
+    def _get_save_sql_frame(self) -> Frame:
+        return self.builder.frame(self.parent, pack_options={'padx': 10, 'pady': 5, 'fill': 'x'})
+
+    def _get_compression_label(self) -> Label:
+        return self.builder.label(self.save_sql_frame, text="Сжатие:", pack_options={'side': 'left'})
+
+    def _get_compression_combobox(self) -> Combobox:
+        combobox = self.builder.combobox(
+            self.save_sql_frame,
+            textvariable=self.model.compression_var,
+            values=SQLFileWriter.available_compressions(),
+            width=6,
+            state="readonly",
+            pack_options={'side': 'left', 'padx': 5}
+        )
+        combobox.bind("<<ComboboxSelected>>", self._on_compression_selected)
+        return combobox
+
+    def _on_compression_selected(self, event=None):
+        # Диапазон уровней зависит от алгоритма: gzip — 1..9, zstd — 1..22
+        min_level, max_level, default_level = SQLFileWriter.LEVELS[self.model.compression_var.get()]
+        self.compression_level_spinbox.configure(from_=min_level, to=max_level)
+        self.model.compression_level_var.set(default_level)
+
+    def _get_compression_level_label(self) -> Label:
+        return self.builder.label(self.save_sql_frame, text="Уровень сжатия:", pack_options={'side': 'left'})
+
+    def _get_compression_level_spinbox(self) -> ttk.Spinbox:
+        return self.builder.spinbox(
+            self.save_sql_frame,
+            from_=SQLFileWriter.LEVELS[self.model.compression_var.get()][0],
+            to=SQLFileWriter.LEVELS[self.model.compression_var.get()][1],
+            width=5,
+            textvariable=self.model.compression_level_var,
+            state="readonly",
+            pack_options={'side': 'left', 'padx': 5}
+        )
+
+    def _get_save_sql_button(self) -> Button:
+        return self.builder.button(
+            self.save_sql_frame,
+            text="Сохранить в файл",
+            command=self.save_sql,
+            pack_options={'side': 'right', 'padx': 5}
+        )
+
+    def _get_save_shards_button(self) -> Button:
+        return self.builder.button(
+            self.save_sql_frame,
+            text="Разбить на файлы",
+            command=self._show_shards_dialog,
+            pack_options={'side': 'right', 'padx': 5}
+        )
+
+    def _show_shards_dialog(self):
+        if self.model.data_processing is None:
+            messagebox.showwarning("Предупреждение", messages.TABLE_NOT_EXIST)
+            return
+        ShardsDialog(self.parent, self.builder, self.model, code_frame=self.code_frame)
+
+    def save_sql(self, validated: bool = False):
+        """
+        Сохраняет SQL сразу в файл.
+        :param validated: Колонки уже проверены на выборке (проверка не повторяется)
+        """
+        if self.model.data_processing is None:
+            messagebox.showwarning("Предупреждение", messages.TABLE_NOT_EXIST)
+            return
+        dp = self.model.data_processing
+        if not validated and not confirm_sample_validation(self.model):
+            return
+        file_path = filedialog.asksaveasfilename(
+            title="Сохранить SQL",
+            initialfile=f"{dp.table.name}.sql",
+            defaultextension=".sql",
+            filetypes=self.FILE_TYPES
+        )
+        if not file_path:
+            return
+        submit_job(
+            self.model,
+            Job(
+                "Сохранение SQL",
+                tasks.save_sql,
+                dp,
+                self.model.sql_template_type_var.get(),
+                file_path,
+                get_compression_level(self.model, SQLFileWriter.detect_compression(file_path))
+            ),
+            on_success=lambda result: self._on_sql_saved(file_path, *result),
+            on_error=self._on_save_error
+        )
+
+    def _on_sql_saved(self, file_path, writer, stats, errors):
+        self.model.errors = errors
+        self.generated_callback()
+        self.code_frame.code_buttons_frame.update_errors_button()
+        self.code_frame.code_buttons_frame.update_stats(stats)
+        messagebox.showinfo("Сохранение SQL", messages.SQL_SAVED.format(
+            file_path=file_path,
+            raw_size=format_bytes(writer.raw_bytes),
+            file_size=format_bytes(writer.compressed_bytes)
+        ))
+
+    @staticmethod
+    def _on_save_error(error):
+        if isinstance(error, SQLOutputError):
+            messagebox.showerror("Ошибка сохранения", str(error))
+        else:
+            messagebox.showerror("Ошибка генерации", messages.SQL_GENERATION_ERROR)
+
+
+class ShardsDialog:
+    def __init__(self, parent, builder: WidgetBuilder, model: AppModel, code_frame):
+        self.parent = parent
+        self.builder = builder
+        self.model = model
+        self.code_frame = code_frame
+
+        self.shards_window = None
+
+        self._create_widgets()
+
+    def _create_widgets(self):
+        self.shards_window = self._get_shards_window()
+        strategy_frame = self._get_row_frame()
+        self.builder.label(strategy_frame, text="Способ разбиения:", width=22, pack_options={'side': 'left'})
+        self.builder.combobox(
+            strategy_frame,
+            textvariable=self.model.shard_strategy_var,
+            values=list(SQLShardWriter.STRATEGIES.values()),
+            state="readonly",
+            pack_options={'side': 'left', 'padx': 5}
+        )
+        count_frame = self._get_row_frame()
+        self.builder.label(count_frame, text="Количество файлов:", width=22, pack_options={'side': 'left'})
+        self.builder.spinbox(
+            count_frame, from_=1, to=256, width=6, textvariable=self.model.shard_count_var,
+            pack_options={'side': 'left', 'padx': 5}
+        )
+        size_frame = self._get_row_frame()
+        self.builder.label(size_frame, text="Размер файла, МБ:", width=22, pack_options={'side': 'left'})
+        self.builder.spinbox(
+            size_frame, from_=1, to=100000, width=6, textvariable=self.model.shard_max_mb_var,
+            pack_options={'side': 'left', 'padx': 5}
+        )
+        keys_frame = self._get_row_frame()
+        self.builder.label(keys_frame, text="Ключевые колонки:", width=22, pack_options={'side': 'left'})
+        self.builder.entry(
+            keys_frame, width=30, textvariable=self.model.shard_keys_var,
+            pack_options={'side': 'left', 'padx': 5}
+        )
+        buttons_frame = self._get_row_frame()
+        self.builder.checkbutton(
+            buttons_frame, text="Сжимать (gzip)", variable=self.model.shard_compress_var,
+            pack_options={'side': 'left'}
+        )
+        self.builder.button(
+            buttons_frame, text="Сохранить", command=self._save_shards,
+            pack_options={'side': 'right', 'padx': 5}
+        )
+
+    def _get_shards_window(self) -> tk.Toplevel:
+        shards_window = tk.Toplevel(self.parent)
+        shards_window.title("Разбиение SQL на файлы")
+        shards_window.resizable(False, False)
+        return shards_window
+
+    def _get_row_frame(self) -> Frame:
+        return self.builder.frame(self.shards_window, pack_options={'padx': 10, 'pady': 5, 'fill': 'x'})
+
+    def _get_strategy_key(self) -> str:
+        inverted = {v: k for k, v in SQLShardWriter.STRATEGIES.items()}
+        return inverted[self.model.shard_strategy_var.get()]
+
+    def _save_shards(self):
+        dp = self.model.data_processing
+        if not confirm_sample_validation(self.model, parent=self.shards_window):
+            return
+        directory = filedialog.askdirectory(parent=self.shards_window, title="Каталог для файлов")
+        if not directory:
+            return
+        key_columns = [key.strip() for key in self.model.shard_keys_var.get().split(",") if key.strip()]
+        compress = self.model.shard_compress_var.get()
+        try:
+            writer = SQLShardWriter(
+                directory=directory,
+                base_name=dp.table.name,
+                renderer=SQLFormatterFactory().get_renderer(self.model.sql_template_type_var.get()),
+                strategy=self._get_strategy_key(),
+                shards=self.model.shard_count_var.get(),
+                max_bytes=self.model.shard_max_mb_var.get() * 1024 * 1024,
+                key_columns=key_columns,
+                extension=".sql.gz" if compress else ".sql",
+                compression_level=get_compression_level(self.model, "gzip") if compress else None
+            )
+        except ShardingError as e:
+            messagebox.showerror("Ошибка сохранения", str(e), parent=self.shards_window)
+            return
+        submit_job(
+            self.model,
+            Job("Разбиение SQL на файлы", tasks.save_shards, dp, writer),
+            on_success=lambda result: self._on_shards_saved(writer, *result),
+            on_error=self._on_shards_error
+        )
+
+    def _on_shards_saved(self, writer, manifest, errors):
+        self.model.errors = errors
+        self.code_frame.code_buttons_frame.update_errors_button()
+        messagebox.showinfo("Разбиение SQL на файлы", messages.SQL_SHARDS_SAVED.format(
+            shards=len(manifest.shards),
+            rows=manifest.rows,
+            raw_size=format_bytes(manifest.raw_bytes),
+            file_size=format_bytes(manifest.file_bytes),
+            manifest=writer.manifest_path
+        ), parent=self._get_dialog_parent())
+
+    def _on_shards_error(self, error):
+        if isinstance(error, (ShardingError, SQLOutputError)):
+            messagebox.showerror("Ошибка сохранения", str(error), parent=self._get_dialog_parent())
+        else:
+            messagebox.showerror("Ошибка генерации", messages.SQL_GENERATION_ERROR, parent=self._get_dialog_parent())
+
+    def _get_dialog_parent(self):
+        # Окно могли закрыть, пока выполнялась задача
+        return self.shards_window if self.shards_window.winfo_exists() else self.parent
+
+
+class ColumnsToolsFrame:
+    def __init__(self, parent, builder: WidgetBuilder, model: AppModel, update_callback):
+        self.parent = parent
+        self.builder = builder
+        self.model = model
+        self.update_callback = update_callback
+        self.valid_types = ValueFormatterFactory().types
+
+        self.filter_frame = None
+        self.bulk_type_frame = None
+        self.pattern_frame = None
+        self.profile_frame = None
+        self.profile_label = None
+        self.forget_profile_button = None
+        self.bulk_type_var = tk.StringVar(value=next(iter(self.valid_types.values())))
+        self.pattern_var = tk.StringVar(value="")
+
+        self._create_widgets()
+
+    def _create_widgets(self):
+        self.filter_frame = self._get_row_frame()
+        self.builder.label(self.filter_frame, text="Фильтр:", width=10, pack_options={'side': 'left'})
+        self._get_filter_entry()
+        self._get_select_button(text="Выбрать все", command=self._select_filtered)
+        self._get_select_button(text="Снять выбор", command=self._clear_selection)
+
+        self.bulk_type_frame = self._get_row_frame()
+        self.builder.label(self.bulk_type_frame, text="Тип:", width=10, pack_options={'side': 'left'})
+        self._get_bulk_type_combobox()
+        self.builder.button(
+            self.bulk_type_frame,
+            text="Задать выбранным",
+            command=self._set_type_for_selected,
+            pack_options={'side': 'left', 'padx': 5}
+        )
+
+        self.pattern_frame = self._get_row_frame()
+        self.builder.label(self.pattern_frame, text="Шаблон:", width=10, pack_options={'side': 'left'})
+        self.builder.entry(self.pattern_frame, textvariable=self.pattern_var, width=20, pack_options={'side': 'left'})
+        self.builder.button(
+            self.pattern_frame,
+            text="Включить",
+            command=lambda: self._set_include_by_pattern(True),
+            pack_options={'side': 'left', 'padx': 5}
+        )
+        self.builder.button(
+            self.pattern_frame,
+            text="Исключить",
+            command=lambda: self._set_include_by_pattern(False),
+            pack_options={'side': 'left'}
+        )
+
+        self.profile_frame = self._get_row_frame()
+        self.profile_label = self.builder.label(self.profile_frame, text="", pack_options={'side': 'left'})
+        self.forget_profile_button = self.builder.button(
+            self.profile_frame,
+            text="Забыть профиль",
+            command=self._forget_profile,
+            pack_options={'side': 'right'}
+        )
+        self.update()
+
+    def update(self):
+        profile = self.model.column_profile
+        if self.model.data_processing is None:
+            self.profile_label.config(text="")
+        elif profile is not None:
+            updated = time.strftime("%d.%m.%Y %H:%M", time.localtime(profile.updated))
+            self.profile_label.config(text=messages.PROFILE_APPLIED.format(updated=updated))
+        else:
+            self.profile_label.config(text=messages.PROFILE_NOT_FOUND)
+        self.forget_profile_button.config(state="normal" if profile is not None else "disabled")
+
+    def _get_row_frame(self) -> Frame:
+        return self.builder.frame(self.parent, pack_options={'padx': 10, 'pady': (5, 0), 'fill': 'x'})
+
+    def _get_filter_entry(self) -> Entry:
+        filter_entry = self.builder.entry(
+            self.filter_frame,
+            textvariable=self.model.column_filter_var,
+            width=20,
+            pack_options={'side': 'left'}
+        )
+        self.model.column_filter_var.trace_add("write", lambda *args: self.update_callback())
+        return filter_entry
+
+    def _get_select_button(self, text, command) -> Button:
+        return self.builder.button(self.filter_frame, text=text, command=command, pack_options={'side': 'left', 'padx': 5})
+
+    def _get_bulk_type_combobox(self) -> Combobox:
+        return self.builder.combobox(
+            self.bulk_type_frame,
+            textvariable=self.bulk_type_var,
+            values=list(self.valid_types.values()),
+            state="readonly",
+            width=17,
+            pack_options={'side': 'left'}
+        )
+
+    def _select_filtered(self):
+        self.model.selected_columns.update(column.column_name for column in self.model.get_filtered_columns())
+        self.update_callback()
+
+    def _clear_selection(self):
+        self.model.selected_columns.clear()
+        self.update_callback()
+
+    def _set_type_for_selected(self):
+        if not self.model.selected_columns:
+            messagebox.showwarning("Предупреждение", messages.NO_COLUMNS_SELECTED)
+            return
+        inverted = {v: k for k, v in self.valid_types.items()}
+        new_type = inverted[self.bulk_type_var.get()]
+        for column in self.model.get_columns():
+            if column.column_name in self.model.selected_columns:
+                column.new_type = new_type
+        self.update_callback()
+
+    def _set_include_by_pattern(self, include: bool):
+        pattern = self.pattern_var.get().strip().lower()
+        if not pattern:
+            messagebox.showwarning("Предупреждение", messages.EMPTY_COLUMN_PATTERN)
+            return
+        for column in self.model.get_columns():
+            if fnmatch.fnmatchcase(column.column_name.lower(), pattern) or fnmatch.fnmatchcase(column.new_name, pattern):
+                column.include = include
+        self.update_callback()
+
+    def _forget_profile(self):
+        if self.model.column_profile is None:
+            return
+        ProfileStore().delete(self.model.column_profile)
+        self.model.column_profile = None
+        if self.model.data_processing is not None:
+            self.model.data_processing.reset_columns()
+        self.update()
+        self.update_callback()
+        messagebox.showinfo("Профиль колонок", messages.PROFILE_FORGOTTEN)
 
 
 class HeadersFrame:
@@ -495,14 +1211,114 @@ class HeadersFrame:
 
     def _get_headers_frame(self) -> Frame:
         headers_frame = self.builder.frame(self.parent, pack_options={'padx': 10, 'pady': (5, 0), 'fill': 'x'})
-        headers = [("Имя столбца", 30), ("Тип", 7), ("Новый тип", 15), ("Включить", 10)]
+        headers = [("", 3), ("Имя столбца", 27), ("Тип", 7), ("Новый тип", 15), ("Включить", 10)]
         for i, (text, width) in enumerate(headers):
             lbl = ttk.Label(headers_frame, text=text, width=width, anchor="center")
             lbl.grid(row=0, column=i, padx=5)
         return headers_frame
 
 
+class ColumnRow:
+    """
+    Строка виджетов настройки колонки. Строки переиспользуются при прокрутке:
+    `bind` привязывает строку к другой колонке без пересоздания виджетов.
+    """
+
+    def __init__(self, parent, builder: WidgetBuilder, model: AppModel, valid_types: dict[str, str]):
+        self.parent = parent
+        self.builder = builder
+        self.model = model
+        self.valid_types = valid_types
+        self.inverted_types = {v: k for k, v in valid_types.items()}
+        self.column = None
+        self._binding = False
+
+        self.row_frame = None
+        self.type_label = None
+        self.selected_var = tk.BooleanVar(value=False)
+        self.name_var = tk.StringVar(value="")
+        self.new_type_var = tk.StringVar(value="")
+        self.include_var = tk.BooleanVar(value=True)
+
+        self._create_widgets()
+
+    @property
+    def widgets(self) -> list:
+        return [self.row_frame, *self.row_frame.winfo_children()]
+
+    def bind(self, column) -> None:
+        """
+        Показывает в строке настройки колонки.
+        :param column: Колонка таблицы
+        """
+        self.column = column
+        self._binding = True
+        try:
+            self.selected_var.set(column.column_name in self.model.selected_columns)
+            self.name_var.set(column.new_name)
+            self.new_type_var.set(self.valid_types.get(column.new_type, column.new_type))
+            self.include_var.set(column.include)
+            column_type = column.column_type.lower()
+            self.type_label.config(text=self.valid_types.get(column_type, column_type))
+        finally:
+            self._binding = False
+
+    def _create_widgets(self):
+        self.row_frame = ttk.Frame(self.parent)
+        self.builder.checkbutton(self.row_frame, text="", variable=self.selected_var, pack_options={'side': 'left'})
+        self.builder.entry(self.row_frame, textvariable=self.name_var, width=27, pack_options={'side': 'left'})
+        self.type_label = self.builder.label(
+            self.row_frame,
+            text="",
+            width=10,
+            anchor="center",
+            pack_options={'side': 'left', 'padx': 5}
+        )
+        self.builder.combobox(
+            self.row_frame,
+            textvariable=self.new_type_var,
+            values=list(self.valid_types.values()),
+            state="readonly",
+            width=11,
+            pack_options={'side': 'left', 'padx': 5}
+        )
+        self.builder.checkbutton(
+            self.row_frame,
+            text="",
+            variable=self.include_var,
+            pack_options={'side': 'left', 'padx': 25}
+        )
+        self.selected_var.trace_add("write", lambda *args: self._on_change(self._set_selected))
+        self.name_var.trace_add("write", lambda *args: self._on_change(self._set_name))
+        self.new_type_var.trace_add("write", lambda *args: self._on_change(self._set_new_type))
+        self.include_var.trace_add("write", lambda *args: self._on_change(self._set_include))
+
+    def _on_change(self, setter) -> None:
+        if not self._binding and self.column is not None:
+            setter()
+
+    def _set_selected(self) -> None:
+        if self.selected_var.get():
+            self.model.selected_columns.add(self.column.column_name)
+        else:
+            self.model.selected_columns.discard(self.column.column_name)
+
+    def _set_name(self) -> None:
+        self.column.new_name = self.name_var.get()
+
+    def _set_new_type(self) -> None:
+        self.column.new_type = self.inverted_types.get(self.new_type_var.get(), self.new_type_var.get())
+
+    def _set_include(self) -> None:
+        self.column.include = self.include_var.get()
+
+
 class ColumnsConfigFrame:
+    """
+    Виртуализированный список колонок: создается только столько строк виджетов, сколько
+    помещается в окне, при прокрутке и фильтрации строки привязываются к другим колонкам.
+    """
+
     def __init__(self, parent, builder: WidgetBuilder, model: AppModel):
         self.parent = parent
         self.builder = builder
@@ -510,125 +1326,101 @@ class ColumnsConfigFrame:
         self.valid_types = ValueFormatterFactory().types
 
         self.columns_config_frame = None
-        self.columns_canvas = None
-        self.inner_frame = None
+        self.rows_frame = None
+        self.v_scroll = None
+        self.rows: list[ColumnRow] = []
+        self.columns = []
+        self.top_index = 0
+        self._row_height = None
 
         self._create_widgets()
         self._refresh_columns()
 
     def update(self):
+        self.model.selected_columns.clear()
+        self.top_index = 0
+        self._refresh_columns()
+
+    def refresh(self):
         self._refresh_columns()
 
     def _create_widgets(self):
         self.columns_config_frame = self._get_columns_config_frame()
-        self.columns_canvas = self._get_scrolled_canvas()
-        self.inner_frame = self._get_inner_frame()
+        self.rows_frame = self._get_rows_frame()
+        self.v_scroll = self._get_v_scroll()
 
     def _get_columns_config_frame(self) -> tk.Frame:
         return self.builder.frame(self.parent, pack_options={'fill': 'both', 'expand': True})
 
-    def _get_scrolled_canvas(self) -> Canvas:
-        canvas, _ = self.builder.scrolled_canvas(
-            parent=self.columns_config_frame,
-            vertical=True,
-            horizontal=False,
-            pack_options={'fill': 'both', 'expand': True}
-        )
-        return canvas
+    def _get_rows_frame(self) -> Frame:
+        rows_frame = self.builder.frame(self.columns_config_frame, pack_options={'side': 'left', 'fill': 'both', 'expand': True})
+        # Размер списка задается окном, а не количеством строк в нем
+        rows_frame.grid_propagate(False)
+        rows_frame.bind("<Configure>", lambda event: self._render())
+        self._bind_mouse_wheel(rows_frame)
+        return rows_frame
 
-    def _get_inner_frame(self):
-        inner_frame = ttk.Frame(self.columns_canvas)
-        self.columns_canvas.create_window((0, 0), window=inner_frame, anchor="nw")
-        inner_frame.bind(
-            "<Configure>",
-            lambda event: self.columns_canvas.configure(scrollregion=self.columns_canvas.bbox("all"))
-        )
-        return inner_frame
+    def _get_v_scroll(self) -> tk.Scrollbar:
+        v_scroll = tk.Scrollbar(self.columns_config_frame, orient="vertical", command=self._yview, cursor="hand2")
+        v_scroll.pack(side="right", fill="y")
+        return v_scroll
 
     def _refresh_columns(self):
-        for widget in self.inner_frame.winfo_children():
-            widget.destroy()
-        if self.model.data_processing is not None:
-            for i, col_obj in enumerate(self.model.data_processing.table.columns):
-                self._create_column_row(i, col_obj)
-
-    def _create_column_row(self, row_index, col_obj):
-        row_frame = self._get_row_frame(row_index)
-        # Поле для ввода имени колонки
-        column_name_var = self._get_column_name(row_frame, col_obj)
-        column_type = self._get_column_type(row_frame, col_obj)
-        column_new_type_var = self._get_column_new_type(row_frame, col_obj, column_type)
-        column_include_var = self._get_column_include(row_frame, col_obj)
-
-        col_obj.new_name = column_name_var.get()
-        col_obj.new_type = self._get_key_from_display(column_new_type_var.get())
-        col_obj.include = column_include_var.get()
-
-    def _get_row_frame(self, row_index):
-        row_frame = ttk.Frame(self.inner_frame)
-        row_frame.grid(row=row_index, column=0, sticky="w", padx=5, pady=2)
-        return row_frame
-
-    def _get_column_name(self, row_frame, col_obj):
-        column_name = tk.StringVar(row_frame, value=col_obj.new_name)
-        col_entry = self.builder.entry(row_frame, width=30, pack_options={'side': 'left'})
-        col_entry.config(textvariable=column_name)
-        col_entry.bind("<Return>", lambda event, c=col_obj, v=column_name: self._on_column_name_change(c, v.get()))
-        return column_name
-
-    def _get_column_type(self, row_frame, col_obj):
-        column_type = self.valid_types.get(col_obj.new_type)
-        self.builder.label(
-            row_frame,
-            text=column_type,
-            width=10,
-            anchor="center",
-            pack_options={'side': 'left', 'padx': 5}
-        )
-        return column_type
-
-    def _get_column_new_type(self, row_frame, col_obj, column_type):
-        new_types = list(self.valid_types.values())
-        new_type_var = tk.StringVar(value=column_type)
-        new_type_combo = self.builder.combobox(
-            row_frame,
-            textvariable=new_type_var,
-            values=new_types,
-            state="readonly",
-            width=11,
-            pack_options={'side': 'left', 'padx': 5}
-        )
-        new_type_combo.bind(
-            "<<ComboboxSelected>>",
-            lambda event, c=col_obj, v=new_type_var: self._on_column_type_change(c, v.get())
-        )
-        return new_type_var
-
-    def _get_column_include(self, row_frame, col_obj):
-        include_var = tk.BooleanVar(value=col_obj.include)
-        self.builder.checkbutton(
-            row_frame,
-            text="",
-            variable=include_var,
-            pack_options={'side': 'left', 'padx': 25}
-        )
-        include_var.trace("w", lambda *args, c=col_obj, var=include_var: self._on_column_include_change(c, var.get()))
-        return include_var
+        self.columns = self.model.get_filtered_columns()
+        self._render()
+
+    @property
+    def capacity(self) -> int:
+        """
+        Возвращает количество строк, помещающихся в окне.
+        """
+        if self._row_height is None:
+            return 1
+        return max(1, self.rows_frame.winfo_height() // self._row_height)
+
+    def _render(self):
+        if self.columns and self._row_height is None:
+            self._add_row()
+            self.rows_frame.update_idletasks()
+            self._row_height = self.rows[0].row_frame.winfo_reqheight() + 4
+        capacity = self.capacity
+        while len(self.rows) < min(capacity, len(self.columns)):
+            self._add_row()
+        self.top_index = max(0, min(self.top_index, len(self.columns) - capacity))
+        for position, row in enumerate(self.rows):
+            index = self.top_index + position
+            if position < capacity and index < len(self.columns):
+                row.bind(self.columns[index])
+                row.row_frame.grid(row=position, column=0, sticky="w", padx=5, pady=2)
+            else:
+                row.row_frame.grid_remove()
+        if self.columns:
+            self.v_scroll.set(self.top_index / len(self.columns), min(1.0, (self.top_index + capacity) / len(self.columns)))
+        else:
+            self.v_scroll.set(0.0, 1.0)
 
-    @staticmethod
-    def _on_column_name_change(col_obj, new_name):
-        col_obj.new_name = new_name
+    def _add_row(self):
+        row = ColumnRow(self.rows_frame, self.builder, self.model, self.valid_types)
+        for widget in row.widgets:
+            self._bind_mouse_wheel(widget)
+        self.rows.append(row)
 
-    def _on_column_type_change(self, col_obj, new_display):
-        col_obj.new_type = self._get_key_from_display(new_display)
+    def _bind_mouse_wheel(self, widget):
+        widget.bind("<MouseWheel>", lambda event: self._scroll_to(self.top_index + (-3 if event.delta > 0 else 3)))
+        widget.bind("<Button-4>", lambda event: self._scroll_to(self.top_index - 3))
+        widget.bind("<Button-5>", lambda event: self._scroll_to(self.top_index + 3))
 
-    @staticmethod
-    def _on_column_include_change(col_obj, include_value):
-        col_obj.include = include_value
+    def _yview(self, *args):
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * len(self.columns)))
+        elif args[0] == "scroll":
+            step = self.capacity if args[2] == "pages" else 1
+            self._scroll_to(self.top_index + int(args[1]) * step)
 
-    def _get_key_from_display(self, display):
-        inverted = {v: k for k, v in self.valid_types.items()}
-        return inverted.get(display, display)
+    def _scroll_to(self, index) -> str:
+        self.top_index = index
+        self._render()
+        return "break"
 
 
 class CodeFrame:
@@ -638,42 +1430,111 @@ class CodeFrame:
         self.model = model
 
         self.code_space_frame = None
-        self.code_text = None
+        self.code_viewer = None
+        self.search_frame = None
+        self.search_entry = None
+        self.line_entry = None
         self.code_buttons_frame = None
+        self.job_status_frame = None
+        self.diagnostics_frame = None
 
         self._create_widgets()
 
-    def update_code(self, sql_code) -> None:
-        self.code_text.delete("1.0", tk.END)
-        self.code_text.insert(tk.END, sql_code)
+    def update_code(self, document: SQLDocument | None, diagnostics: Diagnostics | None = None) -> None:
+        """
+        Показывает SQL скрипт в окне просмотра.
+        :param document: SQL скрипт
+        :param diagnostics: Замеры задачи, в которую добавляется этап отображения
+        """
+        if diagnostics is None:
+            self.code_viewer.set_document(document)
+            return
+        with diagnostics.span("display", size_bytes=document.size_bytes if document is not None else None):
+            self.code_viewer.set_document(document)
+            self.code_viewer.update_idletasks()
+        self.diagnostics_frame.update_summary()
 
     def _create_widgets(self) -> None:
         self.code_space_frame = self._get_code_space_frame()
-        self.code_text = self._get_code_text()
+        self.search_frame = self._get_search_frame()
+        self.search_entry = self._get_search_entry()
+        self._get_search_button()
+        self.line_entry = self._get_line_entry()
+        self._get_goto_line_button()
+        self.code_viewer = self._get_code_viewer()
         self.code_buttons_frame = CodeButtonsFrame(self.code_space_frame, self.builder, self.model)
+        self.job_status_frame = JobStatusFrame(self.code_space_frame, self.builder, self.model)
+        self.diagnostics_frame = DiagnosticsFrame(self.code_space_frame, self.builder, self.model)
 
     def _get_code_space_frame(self) -> Frame:
         return self.builder.frame(self.parent, pack_options={'side': 'right', 'fill': 'both', 'expand': True})
 
-    def _get_code_text(self) -> Text:
-        code_text, _ = self.builder.scrolled_text(
-            parent=self.code_space_frame,
-            wrap="none",
+    def _get_search_frame(self) -> Frame:
+        return self.builder.frame(self.code_space_frame, pack_options={'padx': 10, 'pady': (5, 0), 'fill': 'x'})
+
+    def _get_search_entry(self) -> Entry:
+        search_entry = self.builder.entry(self.search_frame, width=30, pack_options={'side': 'left'})
+        search_entry.bind("<Return>", lambda event: self._find_next())
+        return search_entry
+
+    def _get_search_button(self) -> Button:
+        return self.builder.button(
+            self.search_frame,
+            text="Найти",
+            command=self._find_next,
+            pack_options={'side': 'left', 'padx': 5}
+        )
+
+    def _get_line_entry(self) -> Entry:
+        line_entry = self.builder.entry(self.search_frame, width=10, pack_options={'side': 'left', 'padx': (15, 0)})
+        line_entry.bind("<Return>", lambda event: self._goto_line())
+        return line_entry
+
+    def _get_goto_line_button(self) -> Button:
+        return self.builder.button(
+            self.search_frame,
+            text="К строке",
+            command=self._goto_line,
+            pack_options={'side': 'left', 'padx': 5}
+        )
+
+    def _get_code_viewer(self) -> SQLViewer:
+        code_viewer = SQLViewer(
+            self.code_space_frame,
             pack_options={'padx': 10, 'pady': 5, 'fill': 'both', 'expand': True}
         )
-        code_text.bind("<Control-c>", self._copy_selection)
-        return code_text
+        code_viewer.text.bind("<Control-c>", self._copy_selection)
+        return code_viewer
+
+    def _find_next(self) -> None:
+        text = self.search_entry.get()
+        if not text or self.model.sql_document is None:
+            return
+        if self.code_viewer.find_next(text) is None:
+            messagebox.showinfo("Поиск", messages.SQL_TEXT_NOT_FOUND.format(text=text))
 
-    def _copy_selection(self, event) -> None:
+    def _goto_line(self) -> None:
+        if self.model.sql_document is None:
+            return
         try:
-            selected_text = self.code_text.get(tk.SEL_FIRST, tk.SEL_LAST)
-            self.code_text.winfo_toplevel().clipboard_clear()
-            self.code_text.winfo_toplevel().clipboard_append(selected_text)
-        except tk.TclError:
-            pass
+            line = int(self.line_entry.get())
+        except ValueError:
+            messagebox.showwarning("Предупреждение", messages.INVALID_LINE_NUMBER)
+            return
+        self.code_viewer.goto_line(line - 1)
+
+    def _copy_selection(self, event) -> str:
+        selected_text = self.code_viewer.get_selection()
+        if selected_text is not None:
+            self.code_viewer.text.winfo_toplevel().clipboard_clear()
+            self.code_viewer.text.winfo_toplevel().clipboard_append(selected_text)
+        return "break"
 
 
 class CodeButtonsFrame:
+    # Скрипты больше этого размера не копируются в буфер обмена целиком
+    CLIPBOARD_MAX_BYTES = 5 * 1024 * 1024
+
     def __init__(self, parent, builder: WidgetBuilder, model: AppModel):
         self.parent = parent
         self.builder = builder
@@ -681,11 +1542,19 @@ class CodeButtonsFrame:
 
         self.code_buttons_frame = None
         self.errors_button = None
+        self.stats_label = None
 
         self._create_widgets()
 
+    def update_stats(self, stats: RenderStats) -> None:
+        self.stats_label.config(text=messages.SQL_RENDER_STATS.format(
+            rows=stats.rows,
+            format_seconds=stats.format_seconds,
+            render_seconds=stats.render_seconds
+        ))
+
     def update_errors_button(self) -> None:
-        count = len(VALUE_FORMATTER_ERRORS)
+        count = self.model.errors.total
         if count == 0:
             self.errors_button.pack_forget()
         else:
@@ -696,7 +1565,9 @@ class CodeButtonsFrame:
     def _create_widgets(self) -> None:
         self.code_buttons_frame = self._get_code_button_frame()
         self._get_copy_all_button()
+        self._get_save_button()
         self.errors_button = self._get_errors_button()
+        self.stats_label = self._get_stats_label()
 
     def _get_code_button_frame(self) -> Frame:
         return self.builder.frame(self.parent, pack_options={'padx': 10, 'pady': 5, 'fill': 'x'})
@@ -709,6 +1580,17 @@ class CodeButtonsFrame:
             pack_options={'side': 'left', 'padx': 5}
         )
 
+    def _get_save_button(self) -> Button:
+        return self.builder.button(
+            self.code_buttons_frame,
+            text="Сохранить...",
+            command=self._save_code,
+            pack_options={'side': 'left', 'padx': 5}
+        )
+
+    def _get_stats_label(self) -> Label:
+        return self.builder.label(self.code_buttons_frame, text="", pack_options={'side': 'left', 'padx': 5})
+
     def _get_errors_button(self) -> Button:
         errors_button = self.builder.button(
             self.code_buttons_frame, text="Ошибки (0)", command=self._show_errors,
@@ -718,24 +1600,397 @@ class CodeButtonsFrame:
         return errors_button
 
     def _copy_code(self) -> None:
-        self.parent.clipboard_clear()
-        self.parent.clipboard_append(self.model.sql_script)
-        messagebox.showinfo("Информация", messages.SQL_COPIED_TO_CLIPBOARD)
+        document = self.model.sql_document
+        if document is None:
+            messagebox.showwarning("Предупреждение", messages.SQL_NOT_GENERATED)
+            return
+        if document.size_bytes <= self.CLIPBOARD_MAX_BYTES:
+            self.parent.clipboard_clear()
+            self.parent.clipboard_append(document.read_text())
+            messagebox.showinfo("Информация", messages.SQL_COPIED_TO_CLIPBOARD)
+            return
+        copy_range = messagebox.askyesno("Большой скрипт", messages.SQL_TOO_LARGE_FOR_CLIPBOARD.format(
+            size=format_bytes(document.size_bytes),
+            max_size=format_bytes(self.CLIPBOARD_MAX_BYTES)
+        ))
+        if copy_range:
+            CopyRangeDialog(self.parent, self.builder, document, self.CLIPBOARD_MAX_BYTES)
+
+    def _save_code(self) -> None:
+        document = self.model.sql_document
+        if document is None:
+            messagebox.showwarning("Предупреждение", messages.SQL_NOT_GENERATED)
+            return
+        file_path = filedialog.asksaveasfilename(
+            title="Сохранить SQL",
+            initialfile=f"{self.model.data_processing.table.name}.sql" if self.model.data_processing else "script.sql",
+            defaultextension=".sql",
+            filetypes=SaveSQLFrame.FILE_TYPES
+        )
+        if not file_path:
+            return
+        submit_job(
+            self.model,
+            Job(
+                "Сохранение SQL",
+                tasks.save_document,
+                document,
+                file_path,
+                get_compression_level(self.model, SQLFileWriter.detect_compression(file_path))
+            ),
+            on_success=lambda writer: messagebox.showinfo("Сохранение SQL", messages.SQL_SAVED.format(
+                file_path=file_path,
+                raw_size=format_bytes(writer.raw_bytes),
+                file_size=format_bytes(writer.compressed_bytes)
+            )),
+            on_error=lambda error: messagebox.showerror("Ошибка сохранения", str(error))
+        )
 
     def _show_errors(self) -> None:
-        if len(VALUE_FORMATTER_ERRORS) > 0:
-            error_win = tk.Toplevel(self.parent)
-            error_win.geometry("800x400")
-            error_win.title("Ошибки при форматировании")
-            error_text = self._get_error_text(error_win)
-            error_text.insert(tk.END, "\n".join(VALUE_FORMATTER_ERRORS))
-            error_text.config(state="disabled")
-
-    def _get_error_text(self, error_window) -> Text:
+        if self.model.errors.total > 0:
+            ErrorsDialog(self.parent, self.builder, self.model.errors)
+
+
+class ErrorsDialog:
+    PAGE_SIZE = 200
+
+    def __init__(self, parent, builder: WidgetBuilder, errors: ErrorCollector):
+        self.parent = parent
+        self.builder = builder
+        self.errors = errors
+        self.page = 0
+
+        self.error_window = None
+        self.error_text = None
+        self.page_label = None
+
+        self._create_widgets()
+        self._show_page()
+
+    @property
+    def page_count(self) -> int:
+        return max(1, -(-self.errors.example_count // self.PAGE_SIZE))
+
+    def _create_widgets(self) -> None:
+        self.error_window = self._get_error_window()
+        self._get_summary_label()
+        self.error_text = self._get_error_text()
+        pages_frame = self.builder.frame(self.error_window, pack_options={'padx': 10, 'pady': 5, 'fill': 'x'})
+        self.builder.button(pages_frame, text="<", width=3, command=lambda: self._show_page(self.page - 1),
+                            pack_options={'side': 'left'})
+        self.page_label = self.builder.label(pages_frame, text="", pack_options={'side': 'left', 'padx': 5})
+        self.builder.button(pages_frame, text=">", width=3, command=lambda: self._show_page(self.page + 1),
+                            pack_options={'side': 'left'})
+
+    def _get_error_window(self) -> tk.Toplevel:
+        error_window = tk.Toplevel(self.parent)
+        error_window.geometry("800x400")
+        error_window.title("Ошибки при форматировании")
+        return error_window
+
+    def _get_summary_label(self) -> Label:
+        summary = messages.FORMATTING_ERRORS_SUMMARY.format(
+            total=self.errors.total,
+            examples=self.errors.example_count,
+            summary="; ".join(self.errors.iter_summary())
+        )
+        return self.builder.label(
+            self.error_window,
+            text=summary,
+            justify="left",
+            wraplength=780,
+            pack_options={'padx': 10, 'pady': (10, 0), 'fill': 'x'}
+        )
+
+    def _get_error_text(self) -> Text:
         error_text, _ = self.builder.scrolled_text(
-            parent=error_window,
+            parent=self.error_window,
             wrap="none",
             cursor="hand2",
             pack_options={'padx': 10, 'pady': 5, 'fill': 'both', 'expand': True}
         )
         return error_text
+
+    def _show_page(self, page: int = 0) -> None:
+        self.page = max(0, min(page, self.page_count - 1))
+        self.error_text.config(state="normal")
+        self.error_text.delete("1.0", tk.END)
+        self.error_text.insert(tk.END, "\n".join(self.errors.get_messages(self.page * self.PAGE_SIZE, self.PAGE_SIZE)))
+        self.error_text.config(state="disabled")
+        self.page_label.config(text=f"{self.page + 1} / {self.page_count}")
+
+
+class CopyRangeDialog:
+    def __init__(self, parent, builder: WidgetBuilder, document: SQLDocument, max_bytes: int):
+        self.parent = parent
+        self.builder = builder
+        self.document = document
+        self.max_bytes = max_bytes
+
+        self.range_window = None
+        self.size_label = None
+        self.first_line_var = tk.IntVar(value=1)
+        self.last_line_var = tk.IntVar(value=document.get_line_at_offset(max_bytes))
+
+        self._create_widgets()
+        self._update_size()
+
+    def _create_widgets(self):
+        self.range_window = self._get_range_window()
+        range_frame = self.builder.frame(self.range_window, pack_options={'padx': 10, 'pady': 5, 'fill': 'x'})
+        self.builder.label(range_frame, text="Строки с", pack_options={'side': 'left'})
+        self._get_line_spinbox(range_frame, self.first_line_var)
+        self.builder.label(range_frame, text="по", pack_options={'side': 'left'})
+        self._get_line_spinbox(range_frame, self.last_line_var)
+        buttons_frame = self.builder.frame(self.range_window, pack_options={'padx': 10, 'pady': 5, 'fill': 'x'})
+        self.size_label = self.builder.label(buttons_frame, text="", pack_options={'side': 'left'})
+        self.builder.button(
+            buttons_frame, text="Копировать", command=self._copy_range,
+            pack_options={'side': 'right', 'padx': 5}
+        )
+        self.first_line_var.trace_add("write", lambda *args: self._update_size())
+        self.last_line_var.trace_add("write", lambda *args: self._update_size())
+
+    def _get_range_window(self) -> tk.Toplevel:
+        range_window = tk.Toplevel(self.parent)
+        range_window.title("Копирование диапазона строк")
+        range_window.resizable(False, False)
+        return range_window
+
+    def _get_line_spinbox(self, parent, variable) -> ttk.Spinbox:
+        return self.builder.spinbox(
+            parent, from_=1, to=self.document.line_count, width=10, textvariable=variable,
+            pack_options={'side': 'left', 'padx': 5}
+        )
+
+    def _get_range(self) -> tuple[int, int] | None:
+        try:
+            first_line, last_line = self.first_line_var.get(), self.last_line_var.get()
+        except tk.TclError:
+            return None
+        if first_line < 1 or last_line < first_line:
+            return None
+        return first_line - 1, last_line
+
+    def _update_size(self):
+        line_range = self._get_range()
+        if line_range is None:
+            self.size_label.config(text="")
+            return
+        self.size_label.config(text=format_bytes(self.document.get_range_bytes(*line_range)))
+
+    def _copy_range(self):
+        line_range = self._get_range()
+        if line_range is None:
+            messagebox.showwarning("Предупреждение", messages.INVALID_LINE_RANGE, parent=self.range_window)
+            return
+        if self.document.get_range_bytes(*line_range) > self.max_bytes:
+            messagebox.showwarning("Предупреждение", messages.LINE_RANGE_TOO_LARGE.format(
+                max_size=format_bytes(self.max_bytes)
+            ), parent=self.range_window)
+            return
+        self.range_window.clipboard_clear()
+        self.range_window.clipboard_append(self.document.get_text(*line_range))
+        messagebox.showinfo("Информация", messages.SQL_COPIED_TO_CLIPBOARD, parent=self.range_window)
+        self.range_window.destroy()
+
+
+class JobStatusFrame:
+    def __init__(self, parent, builder: WidgetBuilder, model: AppModel):
+        self.parent = parent
+        self.builder = builder
+        self.model = model
+
+        self.job_status_frame = None
+        self.progressbar = None
+        self.status_label = None
+        self.cancel_button = None
+
+        self._create_widgets()
+        self.model.job_runner.add_listener(self.update_status)
+
+    def update_status(self, job: Job) -> None:
+        if job.state not in (Job.PENDING, Job.RUNNING):
+            self.progressbar.stop()
+            self.job_status_frame.pack_forget()
+            return
+        if not self.job_status_frame.winfo_ismapped():
+            self.job_status_frame.pack(padx=10, pady=(0, 5), fill="x")
+        progress = job.progress
+        if progress.fraction is None:
+            if str(self.progressbar["mode"]) != "indeterminate":
+                self.progressbar.config(mode="indeterminate")
+                self.progressbar.start()
+            self.status_label.config(text=messages.JOB_PROGRESS_STAGE.format(
+                stage=progress.stage, seconds=job.elapsed_seconds
+            ))
+            return
+        if str(self.progressbar["mode"]) != "determinate":
+            self.progressbar.stop()
+            self.progressbar.config(mode="determinate")
+        self.progressbar["value"] = progress.fraction * 100
+        eta = progress.eta_seconds
+        self.status_label.config(text=messages.JOB_PROGRESS_ROWS.format(
+            stage=progress.stage,
+            done=progress.done,
+            total=progress.total,
+            eta=f"{eta:.0f} с" if eta is not None else "—"
+        ))
+
+    def _create_widgets(self) -> None:
+        self.job_status_frame = self._get_job_status_frame()
+        self.progressbar = self._get_progressbar()
+        self.status_label = self._get_status_label()
+        self.cancel_button = self._get_cancel_button()
+        self.job_status_frame.pack_forget()
+
+    def _get_job_status_frame(self) -> Frame:
+        return self.builder.frame(self.parent, pack_options={'padx': 10, 'pady': (0, 5), 'fill': 'x'})
+
+    def _get_progressbar(self) -> ttk.Progressbar:
+        return self.builder.progressbar(
+            self.job_status_frame,
+            length=200,
+            maximum=100,
+            mode="determinate",
+            pack_options={'side': 'left', 'padx': 5}
+        )
+
+    def _get_status_label(self) -> Label:
+        return self.builder.label(self.job_status_frame, text="", pack_options={'side': 'left', 'padx': 5})
+
+    def _get_cancel_button(self) -> Button:
+        return self.builder.button(
+            self.job_status_frame,
+            text="Отмена",
+            command=self.model.job_runner.cancel,
+            pack_options={'side': 'right', 'padx': 5}
+        )
+
+
+class DiagnosticsFrame:
+    """
+    Строка состояния с замерами последней операции. Замеры завершенных задач сохраняются в истории модели.
+    """
+
+    def __init__(self, parent, builder: WidgetBuilder, model: AppModel):
+        self.parent = parent
+        self.builder = builder
+        self.model = model
+
+        self.diagnostics_frame = None
+        self.summary_label = None
+
+        self._create_widgets()
+        self.model.job_runner.add_listener(self._on_job_updated)
+
+    def update_summary(self) -> None:
+        if not self.model.diagnostics_history:
+            self.summary_label.config(text="")
+            return
+        self.summary_label.config(text=self.model.diagnostics_history[-1].format_summary())
+
+    def _on_job_updated(self, job: Job) -> None:
+        if job.state in (Job.PENDING, Job.RUNNING) or not job.diagnostics.spans:
+            return
+        self.model.diagnostics_history.append(job.diagnostics)
+        self.update_summary()
+
+    def _create_widgets(self) -> None:
+        self.diagnostics_frame = self._get_diagnostics_frame()
+        self.summary_label = self._get_summary_label()
+        self._get_diagnostics_button()
+
+    def _get_diagnostics_frame(self) -> Frame:
+        return self.builder.frame(self.parent, pack_options={'padx': 10, 'pady': (0, 5), 'fill': 'x'})
+
+    def _get_summary_label(self) -> Label:
+        return self.builder.label(self.diagnostics_frame, text="", pack_options={'side': 'left', 'padx': 5})
+
+    def _get_diagnostics_button(self) -> Button:
+        return self.builder.button(
+            self.diagnostics_frame,
+            text="Диагностика",
+            command=lambda: DiagnosticsDialog(self.parent, self.builder, self.model),
+            pack_options={'side': 'right', 'padx': 5}
+        )
+
+
+class DiagnosticsDialog:
+    def __init__(self, parent, builder: WidgetBuilder, model: AppModel):
+        self.parent = parent
+        self.builder = builder
+        self.model = model
+
+        self.diagnostics_window = None
+        self.report_text = None
+
+        self._create_widgets()
+        self._show_report()
+
+    def _create_widgets(self) -> None:
+        self.diagnostics_window = self._get_diagnostics_window()
+        self.report_text = self._get_report_text()
+        buttons_frame = self.builder.frame(self.diagnostics_window, pack_options={'padx': 10, 'pady': 5, 'fill': 'x'})
+        self.builder.checkbutton(
+            buttons_frame,
+            text="Профилировать следующую операцию",
+            variable=self.model.profile_next_var,
+            pack_options={'side': 'left'}
+        )
+        self.builder.checkbutton(
+            buttons_frame,
+            text="Замерять память",
+            variable=self.model.trace_memory_var,
+            pack_options={'side': 'left', 'padx': 10}
+        )
+        self.builder.button(buttons_frame, text="Закрыть", command=self.diagnostics_window.destroy,
+                            pack_options={'side': 'right', 'padx': 5})
+        self.builder.button(buttons_frame, text="Очистить", command=self._clear,
+                            pack_options={'side': 'right', 'padx': 5})
+        self.builder.button(buttons_frame, text="Экспорт JSON...", command=self._export,
+                            pack_options={'side': 'right', 'padx': 5})
+
+    def _get_diagnostics_window(self) -> tk.Toplevel:
+        diagnostics_window = tk.Toplevel(self.parent)
+        diagnostics_window.geometry("800x500")
+        diagnostics_window.title("Диагностика")
+        return diagnostics_window
+
+    def _get_report_text(self) -> Text:
+        report_text, _ = self.builder.scrolled_text(
+            parent=self.diagnostics_window,
+            wrap="none",
+            pack_options={'padx': 10, 'pady': (10, 5), 'fill': 'both', 'expand': True}
+        )
+        return report_text
+
+    def _show_report(self) -> None:
+        history = list(reversed(self.model.diagnostics_history))
+        lines = [line for diagnostics in history for line in (*diagnostics.iter_report(), "")]
+        self.report_text.config(state="normal")
+        self.report_text.delete("1.0", tk.END)
+        self.report_text.insert(tk.END, "\n".join(lines) if lines else messages.DIAGNOSTICS_EMPTY)
+        self.report_text.config(state="disabled")
+
+    def _clear(self) -> None:
+        self.model.diagnostics_history.clear()
+        self._show_report()
+
+    def _export(self) -> None:
+        file_path = filedialog.asksaveasfilename(
+            parent=self.diagnostics_window,
+            title="Экспорт диагностики",
+            initialfile="tab2sql_diagnostics.json",
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json")]
+        )
+        if not file_path:
+            return
+        try:
+            with open(file_path, "w", encoding="utf-8") as file:
+                json.dump([diagnostics.to_dict() for diagnostics in self.model.diagnostics_history], file,
+                          ensure_ascii=False, indent=2)
+        except OSError as e:
+            messagebox.showerror("Экспорт диагностики", messages.DIAGNOSTICS_EXPORT_ERROR.format(error=e),
+                                 parent=self.diagnostics_window)
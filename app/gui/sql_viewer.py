@@ -0,0 +1,167 @@
+import tkinter as tk
+from tkinter import Text
+from tkinter.font import Font
+from tkinter.ttk import Frame
+from typing import Any
+
+from services.sql_document import SQLDocument
+
+
+class SQLViewer:
+    """
+    Виртуализированный просмотр SQL скрипта: в `tk.Text` находятся только видимые строки,
+    остальные читаются из `SQLDocument` при прокрутке. Поэтому размер скрипта не влияет
+    ни на время отображения, ни на потребление памяти окном.
+
+    :param parent: Родительский виджет
+    :param pack_options: Настройки для упаковки
+    :param text_options: Настройки для `tk.Text`
+    """
+    # Строки сверх видимых, которые рендерятся про запас (неполная последняя строка)
+    EXTRA_LINES = 2
+    HIGHLIGHT_TAG = "highlight"
+
+    def __init__(self, parent, pack_options: dict[str, Any] | None = None, **text_options):
+        self.parent = parent
+        self.document: SQLDocument | None = None
+        self.top_line = 0
+        self.highlighted_line: int | None = None
+
+        self.container = None
+        self.text = None
+        self.v_scroll = None
+        self._line_height = 1
+
+        self._create_widgets(pack_options or {}, text_options)
+
+    @property
+    def visible_lines(self) -> int:
+        """
+        Возвращает количество строк, помещающихся в окне.
+        """
+        return max(1, self.text.winfo_height() // self._line_height)
+
+    def set_document(self, document: SQLDocument | None) -> None:
+        """
+        Показывает новый скрипт с первой строки.
+        :param document: SQL скрипт (None — очистить окно)
+        """
+        self.document = document
+        self.top_line = 0
+        self.highlighted_line = None
+        self.render()
+
+    def goto_line(self, line: int) -> None:
+        """
+        Прокручивает скрипт к строке и выделяет ее.
+        :param line: Номер строки (с 0)
+        """
+        if self.document is None:
+            return
+        self.highlighted_line = max(0, min(line, self.document.line_count - 1))
+        if not self.top_line <= self.highlighted_line < self.top_line + self.visible_lines:
+            self.top_line = self.highlighted_line - self.visible_lines // 3
+        self.render()
+
+    def find_next(self, text: str, match_case: bool = False) -> int | None:
+        """
+        Ищет текст начиная со строки после выделенной, при необходимости — с начала скрипта.
+        :param text: Искомый текст
+        :param match_case: Учитывать регистр
+        :return: Номер найденной строки или None
+        """
+        if self.document is None:
+            return None
+        start = self.highlighted_line + 1 if self.highlighted_line is not None else self.top_line
+        line = self.document.find(text, start, match_case)
+        if line is None and start > 0:
+            line = self.document.find(text, 0, match_case)
+        if line is not None:
+            self.goto_line(line)
+        return line
+
+    def render(self) -> None:
+        """
+        Перерисовывает видимые строки и полосу прокрутки.
+        """
+        line_count = self._line_count()
+        visible = self.visible_lines
+        self.top_line = max(0, min(self.top_line, line_count - visible))
+        lines = self.document.get_lines(self.top_line, visible + self.EXTRA_LINES) if line_count else []
+
+        self.text.config(state="normal")
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n".join(lines))
+        if self.highlighted_line is not None and 0 <= self.highlighted_line - self.top_line < len(lines):
+            row = self.highlighted_line - self.top_line + 1
+            self.text.tag_add(self.HIGHLIGHT_TAG, f"{row}.0", f"{row}.end")
+        self.text.config(state="disabled")
+
+        if line_count:
+            self.v_scroll.set(self.top_line / line_count, min(1.0, (self.top_line + visible) / line_count))
+        else:
+            self.v_scroll.set(0.0, 1.0)
+
+    def get_selection(self) -> str | None:
+        """
+        Возвращает выделенный текст (из видимых строк) или None.
+        """
+        try:
+            return self.text.get(tk.SEL_FIRST, tk.SEL_LAST)
+        except tk.TclError:
+            return None
+
+    def _create_widgets(self, pack_options: dict[str, Any], text_options: dict[str, Any]) -> None:
+        self.container = Frame(self.parent)
+        self.container.pack(**pack_options)
+
+        self.text = Text(self.container, wrap="none", **text_options)
+        self.text.grid(row=0, column=0, sticky="nsew")
+        self.text.tag_config(self.HIGHLIGHT_TAG, background="#fff2a8")
+        self._line_height = Font(font=self.text.cget("font")).metrics("linespace") or 1
+
+        self.v_scroll = tk.Scrollbar(self.container, orient="vertical", command=self._yview, cursor="hand2")
+        self.v_scroll.grid(row=0, column=1, sticky="ns")
+        h_scroll = tk.Scrollbar(self.container, orient="horizontal", command=self.text.xview, cursor="hand2")
+        h_scroll.grid(row=1, column=0, sticky="ew")
+        self.text.config(xscrollcommand=h_scroll.set)
+
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
+
+        self.text.bind("<Configure>", lambda event: self.render())
+        self.text.bind("<MouseWheel>", self._on_mouse_wheel)
+        self.text.bind("<Button-4>", lambda event: self._scroll_lines(-3))
+        self.text.bind("<Button-5>", lambda event: self._scroll_lines(3))
+        self.text.bind("<Prior>", lambda event: self._scroll_lines(-self.visible_lines))
+        self.text.bind("<Next>", lambda event: self._scroll_lines(self.visible_lines))
+        self.text.bind("<Up>", lambda event: self._scroll_lines(-1))
+        self.text.bind("<Down>", lambda event: self._scroll_lines(1))
+        self.text.bind("<Control-Home>", lambda event: self._scroll_to(0))
+        self.text.bind("<Control-End>", lambda event: self._scroll_to(self._line_count()))
+        # Фокус нужен для клавиш прокрутки, т.к. в режиме "disabled" Text его не получает по клику
+        self.text.bind("<Button-1>", lambda event: self.text.focus_set())
+
+    def _line_count(self) -> int:
+        return self.document.line_count if self.document is not None else 0
+
+    def _yview(self, *args) -> None:
+        """
+        Обработчик вертикальной полосы прокрутки ("moveto" или "scroll").
+        """
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * self._line_count()))
+        elif args[0] == "scroll":
+            step = self.visible_lines if args[2] == "pages" else 1
+            self._scroll_lines(int(args[1]) * step)
+
+    def _on_mouse_wheel(self, event) -> str:
+        return self._scroll_lines(-3 if event.delta > 0 else 3)
+
+    def _scroll_lines(self, lines: int) -> str:
+        return self._scroll_to(self.top_line + lines)
+
+    def _scroll_to(self, line: int) -> str:
+        self.top_line = line
+        self.render()
+        return "break"
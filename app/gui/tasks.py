@@ -0,0 +1,214 @@
+import os
+from typing import TYPE_CHECKING
+
+from services.jobs import Job
+from services.output import SQLFileWriter
+from services.sql_document import SQLDocument
+from utils.logger import ErrorCollector
+from utils.sql_formatter import SQLFormatterFactory, RenderStats
+
+if TYPE_CHECKING:
+    from services import DataProcessing, SQLShardWriter, WorkbookConverter
+    from services.profiles import ColumnProfile
+    from services.sharding import ShardManifest
+    from services.workbook import SheetResult
+
+# Функции фоновых задач интерфейса. Выполняются в рабочем потоке JobRunner,
+# поэтому получают все настройки аргументами и не обращаются к виджетам и переменным tkinter.
+# Модули с pandas импортируются внутри функций, чтобы не замедлять запуск окна.
+
+
+def load_table(
+    job: Job,
+    file_path: str,
+    use_profile_options: bool = False,
+    **load_options
+) -> tuple["DataProcessing", list[str], dict, "ColumnProfile | None"]:
+    """
+    Загружает файл и определяет колонки таблицы. Если для файла есть сохраненный профиль,
+    колонки берутся из него без определения типов.
+    :param job: Фоновая задача
+    :param file_path: Путь к файлу
+    :param use_profile_options: Загрузить файл с параметрами из профиля (при первом открытии файла)
+    :param load_options: Параметры загрузки (delimiter, header или sheet_name)
+    :return: Обработанные данные, список листов (для Excel), фактические параметры загрузки и примененный профиль
+    """
+    from services.data_processing import DataProcessing
+    from services.load_data import DataLoaderFactory, LoadExcel
+    from services.profiles import ProfileStore
+    from services.sheet_cache import SheetCache
+
+    store = ProfileStore()
+    cache = SheetCache()
+    is_excel = os.path.splitext(file_path)[1].lower() in (".xlsx", ".xls")
+    sheet_names = []
+    if is_excel:
+        job.report("Чтение списка листов")
+        sheet_names = cache.get_sheet_names(file_path)
+        if sheet_names is None:
+            sheet_names = LoadExcel(file_path).get_sheet_names()
+            cache.put_sheet_names(file_path, sheet_names)
+    if use_profile_options:
+        named_profile = store.find_by_name(file_path)
+        if named_profile is not None:
+            profile_options = dict(named_profile.load_options)
+            if is_excel and profile_options.get("sheet_name") not in sheet_names:
+                profile_options.pop("sheet_name", None)
+            load_options.update(profile_options)
+    if is_excel:
+        load_options.setdefault("sheet_name", sheet_names[0])
+    job.report("Загрузка файла")
+    with job.diagnostics.span("load", size_bytes=os.path.getsize(file_path)) as span:
+        df, table_name = DataLoaderFactory().load_data(file_path=file_path, cache=cache, **load_options)
+        span.rows = len(df)
+    job.diagnostics.record_memory_usage("load", df)
+    profile = store.find(file_path, list(df.columns))
+    if profile is None:
+        job.report("Определение типов колонок")
+        with job.diagnostics.span("inference", rows=len(df)):
+            return DataProcessing(df, table_name.lower()), sheet_names, load_options, None
+    with job.diagnostics.span("profile", rows=len(df)):
+        columns = profile.get_columns(list(df.columns))
+        dp = DataProcessing(df, table_name.lower(), columns=columns)
+        if profile.table_name:
+            dp.table.name = profile.table_name
+    return dp, sheet_names, load_options, profile
+
+
+def add_render_spans(job: Job, stats: RenderStats, span, size_bytes: int) -> None:
+    """
+    Добавляет во вложенные этапы генерации время форматирования значений и шаблона из `RenderStats`
+    (они чередуются внутри `write_sql` и замеряются им самим).
+    """
+    span.rows = stats.rows
+    span.size_bytes = size_bytes
+    job.diagnostics.add("format", stats.format_seconds, rows=stats.rows)
+    job.diagnostics.add("render", stats.render_seconds, rows=stats.rows, size_bytes=size_bytes)
+
+
+def generate_sql(
+    job: Job,
+    data_processing: "DataProcessing",
+    sql_formatter: str
+) -> tuple[SQLDocument, RenderStats, ErrorCollector]:
+    """
+    Генерирует SQL скрипт для окна просмотра. Большой скрипт хранится во временном файле.
+    :param job: Фоновая задача
+    :param data_processing: Обработанные данные
+    :param sql_formatter: Тип SQL шаблона
+    :return: SQL скрипт, статистика генерации и ошибки форматирования
+    """
+    stats = RenderStats()
+    errors = ErrorCollector()
+    values = job.track(data_processing.iter_values(errors), stage="Генерация SQL", total=len(data_processing.table))
+    document = SQLDocument()
+    try:
+        with job.diagnostics.span("generate") as span:
+            SQLFormatterFactory().write_sql(
+                document,
+                table_name=data_processing.table.name,
+                columns=data_processing.valid_columns,
+                values=values,
+                sql_formatter=sql_formatter,
+                stats=stats
+            )
+            add_render_spans(job, stats, span, document.size_bytes)
+    except BaseException:
+        document.close()
+        raise
+    return document, stats, errors
+
+
+def save_sql(
+    job: Job,
+    data_processing: "DataProcessing",
+    sql_formatter: str,
+    file_path: str,
+    compression_level: int | None
+) -> tuple[SQLFileWriter, RenderStats, ErrorCollector]:
+    """
+    Генерирует SQL скрипт сразу в файл. Строки читаются, форматируются и записываются (со сжатием) одновременно
+    конвейером `SQLPipeline`. При отмене недописанный файл удаляется.
+    :param job: Фоновая задача
+    :param data_processing: Обработанные данные
+    :param sql_formatter: Тип SQL шаблона
+    :param file_path: Путь к файлу
+    :param compression_level: Уровень сжатия
+    :return: Записавший файл объект (с размерами), статистика генерации и ошибки форматирования
+    """
+    from services.pipeline import SQLPipeline
+
+    stats = RenderStats()
+    errors = ErrorCollector()
+    total = len(data_processing.table)
+    pipeline = SQLPipeline(data_processing, SQLFormatterFactory().get_renderer(sql_formatter))
+    job.report("Сохранение SQL", 0, total)
+    with job.diagnostics.span("generate") as span:
+        with SQLFileWriter(file_path, level=compression_level) as writer:
+            pipeline.write(
+                writer, errors, stats,
+                progress_callback=lambda rows: job.report("Сохранение SQL", rows, total)
+            )
+        add_render_spans(job, stats, span, writer.raw_bytes)
+        pipeline.add_spans(job.diagnostics)
+    return writer, stats, errors
+
+
+def save_document(job: Job, document: SQLDocument, file_path: str, compression_level: int | None) -> SQLFileWriter:
+    """
+    Сохраняет уже сгенерированный SQL скрипт в файл по частям. При отмене недописанный файл удаляется.
+    :param job: Фоновая задача
+    :param document: SQL скрипт
+    :param file_path: Путь к файлу
+    :param compression_level: Уровень сжатия
+    :return: Записавший файл объект (с размерами)
+    """
+    total = -(-document.size_bytes // SQLDocument.READ_CHUNK_BYTES)
+    with job.diagnostics.span("save", size_bytes=document.size_bytes):
+        with SQLFileWriter(file_path, level=compression_level) as writer:
+            for chunk in job.track(document.iter_chunks(), stage="Сохранение SQL", total=total, every=1):
+                writer.write(chunk)
+    return writer
+
+
+def save_shards(
+    job: Job,
+    data_processing: "DataProcessing",
+    writer: "SQLShardWriter"
+) -> tuple["ShardManifest", ErrorCollector]:
+    """
+    Разбивает SQL скрипт на файлы.
+    :param job: Фоновая задача
+    :param data_processing: Обработанные данные
+    :param writer: Настроенный объект разбиения
+    :return: Манифест шардов и ошибки форматирования
+    """
+    errors = ErrorCollector()
+    rows = job.track(data_processing.iter_rows(errors), stage="Разбиение SQL", total=len(data_processing.table))
+    with job.diagnostics.span("shards", rows=len(data_processing.table)):
+        return writer.write(data_processing.table.name, data_processing.valid_columns, rows), errors
+
+
+def convert_all_sheets(
+    job: Job,
+    converter: "WorkbookConverter",
+    destination: str,
+    mode: str
+) -> list["SheetResult"]:
+    """
+    Конвертирует все листы книги.
+    :param job: Фоновая задача
+    :param converter: Настроенный конвертер книги
+    :param destination: Путь к файлу или каталог
+    :param mode: Режим вывода
+    :return: Результаты по листам
+    """
+    job.report("Конвертация листов")
+
+    def on_sheet_converted(done: int, total: int, result: "SheetResult") -> None:
+        job.report("Конвертация листов", done, total)
+
+    with job.diagnostics.span("sheets") as span:
+        results = converter.convert(destination, mode=mode, progress_callback=on_sheet_converted)
+        span.rows = sum(result.rows for result in results)
+    return results
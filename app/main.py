@@ -1,4 +1,6 @@
 # main.py
+from multiprocessing import freeze_support
+
 from gui.main_window import MainWindow
 
 def main():
@@ -6,4 +8,5 @@ def main():
     app.mainloop()
 
 if __name__ == "__main__":
+    freeze_support()
     main()
@@ -1,9 +1,16 @@
 import os
 import tkinter as tk
+from collections import deque
 
-import pandas as pd
+from typing import TYPE_CHECKING
 
-from services import DataProcessing
+from models.column import Column
+from utils.diagnostics import Diagnostics
+from utils.logger import ErrorCollector
+
+if TYPE_CHECKING:
+    from services import DataProcessing, JobRunner, SQLDocument
+    from services.profiles import ColumnProfile
 
 
 class AppModel:
@@ -13,11 +20,27 @@ class AppModel:
         # Common
         self.file_path: str | None = None
         self.file_extension: str | None = None
-        self.data_processing: DataProcessing | None = None
-        self.column_settings: dict[str, str] = {}
-        self.sql_script: str = ""
-        self.errors: list[str] = []
+        self.data_processing: "DataProcessing | None" = None
+        self.job_runner: "JobRunner | None" = None
+        self.column_profile: "ColumnProfile | None" = None
+        self.sql_document: "SQLDocument | None" = None
+        self.errors: ErrorCollector = ErrorCollector()
+        # Diagnostics
+        self.diagnostics_history: deque[Diagnostics] = deque(maxlen=20)
+        self.profile_next_var: tk.BooleanVar = tk.BooleanVar(value=False)
+        self.trace_memory_var: tk.BooleanVar = tk.BooleanVar(value=False)
+        # Columns
+        self.column_filter_var: tk.StringVar = tk.StringVar(value="")
+        self.selected_columns: set[str] = set()
         self.sql_template_type_var: tk.StringVar = tk.StringVar(value="Тип 1")
+        self.compression_var: tk.StringVar = tk.StringVar(value="gzip")
+        self.compression_level_var: tk.IntVar = tk.IntVar(value=6)
+        # Shards
+        self.shard_strategy_var: tk.StringVar = tk.StringVar(value="По кругу")
+        self.shard_count_var: tk.IntVar = tk.IntVar(value=4)
+        self.shard_max_mb_var: tk.IntVar = tk.IntVar(value=100)
+        self.shard_keys_var: tk.StringVar = tk.StringVar(value="")
+        self.shard_compress_var: tk.BooleanVar = tk.BooleanVar(value=False)
         # CSV
         self.delimiter_var: tk.StringVar = tk.StringVar(value=";")
         self.header_var: tk.BooleanVar = tk.BooleanVar(value=True)
@@ -27,9 +50,37 @@ class AppModel:
 
     def get_sheet_names(self):
         if self.file_extension in {".xlsx", ".xls"}:
-            self.sheet_names = pd.ExcelFile(self.file_path).sheet_names
+            from services.load_data import LoadExcel
+            self.sheet_names = LoadExcel(self.file_path).get_sheet_names()
         self.selected_sheet_var.set(self.sheet_names[0])
 
+    def get_columns(self) -> list[Column]:
+        if self.data_processing is None:
+            return []
+        return self.data_processing.table.columns
+
+    def get_filtered_columns(self) -> list[Column]:
+        """
+        Возвращает колонки, имя которых (исходное или новое) содержит текст фильтра.
+        """
+        text = self.column_filter_var.get().strip().lower()
+        if not text:
+            return list(self.get_columns())
+        return [
+            column for column in self.get_columns()
+            if text in column.column_name.lower() or text in column.new_name.lower()
+        ]
+
+    def get_load_options(self) -> dict:
+        """
+        Возвращает параметры загрузки текущего файла (для профиля колонок).
+        """
+        if self.file_extension == ".csv":
+            return {"delimiter": self.delimiter_var.get(), "header": self.header_var.get()}
+        if self.file_extension in (".xlsx", ".xls"):
+            return {"sheet_name": self.selected_sheet_var.get()}
+        return {}
+
     def get_extension(self):
         try:
             self.file_extension = os.path.splitext(self.file_path)[1].lower()
@@ -7,7 +7,9 @@ class Column:
     :param new_name: Новое имя колонки (если None, то будет использоваться column_name)
     :param new_type: Новый тип колонки (если None, то будет использоваться column_type)
     :param include: Флаг, указывающий, должна ли колонка быть включена в результирующую таблицу
+    :param date_format: Закрепленный формат даты (для типов date и timestamp), проверяется первым
     """
+    __slots__ = ("column_name", "column_type", "new_name", "new_type", "include", "date_format")
 
     def __init__(
         self,
@@ -15,14 +17,16 @@ class Column:
         column_type: str,
         new_name: str | None = None,
         new_type: str | None = None,
-        include: bool = True
+        include: bool = True,
+        date_format: str | None = None
     ):
         self.column_name = column_name
         self.column_type = column_type
         self.new_name = new_name if new_name else column_name.lower()
         self.new_type = new_type if new_type else column_type.lower()
         self.include = include
+        self.date_format = date_format
 
     def __repr__(self):
         return (f"Column(name={self.column_name}, type={self.column_type}, new_name={self.new_name}, new_type="
-                f"{self.new_type}, include={self.include})")
+                f"{self.new_type}, include={self.include}, date_format={self.date_format})")
@@ -1,21 +1,172 @@
-import pandas as pd
+from typing import TYPE_CHECKING, Callable, Iterator
 
 from .column import Column
 
+if TYPE_CHECKING:
+    import pandas as pd
+    from services.arrow_storage import ArrowData
+
+
+class ColumnPlan:
+    """
+    Неизменяемый план форматирования включенных колонок: позиции колонок в DataFrame, функции
+    форматирования (по значениям и векторные, если они есть для типа), типы и имена в SQL. Строится один раз
+    на генерацию, чтобы в цикле по строкам не обращаться к атрибутам колонок и не искать значения по имени.
+
+    :param positions: Позиции колонок в DataFrame
+    :param formatters: Функции форматирования значений
+    :param column_formatters: Функции векторного форматирования колонки целиком (None — нет для типа)
+    :param types: Типы форматирования (для сообщений об ошибках)
+    :param output_names: Имена колонок в SQL
+    :param key: Настройки колонок, по которым построен план
+    """
+    __slots__ = ("positions", "formatters", "column_formatters", "types", "output_names", "key")
+
+    def __init__(
+        self,
+        positions: tuple[int, ...],
+        formatters: tuple[Callable[[any], str], ...],
+        column_formatters: tuple[Callable | None, ...],
+        types: tuple[str, ...],
+        output_names: tuple[str, ...],
+        key: tuple
+    ):
+        object.__setattr__(self, "positions", positions)
+        object.__setattr__(self, "formatters", formatters)
+        object.__setattr__(self, "column_formatters", column_formatters)
+        object.__setattr__(self, "types", types)
+        object.__setattr__(self, "output_names", output_names)
+        object.__setattr__(self, "key", key)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ColumnPlan нельзя изменить")
+
+    @staticmethod
+    def get_key(columns: list[Column]) -> tuple:
+        return tuple(
+            (column.column_name, column.new_name, column.new_type, column.include, column.date_format)
+            for column in columns
+        )
+
+    @classmethod
+    def from_columns(cls, columns: list[Column], column_names: list | None = None) -> "ColumnPlan":
+        """
+        Строит план по настройкам колонок.
+        :param columns: Колонки таблицы
+        :param column_names: Имена колонок DataFrame по порядку (None — колонки идут в порядке `columns`)
+        :return: План колонок
+        :raises UnknownColumnTypeError: Если у включенной колонки неизвестный тип
+        """
+        from utils.value_formatter import ValueFormatterFactory
+
+        factory = ValueFormatterFactory()
+        if column_names is None:
+            column_names = [column.column_name for column in columns]
+        positions = {name: position for position, name in enumerate(column_names)}
+        included = [column for column in columns if column.include]
+        return cls(
+            positions=tuple(positions[column.column_name] for column in included),
+            formatters=tuple(factory.get_formatter(column.new_type, column.date_format) for column in included),
+            column_formatters=tuple(factory.get_column_formatter(column.new_type) for column in included),
+            types=tuple(column.new_type for column in included),
+            output_names=tuple(column.new_name for column in included),
+            key=cls.get_key(columns)
+        )
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __repr__(self):
+        return f"ColumnPlan(output_names={self.output_names!r}, types={self.types!r})"
+
 
 class Table:
     """
     Класс, представляющий таблицу в базе данных.
+    Данные хранятся в DataFrame или в Arrow (`arrow`); для Arrow DataFrame строится только при обращении к `data`
+    (его используют окно приложения и оценка генерации), а форматирование читает строки через `iter_rows`.
 
     :param name: Название таблицы
     :param columns: Список столбцов таблицы
     :param data: Данные таблицы
+    :param arrow: Данные таблицы в Arrow (вместо `data`)
     """
 
-    def __init__(self, name: str, columns: list[Column] = None, data: pd.DataFrame = None):
+    def __init__(
+        self,
+        name: str,
+        columns: list[Column] = None,
+        data: "pd.DataFrame" = None,
+        arrow: "ArrowData | None" = None
+    ):
         self.name = name
         self.columns = columns if columns else []
-        self.data = data
+        self.arrow = arrow
+        self._data = data
+        self._plan: ColumnPlan | None = None
+
+    @property
+    def data(self) -> "pd.DataFrame | None":
+        if self._data is None and self.arrow is not None:
+            self._data = self.arrow.to_pandas()
+        return self._data
+
+    @data.setter
+    def data(self, data: "pd.DataFrame | None") -> None:
+        self._data = data
+
+    @property
+    def plan(self) -> ColumnPlan:
+        """
+        Возвращает план форматирования колонок. План перестраивается, только если изменились
+        настройки колонок (имя, тип, включение, формат даты) или список колонок.
+        :return: План колонок
+        :raises UnknownColumnTypeError: Если у включенной колонки неизвестный тип
+        """
+        if self._plan is None or self._plan.key != ColumnPlan.get_key(self.columns):
+            # В Arrow имена колонок хранятся строками, а колонки таблицы идут в порядке колонок данных
+            column_names = list(self._data.columns) if self.arrow is None and self._data is not None else None
+            self._plan = ColumnPlan.from_columns(self.columns, column_names)
+        return self._plan
+
+    def iter_rows(self, positions: tuple[int, ...]) -> Iterator[tuple]:
+        """
+        Возвращает строки с значениями колонок `positions` (в этом порядке) в виде объектов Python.
+        :param positions: Позиции колонок (например, `plan.positions`)
+        :return: Итератор кортежей значений
+        """
+        if not positions:
+            return (() for _ in range(len(self)))
+        if self.arrow is not None:
+            return self.arrow.iter_rows(positions)
+        return zip(*(self._data.iloc[:, position] for position in positions))
+
+    def get_series(self, positions: tuple[int, ...]) -> list["pd.Series"]:
+        """
+        Возвращает колонки `positions` (в этом порядке) для векторного форматирования.
+        :param positions: Позиции колонок (например, `plan.positions`)
+        :return: Список колонок
+        """
+        if self.arrow is not None:
+            return self.arrow.get_series(positions)
+        return [self._data.iloc[:, position] for position in positions]
+
+    def slice(self, start: int, stop: int) -> "Table":
+        """
+        Возвращает таблицу со строками [start, stop) и теми же колонками.
+        Срез Arrow не копирует данные, срез DataFrame — представление исходного DataFrame.
+        :param start: Первая строка
+        :param stop: Строка после последней
+        :return: Таблица
+        """
+        if self.arrow is not None:
+            return Table(self.name, self.columns, arrow=self.arrow.slice(start, stop))
+        return Table(self.name, self.columns, data=self._data.iloc[start:stop])
+
+    def __len__(self):
+        if self.arrow is not None:
+            return len(self.arrow)
+        return len(self._data) if self._data is not None else 0
 
     def __repr__(self):
-        return f"Table(name={self.name!r}, columns={self.columns!r}, data={self.data!r})"
+        return f"Table(name={self.name!r}, columns={self.columns!r}, data={self.arrow or self._data!r})"
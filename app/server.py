@@ -0,0 +1,60 @@
+# server.py
+"""
+Локальный HTTP сервис Tab2SQL для внутренних инструментов (без графического интерфейса).
+
+    python server.py --port 8765 --workers 2 --root /data/exports
+
+    curl --data-binary @data.csv "http://127.0.0.1:8765/convert?delimiter=;&template=Тип 1" -o data.sql
+    curl -H "Content-Type: application/json" -d '{"path": "data.csv", "plan": {"types": {"id": "int"}}}' \\
+        http://127.0.0.1:8765/convert
+    curl http://127.0.0.1:8765/status
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="tab2sql-server", description="HTTP сервис преобразования CSV и Excel в SQL")
+    parser.add_argument("--host", default="127.0.0.1", help="Адрес (по умолчанию только локальный)")
+    parser.add_argument("--port", type=int, default=8765, help="Порт (по умолчанию 8765)")
+    parser.add_argument("--workers", type=int, default=2, help="Количество рабочих процессов")
+    parser.add_argument("--max-queue", type=int, default=16,
+                        help="Количество запросов, ожидающих рабочий процесс (сверх — 503)")
+    parser.add_argument("--root", help="Папка, из которой разрешено читать файлы по пути (path в JSON)")
+    parser.add_argument("--max-body-mb", type=int, default=512, help="Максимальный размер загружаемого файла, МБ")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Не выводить журнал запросов")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if hasattr(sys.stderr, "reconfigure"):
+        sys.stderr.reconfigure(encoding="utf-8")
+
+    from services.http_service import ConversionService
+
+    def log(message: str) -> None:
+        if not args.quiet:
+            sys.stderr.write(f"{time.strftime('%H:%M:%S')} {message}\n")
+            sys.stderr.flush()
+
+    service = ConversionService(
+        host=args.host,
+        port=args.port,
+        workers=max(1, args.workers),
+        max_queue=max(0, args.max_queue),
+        allowed_root=args.root,
+        max_body_bytes=args.max_body_mb * 1024 * 1024,
+        log=log
+    )
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        log("Сервис остановлен")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,30 @@
-from .data_processing import DataProcessing
-from .load_data import DataLoaderFactory
+# Сервисы импортируются лениво (PEP 562): pandas и openpyxl загружаются только при первом
+# обращении к сервисам, которые их используют, а не при запуске приложения.
+import importlib
 
-__all__ = [
-    "DataProcessing",
-    "DataLoaderFactory",
-]
+_EXPORTS: dict[str, str] = {
+    "ConversionService": ".http_service",
+    "DataProcessing": ".data_processing",
+    "DataLoaderFactory": ".load_data",
+    "FolderWatcher": ".watcher",
+    "Job": ".jobs",
+    "JobRunner": ".jobs",
+    "SQLDocument": ".sql_document",
+    "SQLFileWriter": ".output",
+    "SQLShardWriter": ".sharding",
+    "WorkbookConverter": ".workbook",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,111 @@
+from typing import Iterator
+
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+from utils.errors import ArrowNotAvailableError
+
+
+class ArrowData:
+    """
+    Данные таблицы в `pyarrow.Table`: строки хранятся компактно (без объекта Python на каждое значение),
+    срезы и выбор колонок не копируют данные, а значения превращаются в объекты Python
+    только пачками и только для включенных колонок. DataFrame строится по запросу (для окна приложения).
+
+    Строковые колонки DataFrame (dtype object) хранятся как строки: все функции форматирования приводят
+    значение к строке, поэтому результат форматирования не меняется.
+
+    :param table: Таблица pyarrow
+    """
+    BATCH_ROWS = 65536
+
+    def __init__(self, table: "pyarrow.Table"):
+        self.table = table
+
+    @staticmethod
+    def is_available() -> bool:
+        return pyarrow is not None
+
+    @classmethod
+    def from_dataframe(cls, dataframe: pd.DataFrame) -> "ArrowData":
+        """
+        Создает хранилище по DataFrame загрузчика (с заполненными пропусками "NULL").
+        :param dataframe: DataFrame
+        :return: Данные в pyarrow
+        :raises ArrowNotAvailableError: Если pyarrow не установлен
+        """
+        cls._check_available()
+        arrays = [
+            pyarrow.array(series.astype(str) if series.dtype == object else series, from_pandas=True)
+            for _, series in dataframe.items()
+        ]
+        return cls(pyarrow.Table.from_arrays(arrays, names=[str(name) for name in dataframe.columns]))
+
+    @classmethod
+    def read_ipc(cls, file_path: str) -> "ArrowData":
+        """
+        Открывает файл Arrow IPC через отображение в память: данные читаются с диска по мере обращения.
+        :param file_path: Путь к файлу
+        :return: Данные в pyarrow
+        :raises ArrowNotAvailableError: Если pyarrow не установлен
+        """
+        cls._check_available()
+        with pyarrow.memory_map(file_path, "r") as source:
+            return cls(pyarrow.ipc.open_file(source).read_all())
+
+    def write_ipc(self, file_path: str) -> None:
+        """
+        Записывает данные в файл Arrow IPC.
+        :param file_path: Путь к файлу
+        """
+        with pyarrow.OSFile(file_path, "wb") as sink:
+            with pyarrow.ipc.new_file(sink, self.table.schema) as writer:
+                writer.write_table(self.table, max_chunksize=self.BATCH_ROWS)
+
+    @property
+    def column_names(self) -> list[str]:
+        return self.table.column_names
+
+    def slice(self, start: int, stop: int) -> "ArrowData":
+        """
+        Возвращает срез строк без копирования данных.
+        """
+        return ArrowData(self.table.slice(start, max(0, stop - start)))
+
+    def iter_rows(self, positions: tuple[int, ...], batch_rows: int = BATCH_ROWS) -> Iterator[tuple]:
+        """
+        Возвращает строки с значениями колонок `positions` (в этом порядке). Колонки выбираются без копирования,
+        а в объекты Python превращается одна пачка строк за раз.
+        :param positions: Позиции колонок
+        :param batch_rows: Количество строк в пачке
+        :return: Итератор кортежей значений
+        """
+        for batch in self.table.select(list(positions)).to_batches(max_chunksize=batch_rows):
+            yield from zip(*(column.to_pylist() for column in batch.columns))
+
+    def get_series(self, positions: tuple[int, ...]) -> list[pd.Series]:
+        """
+        Возвращает колонки `positions` (в этом порядке) в виде pandas.Series.
+        :param positions: Позиции колонок
+        :return: Список колонок
+        """
+        return [self.table.column(position).to_pandas() for position in positions]
+
+    def to_pandas(self) -> pd.DataFrame:
+        return self.table.to_pandas()
+
+    @staticmethod
+    def _check_available() -> None:
+        if pyarrow is None:
+            raise ArrowNotAvailableError("Для хранения данных в Arrow установите пакет pyarrow")
+
+    def __len__(self):
+        return self.table.num_rows
+
+    def __repr__(self):
+        return f"ArrowData(rows={self.table.num_rows}, columns={self.table.num_columns})"
@@ -1,10 +1,14 @@
+from typing import Iterator
+
 import pandas as pd
 
 from models.column import Column
-from models.table import Table
-from utils import ValueFormatterFactory
-from utils.errors import TypeNotFoundError, FailedValueFormattingError
-from utils.logger import log_error, VALUE_FORMATTER_ERRORS
+from models.table import ColumnPlan, Table
+from services.estimator import GenerationEstimate, GenerationEstimator
+from services.validation import SampleValidator, ValidationReport
+from utils import ValueFormatterFactory, SQLFormatterFactory
+from utils.errors import TypeNotFoundError, StorageNotFoundError, FailedValueFormattingError, ColumnOverrideError
+from utils.logger import ErrorCollector
 
 
 class DataProcessing:
@@ -12,10 +16,24 @@ class DataProcessing:
     Класс для обработки полученных данных и получения валидных колонок и значений.
     :param dataframe: DataFrame с данными.
     :param table_name: Название таблицы (для SQL запроса).
+    :param columns: Готовые настройки колонок (например, из профиля); типы по DataFrame не определяются.
+    :param storage: Хранение данных: "pandas" (DataFrame) или "arrow" (pyarrow, DataFrame строится по запросу).
     """
+    STORAGES = ("pandas", "arrow")
+    # Количество строк, которые форматируются за один проход по колонкам
+    BATCH_ROWS = 10000
 
-    def __init__(self, dataframe: pd.DataFrame, table_name: str) -> None:
-        self.table = self._get_table(dataframe=dataframe, table_name=table_name)
+    def __init__(
+        self,
+        dataframe: pd.DataFrame,
+        table_name: str,
+        columns: list[Column] | None = None,
+        storage: str = "pandas"
+    ) -> None:
+        self.table = self._get_table(dataframe=dataframe, table_name=table_name, columns=columns, storage=storage)
+        # Имя таблицы по файлу или листу: отличие от него означает, что пользователь переименовал таблицу
+        self.source_table_name = table_name
+        self.errors = ErrorCollector()
 
     @property
     def table_name(self) -> str:
@@ -40,65 +58,199 @@ class DataProcessing:
         который включен в `valid_columns`. Каждая строка имеет вид "(val_1, val_2, ...)".
         :return: Список строк.
         """
-        return [
-            self._format_row(row, index)
-            for index, (_, row) in enumerate(self.table.data.iterrows(), start=1)
-        ]
+        return list(self.iter_values())
 
-    def _format_row(self, row: pd.Series, row_number: int) -> str:
+    def iter_values(self, errors: ErrorCollector | None = None) -> Iterator[str]:
+        """
+        Лениво форматирует строки таблицы для потоковой генерации SQL.
+        :param errors: Сборщик ошибок форматирования (None — `self.errors`).
+        :return: Итератор строк вида "(val_1, val_2, ...)".
+        """
+        for rows in self._iter_batches(errors):
+            for row_values in rows:
+                yield f"({', '.join(row_values)})"
+
+    def iter_rows(self, errors: ErrorCollector | None = None) -> Iterator[list[str]]:
+        """
+        Лениво форматирует строки таблицы, возвращая значения по отдельности
+        (например, для распределения строк по шардам по ключевым колонкам).
+        :param errors: Сборщик ошибок форматирования (None — `self.errors`).
+        :return: Итератор списков форматированных значений.
         """
-        Форматирует `pd.Series` в строку, содержащую форматированные значения для каждого столбца,
-        который включен в `valid_columns`.
-        :param row: Строка `pd.Series` для форматирования.
-        :param row_number: Номер строки.
-        :return: Строка вида "(val_1, val_2, ...)".
+        for rows in self._iter_batches(errors):
+            for row_values in rows:
+                yield list(row_values)
+
+    def estimate(self, sql_formatter: str = 'Тип 1', sample_size: int = 1000) -> GenerationEstimate:
+        """
+        Оценивает размер SQL скрипта и время генерации по стратифицированной выборке строк,
+        отформатированной через текущие настройки колонок.
+        :param sql_formatter: Тип SQL шаблона.
+        :param sample_size: Размер выборки.
+        :return: Оценка генерации.
+        """
+        estimator = GenerationEstimator(self.table, self.format_columns, sample_size=sample_size)
+        return estimator.estimate(SQLFormatterFactory().get_renderer(sql_formatter))
+
+    def validate(
+        self,
+        sample_size: int = SampleValidator.SAMPLE_SIZE,
+        threshold: float = SampleValidator.THRESHOLD
+    ) -> ValidationReport:
+        """
+        Проверяет настройки колонок на случайной выборке значений перед генерацией:
+        для каждой включенной колонки считается доля значений, которые не удалось отформатировать.
+        :param sample_size: Количество значений в выборке каждой колонки.
+        :param threshold: Допустимая доля ошибок в колонке.
+        :return: Результат проверки.
+        """
+        return SampleValidator(self.table, sample_size=sample_size, threshold=threshold).validate()
+
+    def pin_date_formats(self, sample_size: int = 200) -> None:
+        """
+        Закрепляет формат даты для колонок типа date и timestamp по выборке значений,
+        чтобы при форматировании не перебирать все известные форматы.
+        :param sample_size: Количество непустых значений в выборке.
         """
-        row_values = []
         for column in self.table.columns:
-            if column.include:
-                value = row[column.column_name]
-                formatted_value = self._get_formatted_value(
-                    column_type=column.new_type,
-                    input_value=value,
-                    row_number=row_number,
-                    column_name=column.new_name
-                )
-                row_values.append(formatted_value)
-        return f"({', '.join(row_values)})"
+            if column.new_type in ("date", "timestamp"):
+                series = self.table.data[column.column_name]
+                # Пропуски при загрузке заменены строкой «NULL»: по ним формат даты не определить
+                values = series[series.notna() & (series != "NULL")].head(sample_size).tolist()
+                column.date_format = ValueFormatterFactory.detect_date_format(values)
+
+    def apply_overrides(self, types: dict[str, str], names: dict[str, str], exclude: list[str]) -> None:
+        """
+        Применяет переопределения типов, имен и исключения к колонкам таблицы.
+        Колонка ищется по исходному имени, затем по имени в нижнем регистре.
+        :param types: Типы по колонкам (ключ типа или его название).
+        :param names: Новые имена по колонкам.
+        :param exclude: Исключаемые колонки.
+        :raises ColumnOverrideError: Если колонка или тип не найдены.
+        """
+        valid_types = ValueFormatterFactory().types
+        type_keys = {key.lower(): key for key in valid_types}
+        type_keys.update({display.lower(): key for key, display in valid_types.items()})
+
+        def find_column(name: str) -> Column:
+            for column in self.table.columns:
+                if column.column_name == name or str(column.column_name).lower() == name.lower():
+                    return column
+            raise ColumnOverrideError(f"Колонка «{name}» не найдена")
+
+        for name, column_type in types.items():
+            if column_type.lower() not in type_keys:
+                raise ColumnOverrideError(f"Неизвестный тип «{column_type}» для колонки «{name}»")
+            find_column(name).new_type = type_keys[column_type.lower()]
+        for name, new_name in names.items():
+            find_column(name).new_name = new_name
+        for name in exclude:
+            find_column(name).include = False
+
+    def reset_columns(self) -> None:
+        """
+        Сбрасывает настройки колонок к типам, определенным по DataFrame.
+        """
+        self.table.columns = self._get_columns(self.table.data)
+
+    def _iter_batches(self, errors: ErrorCollector | None = None) -> Iterator[list[tuple[str, ...]]]:
+        """
+        Форматирует таблицу пачками по `BATCH_ROWS` строк.
+        :param errors: Сборщик ошибок форматирования (None — `self.errors`).
+        :return: Итератор пачек форматированных строк.
+        """
+        errors = errors if errors is not None else self.errors
+        plan = self.table.plan
+        for start in range(0, len(self.table), self.BATCH_ROWS):
+            batch = self.table.slice(start, start + self.BATCH_ROWS)
+            yield self.format_columns(batch.get_series(plan.positions), len(batch), start + 1, errors, plan)
 
     @staticmethod
-    def _get_formatted_value(column_type: str, input_value: any, row_number: int, column_name: str) -> str:
-        """
-        Форматирует значение input_value в строку, используя column_type
-        :param column_type: Тип для форматирования
-        :param input_value: Значение для форматирования
-        :param row_number: Номер строки (для error message)
-        :param column_name: Имя столбца (для error message)
-        :return: Форматированное значение
-        """
-        try:
-            return ValueFormatterFactory().get_value(column_type, input_value)
-        except (ValueError, TypeError, FailedValueFormattingError):
-            readable_type = ValueFormatterFactory().types[column_type]
-            message = (
-                f"Ошибка преобразования [{row_number}, {column_name}]: "
-                f"входное значение «{input_value}» в тип «{readable_type}»")
-            log_error(logger=VALUE_FORMATTER_ERRORS, message=message)
-            return str("NULL")
-
-    def _get_table(self, dataframe: pd.DataFrame, table_name: str) -> Table:
+    def format_columns(
+        columns: list[pd.Series],
+        rows: int,
+        first_row_number: int,
+        errors: ErrorCollector,
+        plan: ColumnPlan
+    ) -> list[tuple[str, ...]]:
+        """
+        Форматирует пачку строк по колонкам: колонки с векторным форматированием (см. `ColumnFormatter`)
+        форматируются целиком, по одному — только значения, которые не удалось преобразовать векторно,
+        и колонки остальных типов. Ошибки добавляются в порядке строк, как при форматировании по строкам.
+        :param columns: Значения включенных колонок пачки (в порядке плана колонок).
+        :param rows: Количество строк в пачке.
+        :param first_row_number: Номер первой строки пачки.
+        :param errors: Сборщик ошибок форматирования.
+        :param plan: План колонок.
+        :return: Список строк пачки с форматированными значениями.
+        """
+        if not columns:
+            return [()] * rows
+        formatted_columns = []
+        failures = []
+        for index, (series, formatter, column_formatter) in enumerate(
+            zip(columns, plan.formatters, plan.column_formatters)
+        ):
+            result = column_formatter(series) if column_formatter is not None else None
+            if result is None:
+                formatted = []
+                for position, value in enumerate(series.tolist()):
+                    try:
+                        formatted.append(formatter(value))
+                    except (ValueError, TypeError, FailedValueFormattingError):
+                        failures.append((position, index, value))
+                        formatted.append("NULL")
+            else:
+                formatted, positions = result
+                for position, value in zip(positions, series.iloc[positions].tolist() if positions else ()):
+                    try:
+                        formatted[position] = formatter(value)
+                    except (ValueError, TypeError, FailedValueFormattingError):
+                        failures.append((position, index, value))
+                        formatted[position] = "NULL"
+            formatted_columns.append(formatted)
+        for position, index, value in sorted(failures, key=lambda failure: failure[:2]):
+            errors.add(first_row_number + position, plan.output_names[index], plan.types[index], value)
+        return list(zip(*formatted_columns))
+
+    def _get_table(
+        self,
+        dataframe: pd.DataFrame,
+        table_name: str,
+        columns: list[Column] | None = None,
+        storage: str = "pandas"
+    ) -> Table:
         """
         Возвращает экземпляр Table, содержащий информацию о столбцах
         и данных DataFrame.
         :param dataframe: DataFrame с данными.
         :param table_name: Название таблицы (для SQL запроса).
+        :param columns: Готовые настройки колонок (None — определить по типам DataFrame).
+        :param storage: Хранение данных ("pandas" или "arrow").
         :return: Экземпляр Table.
+        :raises StorageNotFoundError: Если передан неизвестный способ хранения.
+        :raises ArrowNotAvailableError: Если для хранения в Arrow не установлен pyarrow.
+        """
+        if storage not in self.STORAGES:
+            raise StorageNotFoundError(f"Неизвестный способ хранения данных: {storage}")
+        if columns is None:
+            columns = self._get_columns(dataframe)
+        if storage == "arrow":
+            from services.arrow_storage import ArrowData
+            return Table(name=table_name, columns=columns, arrow=ArrowData.from_dataframe(dataframe))
+        return Table(name=table_name, columns=columns, data=dataframe)
+
+    def _get_columns(self, dataframe: pd.DataFrame) -> list[Column]:
+        """
+        Определяет типы колонок по типам pandas.
+        :param dataframe: DataFrame с данными.
+        :return: Список колонок.
         """
         columns = []
         for column in dataframe.columns:
             column_type = self._pd_type_determinator(str(dataframe[column].dtype))
             columns.append(Column(column_name=column, column_type=column_type))
-        return Table(name=table_name, columns=columns, data=dataframe)
+        return columns
 
     @staticmethod
     def _pd_type_determinator(input_type: str) -> str:
@@ -0,0 +1,194 @@
+import random
+import time
+from typing import Callable
+
+from models.table import ColumnPlan, Table
+from utils.logger import ErrorCollector
+from utils.sql_formatter import SQLRenderer, RenderStats
+
+
+class ColumnEstimate:
+    """
+    Оценка форматирования одной колонки по выборке.
+    :param column_name: Имя колонки в SQL
+    :param column_type: Тип форматирования
+    """
+
+    def __init__(self, column_name: str, column_type: str):
+        self.column_name = column_name
+        self.column_type = column_type
+        self.values = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.failures = 0
+
+    @property
+    def bytes_per_value(self) -> float:
+        return self.bytes / self.values if self.values else 0.0
+
+    @property
+    def us_per_value(self) -> float:
+        return self.seconds * 1_000_000 / self.values if self.values else 0.0
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failures / self.values if self.values else 0.0
+
+    def __repr__(self):
+        return (f"ColumnEstimate(column_name={self.column_name!r}, bytes_per_value={self.bytes_per_value:.1f}, "
+                f"us_per_value={self.us_per_value:.2f}, failure_rate={self.failure_rate:.3f})")
+
+
+class GenerationEstimate:
+    """
+    Оценка размера и времени генерации SQL скрипта, экстраполированная по выборке строк.
+    :param rows: Количество строк в таблице
+    :param sample_rows: Количество строк в выборке
+    :param columns: Оценки по колонкам
+    """
+
+    def __init__(self, rows: int, sample_rows: int, columns: list[ColumnEstimate]):
+        self.rows = rows
+        self.sample_rows = sample_rows
+        self.columns = columns
+        self.bytes_per_row = 0.0
+        self.us_per_row = 0.0
+        self.render_us_per_row = 0.0
+        self.fixed_bytes = 0
+
+    @property
+    def estimated_bytes(self) -> int:
+        return int(self.fixed_bytes + self.bytes_per_row * self.rows)
+
+    @property
+    def estimated_seconds(self) -> float:
+        return (self.us_per_row + self.render_us_per_row) * self.rows / 1_000_000
+
+    def __repr__(self):
+        return (f"GenerationEstimate(rows={self.rows}, sample_rows={self.sample_rows}, "
+                f"estimated_bytes={self.estimated_bytes}, estimated_seconds={self.estimated_seconds:.2f})")
+
+
+class GenerationEstimator:
+    """
+    Оценивает итоговый размер SQL скрипта и время генерации: форматирует стратифицированную
+    выборку строк пачкой по колонкам, как при генерации, и экстраполирует результат на всю таблицу.
+
+    :param table: Таблица с данными и настройками колонок
+    :param format_columns: Функция форматирования пачки по колонкам (columns, rows, first_row_number, errors,
+                           plan), см. `DataProcessing.format_columns`
+    :param sample_size: Размер выборки
+    :param strata: Количество равных по длине участков таблицы, из которых берется выборка
+    :param seed: Зерно генератора случайных чисел (для воспроизводимости)
+    """
+
+    def __init__(
+        self,
+        table: Table,
+        format_columns: Callable[[list, int, int, ErrorCollector, ColumnPlan], list[tuple[str, ...]]],
+        sample_size: int = 1000,
+        strata: int = 10,
+        seed: int = 0
+    ):
+        self.table = table
+        self.format_columns = format_columns
+        self.sample_size = sample_size
+        self.strata = strata
+        self.seed = seed
+
+    def estimate(self, renderer: SQLRenderer) -> GenerationEstimate:
+        """
+        Форматирует выборку и возвращает оценку.
+        :param renderer: Скомпилированный SQL шаблон
+        :return: Оценка генерации
+        """
+        data = self.table.data
+        positions = self.get_sample_positions(len(data))
+        plan = self.table.plan
+        sample = data.iloc[positions].reset_index(drop=True)
+        estimates = [
+            ColumnEstimate(column_name, column_type) for column_name, column_type in zip(plan.output_names, plan.types)
+        ]
+        result = GenerationEstimate(rows=len(data), sample_rows=len(positions), columns=estimates)
+
+        # Каждая колонка форматируется отдельно, чтобы получить время по колонкам;
+        # ошибки выборки собираются отдельно и не попадают в ошибки генерации
+        formatted_columns = []
+        for index, estimate in enumerate(estimates):
+            errors = ErrorCollector(max_examples=0)
+            column_plan = self._get_column_plan(plan, index)
+            series = sample.iloc[:, plan.positions[index]]
+            started = time.perf_counter()
+            formatted = [row[0] for row in self.format_columns([series], len(sample), 1, errors, column_plan)]
+            estimate.seconds = time.perf_counter() - started
+            estimate.values = len(formatted)
+            estimate.bytes = sum(len(value.encode("utf-8")) for value in formatted)
+            estimate.failures = errors.total
+            formatted_columns.append(formatted)
+
+        started = time.perf_counter()
+        if formatted_columns:
+            sample_values = [f"({', '.join(row_values)})" for row_values in zip(*formatted_columns)]
+        else:
+            sample_values = ["()"] * len(sample)
+        format_seconds = time.perf_counter() - started + sum(estimate.seconds for estimate in estimates)
+
+        stats = RenderStats()
+        renderer.render(self.table.name, list(plan.output_names), sample_values, stats=stats)
+        if sample_values:
+            result.us_per_row = format_seconds * 1_000_000 / len(sample_values)
+            result.render_us_per_row = stats.render_seconds * 1_000_000 / len(sample_values)
+            row_bytes = sum(len(value.encode("utf-8")) for value in sample_values) / len(sample_values)
+            result.bytes_per_row = row_bytes + len(renderer.template.row_separator.encode("utf-8"))
+        result.fixed_bytes = self._get_fixed_bytes(renderer, list(plan.output_names), len(data))
+        return result
+
+    def get_sample_positions(self, rows: int) -> list[int]:
+        """
+        Возвращает позиции строк стратифицированной выборки: таблица делится на `strata` равных участков,
+        из каждого берется одинаковое количество случайных строк.
+        :param rows: Количество строк в таблице
+        :return: Отсортированный список позиций
+        """
+        if rows <= self.sample_size:
+            return list(range(rows))
+        generator = random.Random(self.seed)
+        strata = max(1, min(self.strata, self.sample_size))
+        per_stratum = self.sample_size // strata
+        positions = []
+        for index in range(strata):
+            start = rows * index // strata
+            stop = rows * (index + 1) // strata
+            positions.extend(generator.sample(range(start, stop), min(per_stratum, stop - start)))
+        return sorted(positions)
+
+    def _get_fixed_bytes(self, renderer: SQLRenderer, columns: list[str], rows: int) -> int:
+        """
+        Возвращает размер частей скрипта, не зависящих от количества значений:
+        преамбула, заголовки INSERT и завершения операторов.
+        """
+        template = renderer.template
+        statements = 1
+        if template.batch_size and rows:
+            statements = -(-rows // template.batch_size)
+        statement = renderer.header(self.table.name, columns) + template.suffix
+        return (
+            len(renderer.preamble(self.table.name).encode("utf-8"))
+            + statements * len(statement.encode("utf-8"))
+            + (statements - 1) * len(template.statement_separator.encode("utf-8"))
+            - (statements if rows else 0) * len(template.row_separator.encode("utf-8"))
+        )
+
+    @staticmethod
+    def _get_column_plan(plan: ColumnPlan, index: int) -> ColumnPlan:
+        """
+        Возвращает план из одной колонки `index` плана `plan`.
+        """
+        return ColumnPlan(
+            positions=(plan.positions[index],),
+            formatters=(plan.formatters[index],),
+            column_formatters=(plan.column_formatters[index],),
+            types=(plan.types[index],),
+            output_names=(plan.output_names[index],),
+            key=plan.key
+        )
@@ -0,0 +1,563 @@
+import asyncio
+import functools
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable
+from urllib.parse import parse_qsl, urlsplit
+
+from utils.errors import (
+    LoadDataError,
+    SQLFormatterError,
+    SQLOutputError,
+    JobCancelledError,
+    ColumnOverrideError,
+    BadRequestError,
+    PayloadTooLargeError,
+    PathNotAllowedError,
+    ServiceBusyError,
+)
+
+# HTTP статусы ошибок (проверяются по порядку, первый подходящий класс)
+ERROR_STATUSES: tuple[tuple[type[Exception], int], ...] = (
+    (BadRequestError, 400),
+    (PathNotAllowedError, 403),
+    (PayloadTooLargeError, 413),
+    (ServiceBusyError, 503),
+    (LoadDataError, 422),
+    (ColumnOverrideError, 422),
+    (SQLFormatterError, 422),
+    (SQLOutputError, 422),
+)
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+FILE_FORMATS = ("csv", "xlsx", "xls")
+
+
+def get_error_status(error: Exception) -> int:
+    """
+    Возвращает HTTP статус для исключения.
+    :param error: Исключение
+    :return: HTTP статус
+    """
+    for error_type, status in ERROR_STATUSES:
+        if isinstance(error, error_type):
+            return status
+    return 500
+
+
+class ConversionTask:
+    """
+    Задание на конвертацию одного запроса (передается в рабочий процесс).
+    :param file_path: Путь к файлу (загруженному во временный файл или указанному в запросе)
+    :param sql_formatter: Тип SQL шаблона
+    :param table_name: Имя таблицы (None — имя файла или листа)
+    :param load_options: Параметры загрузки (delimiter, header, sheet_name)
+    :param plan: План колонок {"types": {...}, "names": {...}, "exclude": [...]}
+    """
+
+    def __init__(self, file_path: str, sql_formatter: str, table_name: str | None, load_options: dict, plan: dict):
+        self.file_path = file_path
+        self.sql_formatter = sql_formatter
+        self.table_name = table_name
+        self.load_options = load_options
+        self.plan = plan
+
+
+class _ChannelWriter:
+    """
+    Поток с методом `write`, который отправляет SQL в очередь частями по `chunk_bytes`.
+    Если клиент отключился (`cancelled` установлен), генерация прерывается.
+    """
+
+    def __init__(self, channel, cancelled, chunk_bytes: int):
+        self.channel = channel
+        self.cancelled = cancelled
+        self.chunk_bytes = chunk_bytes
+        self.size_bytes = 0
+        self._parts: list[str] = []
+        self._buffered = 0
+
+    def write(self, text: str) -> int:
+        self._parts.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.chunk_bytes:
+            self.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        if not self._parts:
+            return
+        data = "".join(self._parts).encode("utf-8")
+        self._parts.clear()
+        self._buffered = 0
+        self.size_bytes += len(data)
+        while True:
+            if self.cancelled.is_set():
+                raise JobCancelledError()
+            try:
+                self.channel.put(data, timeout=ConversionService.POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+
+def convert_request(task: ConversionTask, channel, cancelled, chunk_bytes: int) -> None:
+    """
+    Выполняет конвертацию в рабочем процессе и отправляет в `channel` сообщения:
+    ("started", None), ("ready", {...}), части SQL (bytes), затем ("done", {...}) или ("error", (статус, текст)).
+    :param task: Задание на конвертацию
+    :param channel: Очередь `multiprocessing.Manager` для передачи результата
+    :param cancelled: Событие отмены (клиент отключился)
+    :param chunk_bytes: Размер части SQL в байтах
+    """
+    from services.data_processing import DataProcessing
+    from services.load_data import DataLoaderFactory
+    from utils import SQLFormatterFactory
+    from utils.logger import ErrorCollector
+    from utils.sql_formatter import RenderStats
+
+    channel.put(("started", None))
+    try:
+        started = time.perf_counter()
+        factory = SQLFormatterFactory()
+        factory.get_renderer(task.sql_formatter)
+        df, table_name = DataLoaderFactory().load_data(file_path=task.file_path, **task.load_options)
+        dp = DataProcessing(df, (task.table_name or str(table_name)).lower())
+        dp.apply_overrides(
+            task.plan.get("types", {}),
+            task.plan.get("names", {}),
+            task.plan.get("exclude", [])
+        )
+        channel.put(("ready", {"rows": len(df), "load_seconds": time.perf_counter() - started}))
+
+        errors = ErrorCollector()
+        stats = RenderStats()
+        writer = _ChannelWriter(channel, cancelled, chunk_bytes)
+        factory.write_sql(writer, dp.table.name, dp.valid_columns, dp.iter_values(errors), task.sql_formatter, stats)
+        writer.flush()
+        channel.put(("done", {
+            "format_seconds": stats.format_seconds,
+            "render_seconds": stats.render_seconds,
+            "bytes": writer.size_bytes,
+            "errors": errors.total,
+        }))
+    except JobCancelledError:
+        return
+    except Exception as e:
+        channel.put(("error", (get_error_status(e), str(e) or type(e).__name__)))
+
+
+class RequestTiming:
+    """
+    Время выполнения одного запроса (для `GET /status`).
+    :param request_id: Номер запроса
+    """
+
+    def __init__(self, request_id: int):
+        self.request_id = request_id
+        self.received = time.perf_counter()
+        self.status = 0
+        self.rows = 0
+        self.bytes = 0
+        self.errors = 0
+        self.queue_seconds = 0.0
+        self.load_seconds = 0.0
+        self.format_seconds = 0.0
+        self.render_seconds = 0.0
+        self.total_seconds = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.request_id,
+            "status": self.status,
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "errors": self.errors,
+            "queue_seconds": round(self.queue_seconds, 4),
+            "load_seconds": round(self.load_seconds, 4),
+            "format_seconds": round(self.format_seconds, 4),
+            "render_seconds": round(self.render_seconds, 4),
+            "total_seconds": round(self.total_seconds, 4),
+        }
+
+
+class ConversionService:
+    """
+    Локальный HTTP сервис конвертации на asyncio (только стандартная библиотека).
+    Конвертации выполняются в пуле процессов ограниченного размера, а SQL передается клиенту
+    частями (Transfer-Encoding: chunked) по мере генерации.
+
+    Запросы:
+        POST /convert — тело запроса: файл (параметры в строке запроса: format, template, table,
+            delimiter, header, sheet, plan) или JSON {"path": ..., "plan": {...}, ...}.
+            План колонок: {"types": {"колонка": "тип"}, "names": {"колонка": "имя"}, "exclude": ["колонка"]}
+        GET /status — размер очереди, количество выполняемых конвертаций и время последних запросов
+
+    :param host: Адрес (по умолчанию только локальный)
+    :param port: Порт (0 — любой свободный)
+    :param workers: Количество рабочих процессов
+    :param max_queue: Максимальное количество запросов, ожидающих рабочий процесс
+    :param allowed_root: Папка, из которой разрешено читать файлы по пути (None — только загрузка)
+    :param max_body_bytes: Максимальный размер загружаемого файла
+    :param log: Функция вывода строк журнала
+    """
+    POLL_SECONDS = 0.5
+    CHUNK_BYTES = 64 * 1024
+    READ_CHUNK_BYTES = 1024 * 1024
+    MAX_BODY_BYTES = 512 * 1024 * 1024
+    MAX_HEADER_BYTES = 64 * 1024
+    RECENT_REQUESTS = 50
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        workers: int = 2,
+        max_queue: int = 16,
+        allowed_root: str | None = None,
+        max_body_bytes: int | None = None,
+        log: Callable[[str], None] | None = None
+    ):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_queue = max_queue
+        self.allowed_root = os.path.realpath(allowed_root) if allowed_root else None
+        self.max_body_bytes = max_body_bytes or self.MAX_BODY_BYTES
+        self.log = log or print
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.recent: deque[RequestTiming] = deque(maxlen=self.RECENT_REQUESTS)
+        self._request_ids = itertools.count(1)
+        self._server: asyncio.Server | None = None
+        self._executor: ProcessPoolExecutor | None = None
+        self._manager = None
+        # Потоки для блокирующего чтения очередей рабочих процессов
+        self._io_executor: ThreadPoolExecutor | None = None
+
+    async def start(self) -> None:
+        """
+        Запускает пул процессов и начинает принимать соединения.
+        """
+        self._manager = multiprocessing.Manager()
+        # Процессы запускаются при первых запросах: с fork они унаследовали бы сокеты открытых соединений,
+        # и клиент не получал бы конец ответа, пока жив рабочий процесс
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self._io_executor = ThreadPoolExecutor(max_workers=self.workers + self.max_queue)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=self.MAX_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.log(f"Сервис запущен: http://{self.host}:{self.port} (процессов: {self.workers})")
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """
+        Прекращает прием соединений и останавливает пул процессов.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._io_executor.shutdown(wait=True)
+            self._manager.shutdown()
+            self._executor = None
+
+    def get_status(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "recent": [timing.to_dict() for timing in self.recent],
+        }
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        timing = RequestTiming(next(self._request_ids))
+        method = path = ""
+        try:
+            method, target, headers = await self._read_head(reader)
+            url = urlsplit(target)
+            path = url.path
+            if path == "/status" and method == "GET":
+                timing = None
+                await self._send_json(writer, 200, self.get_status())
+            elif path == "/convert" and method == "POST":
+                await self._convert(reader, writer, headers, dict(parse_qsl(url.query)), timing)
+            elif path in ("/status", "/convert"):
+                await self._send_json(writer, 405, {"error": "Метод не поддерживается"})
+            else:
+                await self._send_json(writer, 404, {"error": "Не найдено"})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            status = get_error_status(e)
+            if timing is not None and timing.status == 200:
+                # Заголовки уже отправлены: ответ обрывается без завершающей части
+                self.log(f"#{timing.request_id} ошибка генерации: {e}")
+                timing.status = status
+            else:
+                if timing is not None:
+                    timing.status = status
+                await self._send_json(writer, status, {"error": str(e)})
+        finally:
+            if timing is not None and path == "/convert":
+                timing.total_seconds = time.perf_counter() - timing.received
+                self.recent.append(timing)
+                if timing.status == 200:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                self.log(f"#{timing.request_id} {method} {path} {timing.status} строк {timing.rows} "
+                         f"{timing.total_seconds:.2f} с")
+            writer.close()
+
+    async def _read_head(self, reader: asyncio.StreamReader) -> tuple[str, str, dict[str, str]]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError:
+            raise BadRequestError("Слишком большие заголовки запроса")
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        parts = request_line.split(" ")
+        if len(parts) != 3:
+            raise BadRequestError("Некорректная строка запроса")
+        headers = {}
+        for line in header_lines:
+            name, separator, value = line.partition(":")
+            if separator:
+                headers[name.strip().lower()] = value.strip()
+        return parts[0], parts[1], headers
+
+    async def _convert(self, reader, writer, headers: dict[str, str], params: dict[str, str],
+                       timing: RequestTiming) -> None:
+        if self.queued + self.running >= self.workers + self.max_queue:
+            raise ServiceBusyError("Очередь конвертаций заполнена, повторите запрос позже")
+        # Место в очереди занимается сразу после проверки: пока читается тело запроса,
+        # одновременные запросы не должны пройти проверку на то же место
+        self.queued += 1
+        reserved = True
+        upload_path = None
+        try:
+            if "content-length" not in headers:
+                timing.status = 411
+                await self._send_json(writer, 411, {"error": "Требуется заголовок Content-Length"})
+                return
+            length = self._get_content_length(headers["content-length"])
+            if headers.get("content-type", "").startswith("application/json"):
+                if length > self.MAX_HEADER_BYTES:
+                    raise PayloadTooLargeError("Слишком большое тело JSON запроса")
+                params = self._parse_json(await reader.readexactly(length))
+                file_path = self._resolve_path(params.get("path"))
+            else:
+                file_format = str(params.get("format", "csv")).lower()
+                if file_format not in FILE_FORMATS:
+                    raise BadRequestError(f"Неизвестный формат «{file_format}»")
+                if "plan" in params:
+                    params["plan"] = self._parse_json(params["plan"].encode("utf-8"))
+                # Имя временного файла случайное: без ?table= таблица называется «data», как при чтении из stdin в CLI
+                params.setdefault("table", "data")
+                upload_path = file_path = await self._read_upload(reader, length, file_format)
+            task = self._get_task(file_path, params)
+            # Занятое место освобождает `_run`
+            reserved = False
+            await self._run(writer, task, timing)
+        finally:
+            if reserved:
+                self.queued -= 1
+            if upload_path is not None:
+                os.remove(upload_path)
+
+    @staticmethod
+    def _get_content_length(value: str) -> int:
+        try:
+            length = int(value)
+        except ValueError:
+            raise BadRequestError(f"Некорректный заголовок Content-Length: «{value}»")
+        if length < 0:
+            raise BadRequestError(f"Некорректный заголовок Content-Length: «{value}»")
+        return length
+
+    async def _read_upload(self, reader: asyncio.StreamReader, length: int, file_format: str) -> str:
+        """
+        Сохраняет тело запроса во временный файл частями.
+        """
+        if length > self.max_body_bytes:
+            raise PayloadTooLargeError(f"Файл больше {self.max_body_bytes} байт")
+        with tempfile.NamedTemporaryFile(prefix="tab2sql_upload_", suffix=f".{file_format}", delete=False) as file:
+            try:
+                remaining = length
+                while remaining:
+                    data = await reader.readexactly(min(remaining, self.READ_CHUNK_BYTES))
+                    file.write(data)
+                    remaining -= len(data)
+            except BaseException:
+                file.close()
+                os.remove(file.name)
+                raise
+            return file.name
+
+    @staticmethod
+    def _parse_json(data: bytes) -> dict:
+        try:
+            value = json.loads(data)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise BadRequestError(f"Некорректный JSON: {e}")
+        if not isinstance(value, dict):
+            raise BadRequestError("Ожидается JSON объект")
+        return value
+
+    def _resolve_path(self, file_path: str | None) -> str:
+        if not file_path:
+            raise BadRequestError("Не указан path")
+        if self.allowed_root is None:
+            raise PathNotAllowedError("Чтение файлов по пути отключено (запустите сервис с --root)")
+        real_path = os.path.realpath(os.path.join(self.allowed_root, file_path))
+        if os.path.commonpath([real_path, self.allowed_root]) != self.allowed_root:
+            raise PathNotAllowedError(f"Путь «{file_path}» вне разрешенной папки")
+        return real_path
+
+    @staticmethod
+    def _get_task(file_path: str, params: dict) -> ConversionTask:
+        plan = params.get("plan") or {}
+        if (not isinstance(plan, dict)
+                or not isinstance(plan.get("types", {}), dict)
+                or not isinstance(plan.get("names", {}), dict)
+                or not isinstance(plan.get("exclude", []), list)):
+            raise BadRequestError("План колонок: ожидается {\"types\": {}, \"names\": {}, \"exclude\": []}")
+        load_options = {}
+        if file_path.lower().endswith(".csv"):
+            header = str(params.get("header", "1")).lower() not in ("0", "false", "no")
+            load_options = {"delimiter": str(params.get("delimiter", ";")), "header": header}
+        elif params.get("sheet") is not None:
+            sheet = str(params["sheet"])
+            load_options = {"sheet_name": int(sheet) if sheet.isdigit() else sheet}
+        return ConversionTask(
+            file_path=file_path,
+            sql_formatter=str(params.get("template", "Тип 1")),
+            table_name=params.get("table"),
+            load_options=load_options,
+            plan=plan
+        )
+
+    async def _run(self, writer: asyncio.StreamWriter, task: ConversionTask, timing: RequestTiming) -> None:
+        """
+        Отправляет задание в пул процессов и передает клиенту SQL по мере генерации.
+        Место в очереди уже занято в `_convert` и освобождается здесь.
+        Заголовки ответа отправляются после загрузки файла, поэтому ошибки чтения файла и плана
+        колонок возвращаются с кодом 4xx; ошибка во время генерации обрывает ответ без завершающей части.
+        """
+        cancelled = future = None
+        started = False
+        try:
+            channel = self._manager.Queue(maxsize=8)
+            cancelled = self._manager.Event()
+            future = self._executor.submit(convert_request, task, channel, cancelled, self.CHUNK_BYTES)
+            await self._receive(channel, future)
+            self.queued -= 1
+            self.running += 1
+            started = True
+            timing.queue_seconds = time.perf_counter() - timing.received
+
+            kind, value = await self._receive(channel, future)
+            if kind == "error":
+                timing.status, text = value
+                await self._send_json(writer, timing.status, {"error": text})
+                return
+            timing.rows = value["rows"]
+            timing.load_seconds = value["load_seconds"]
+            timing.status = 200
+            await self._send_head(writer, 200, {
+                "Content-Type": "application/sql; charset=utf-8",
+                "Transfer-Encoding": "chunked",
+                "X-Request-Id": str(timing.request_id),
+                "X-Rows": str(timing.rows),
+                "X-Queue-Seconds": f"{timing.queue_seconds:.4f}",
+                "X-Load-Seconds": f"{timing.load_seconds:.4f}",
+            })
+            while True:
+                message = await self._receive(channel, future)
+                if isinstance(message, bytes):
+                    writer.write(f"{len(message):X}\r\n".encode("ascii") + message + b"\r\n")
+                    await writer.drain()
+                    continue
+                kind, value = message
+                if kind == "error":
+                    timing.status = value[0]
+                    self.log(f"#{timing.request_id} ошибка генерации: {value[1]}")
+                    return
+                timing.format_seconds = value["format_seconds"]
+                timing.render_seconds = value["render_seconds"]
+                timing.bytes = value["bytes"]
+                timing.errors = value["errors"]
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+                return
+        finally:
+            if cancelled is not None:
+                cancelled.set()
+            if started:
+                self.running -= 1
+            else:
+                self.queued -= 1
+            if future is not None:
+                # Дожидаемся рабочего процесса, чтобы временный файл можно было удалить
+                await asyncio.wait([asyncio.wrap_future(future)])
+
+    async def _receive(self, channel, future: Future):
+        """
+        Ждет следующее сообщение рабочего процесса, не блокируя цикл событий.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                return await loop.run_in_executor(
+                    self._io_executor, functools.partial(channel.get, timeout=self.POLL_SECONDS)
+                )
+            except queue.Empty:
+                if future.done():
+                    # Процесс завершился без сообщения (например, BrokenProcessPool)
+                    future.result()
+                    raise RuntimeError("Рабочий процесс завершился без результата")
+
+    @staticmethod
+    async def _send_head(writer: asyncio.StreamWriter, status: int, headers: dict[str, str]) -> None:
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        lines.append("Connection: close")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("utf-8"))
+        await writer.drain()
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, value: dict) -> None:
+        body = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        await self._send_head(writer, status, {
+            "Content-Type": "application/json; charset=utf-8",
+            "Content-Length": str(len(body)),
+        })
+        writer.write(body)
+        await writer.drain()
@@ -0,0 +1,243 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator
+
+from utils.diagnostics import Diagnostics
+from utils.errors import JobCancelledError, JobRunnerBusyError
+
+
+class JobProgress:
+    """
+    Снимок прогресса задачи.
+    :param stage: Название этапа
+    :param done: Количество обработанных элементов (строк, листов)
+    :param total: Общее количество элементов (None — неизвестно)
+    :param stage_started: Время начала этапа (time.monotonic)
+    """
+
+    def __init__(self, stage: str, done: int = 0, total: int | None = None, stage_started: float | None = None):
+        self.stage = stage
+        self.done = done
+        self.total = total
+        self.stage_started = stage_started if stage_started is not None else time.monotonic()
+
+    @property
+    def fraction(self) -> float | None:
+        """
+        Возвращает долю выполнения этапа от 0 до 1 (None, если общее количество неизвестно).
+        """
+        if not self.total:
+            return None
+        return min(self.done / self.total, 1.0)
+
+    @property
+    def eta_seconds(self) -> float | None:
+        """
+        Возвращает оценку оставшегося времени этапа в секундах (None, если оценить нельзя).
+        """
+        if not self.total or not self.done:
+            return None
+        elapsed = time.monotonic() - self.stage_started
+        return elapsed / self.done * (self.total - self.done)
+
+
+class Job:
+    """
+    Фоновая задача. Функция `func` выполняется в рабочем потоке и получает задачу первым аргументом,
+    чтобы сообщать о прогрессе (`report`, `track`) и проверять отмену (`check_cancelled`).
+    Функция не должна обращаться к виджетам и переменным tkinter.
+    Этапы задачи замеряются через `job.diagnostics.span(...)`.
+
+    :param name: Название задачи
+    :param func: Функция задачи
+    :param args: Позиционные аргументы функции
+    :param kwargs: Именованные аргументы функции
+    """
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(self, name: str, func: Callable[..., Any], *args: Any, **kwargs: Any):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.state = self.PENDING
+        self.progress = JobProgress(stage=name)
+        self.diagnostics = Diagnostics(name)
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.started: float | None = None
+        self.finished: float | None = None
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    @property
+    def elapsed_seconds(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    def cancel(self) -> None:
+        """
+        Запрашивает отмену задачи. Задача завершится при следующей проверке `check_cancelled`.
+        """
+        self._cancel_event.set()
+
+    def check_cancelled(self) -> None:
+        """
+        Проверяет, запрошена ли отмена.
+        :raises JobCancelledError: Если задача отменена
+        """
+        if self._cancel_event.is_set():
+            raise JobCancelledError(f"Задача «{self.name}» отменена")
+
+    def report(self, stage: str, done: int = 0, total: int | None = None) -> None:
+        """
+        Сообщает о прогрессе задачи и проверяет отмену.
+        :param stage: Название этапа
+        :param done: Количество обработанных элементов
+        :param total: Общее количество элементов
+        :raises JobCancelledError: Если задача отменена
+        """
+        stage_started = self.progress.stage_started if stage == self.progress.stage else None
+        self.progress = JobProgress(stage, done, total, stage_started)
+        self.check_cancelled()
+
+    def track(self, iterable: Iterable[Any], stage: str, total: int | None = None, every: int = 1000) -> Iterator[Any]:
+        """
+        Оборачивает итератор: сообщает о прогрессе каждые `every` элементов и проверяет отмену.
+        :param iterable: Исходный итератор
+        :param stage: Название этапа
+        :param total: Общее количество элементов
+        :param every: Периодичность отчета
+        :return: Итератор тех же элементов
+        :raises JobCancelledError: Если задача отменена
+        """
+        self.report(stage, 0, total)
+        done = 0
+        for item in iterable:
+            yield item
+            done += 1
+            if done % every == 0:
+                self.report(stage, done, total)
+        self.report(stage, done, total)
+
+    def run(self) -> None:
+        """
+        Выполняет функцию задачи и сохраняет результат, ошибку или факт отмены.
+        """
+        self.state = self.RUNNING
+        self.started = time.monotonic()
+        try:
+            self.check_cancelled()
+            self.result = self.func(self, *self.args, **self.kwargs)
+            self.state = self.DONE
+        except JobCancelledError:
+            self.state = self.CANCELLED
+        except BaseException as e:
+            self.error = e
+            self.state = self.CANCELLED if self.cancelled else self.FAILED
+        finally:
+            self.finished = time.monotonic()
+
+    def __repr__(self):
+        return f"Job(name={self.name!r}, state={self.state}, stage={self.progress.stage!r})"
+
+
+class JobRunner:
+    """
+    Выполняет фоновые задачи по одной в рабочем потоке. Результаты и прогресс передаются
+    в поток интерфейса через периодический опрос `after()`, поэтому обработчики
+    `on_success`, `on_error`, `on_cancel` и слушатели вызываются в главном потоке tkinter.
+
+    :param scheduler: Виджет tkinter (любой объект с методом `after`)
+    """
+    POLL_MS = 100
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.current: Job | None = None
+        self._callbacks: dict[str, Callable | None] = {}
+        self._listeners: list[Callable[[Job], None]] = []
+        self._finished: queue.Queue[Job] = queue.Queue()
+
+    @property
+    def busy(self) -> bool:
+        return self.current is not None
+
+    def add_listener(self, listener: Callable[[Job], None]) -> None:
+        """
+        Добавляет слушателя, который вызывается при каждом опросе выполняющейся задачи и по ее завершении.
+        :param listener: Функция, получающая задачу
+        """
+        self._listeners.append(listener)
+
+    def submit(
+        self,
+        job: Job,
+        on_success: Callable[[Any], None] | None = None,
+        on_error: Callable[[BaseException], None] | None = None,
+        on_cancel: Callable[[], None] | None = None
+    ) -> Job:
+        """
+        Запускает задачу в рабочем потоке.
+        :param job: Задача
+        :param on_success: Обработчик результата
+        :param on_error: Обработчик ошибки
+        :param on_cancel: Обработчик отмены
+        :return: Запущенная задача
+        :raises JobRunnerBusyError: Если уже выполняется другая задача
+        """
+        if self.busy:
+            raise JobRunnerBusyError(f"Уже выполняется задача «{self.current.name}»")
+        self.current = job
+        self._callbacks = {"success": on_success, "error": on_error, "cancel": on_cancel}
+        thread = threading.Thread(target=self._run, args=(job,), name=f"job-{job.name}", daemon=True)
+        thread.start()
+        self.scheduler.after(self.POLL_MS, self._poll)
+        return job
+
+    def cancel(self) -> None:
+        """
+        Запрашивает отмену текущей задачи.
+        """
+        if self.current is not None:
+            self.current.cancel()
+
+    def _run(self, job: Job) -> None:
+        job.run()
+        self._finished.put(job)
+
+    def _poll(self) -> None:
+        """
+        Опрашивает состояние задачи в главном потоке.
+        """
+        job = self.current
+        if job is None:
+            return
+        try:
+            self._finished.get_nowait()
+        except queue.Empty:
+            self._notify(job)
+            self.scheduler.after(self.POLL_MS, self._poll)
+            return
+        self.current = None
+        callbacks = self._callbacks
+        self._notify(job)
+        if job.state == Job.DONE and callbacks["success"] is not None:
+            callbacks["success"](job.result)
+        elif job.state == Job.FAILED and callbacks["error"] is not None:
+            callbacks["error"](job.error)
+        elif job.state == Job.CANCELLED and callbacks["cancel"] is not None:
+            callbacks["cancel"]()
+
+    def _notify(self, job: Job) -> None:
+        for listener in self._listeners:
+            listener(job)
@@ -1,5 +1,6 @@
 import os
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
 
 import pandas as pd
 
@@ -14,6 +15,9 @@ from utils.errors import (
     ExcelSheetNotFoundError
 )
 
+if TYPE_CHECKING:
+    from services.sheet_cache import SheetCache
+
 
 class LoadData(ABC):
     """
@@ -100,14 +104,33 @@ class LoadExcel(LoadData):
         self._sheet_name = self._get_sheet_name(sheet_name)
         return pd.read_excel(self.file_path, sheet_name=self._sheet_name)
 
+    def get_sheets(self, sheet_names: list[str] | None = None) -> dict[str, pd.DataFrame]:
+        """
+        Возвращает содержимое нескольких листов за один разбор книги.
+        :param sheet_names: Список имен листов (None — все листы).
+        :return: Словарь {имя листа: DataFrame}.
+        :raises ExcelSheetNotFoundError: Если лист с указанным именем не найден.
+        """
+        if sheet_names is not None:
+            valid_sheets = self.get_sheet_names()
+            for sheet_name in sheet_names:
+                self._validate_sheet(sheet_name, valid_sheets)
+        return pd.read_excel(self.file_path, sheet_name=sheet_names)
+
+    def get_sheet_names(self) -> list[str]:
+        """
+        Возвращает список листов Excel-файла.
+        :return: Список имен листов.
+        """
+        return pd.ExcelFile(self.file_path).sheet_names
+
     def _get_sheet_name(self, sheet_name: str | int) -> str:
         """
         Возвращает имя Excel-файла на основе выбранного листа (по индексу или имени).
         :param sheet_name: Имя листа (str) или индекс листа (int).
         :return: Имя листа (str).
         """
-        xlsx = pd.ExcelFile(self.file_path)
-        valid_sheets = xlsx.sheet_names
+        valid_sheets = self.get_sheet_names()
         self._validate_sheet(sheet_name, valid_sheets)
         if isinstance(sheet_name, int):
             return valid_sheets[sheet_name]
@@ -149,19 +172,28 @@ class DataLoaderFactory:
         """
         return list(self.SUPPORTED_TYPES.keys())
 
-    def load_data(self, file_path: str, **kwargs) -> tuple[pd.DataFrame, str]:
+    def load_data(self, file_path: str, cache: "SheetCache | None" = None, **kwargs) -> tuple[pd.DataFrame, str]:
         """
         Функция загрузки данных из файла.
         :param file_path: Путь к файлу для чтения.
+        :param cache: Кэш разобранных листов Excel (None — без кэша).
         :param kwargs: Дополнительные параметры для настройки процесса загрузки.
         :return: DataFrame с загруженными данными (с заполнением пропусков "NULL") и имя таблицы.
         """
         self._file_path = file_path
         loader = self._create_loader()
+        use_cache = cache is not None and isinstance(loader, LoadExcel)
+        if use_cache:
+            cached = cache.get(file_path, **kwargs)
+            if cached is not None:
+                return cached
         df = loader.get_data(**kwargs)
         if df is None:
             raise DataFrameLoadError("Не удалось загрузить данные")
-        return df.fillna("NULL"), loader.filename
+        df = df.fillna("NULL")
+        if use_cache:
+            cache.put(file_path, df, loader.filename, **kwargs)
+        return df, loader.filename
 
     def _create_loader(self) -> LoadData:
         """
@@ -0,0 +1,154 @@
+import gzip
+import os
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from utils.errors import CompressionNotAvailableError, InvalidCompressionLevelError
+
+
+class _CountingFile:
+    """
+    Обертка над бинарным файлом, подсчитывающая количество записанных байт.
+    :param file: Бинарный файл, открытый на запись
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.bytes_written = 0
+
+    def write(self, data: bytes) -> int:
+        self.bytes_written += len(data)
+        return self.file.write(data)
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class SQLFileWriter:
+    """
+    Потоковая запись SQL скрипта в файл со сжатием «на лету».
+    Алгоритм сжатия определяется по расширению файла (.gz — gzip, .zst — zstd),
+    если не указан явно.
+
+    :param file_path: Путь к файлу
+    :param compression: Алгоритм сжатия ("gzip", "zstd" или None — без сжатия)
+    :param level: Уровень сжатия (None — уровень по умолчанию для алгоритма)
+    :param encoding: Кодировка SQL скрипта
+    :raises CompressionNotAvailableError: Если алгоритм сжатия недоступен
+    :raises InvalidCompressionLevelError: Если уровень сжатия вне допустимого диапазона
+    """
+    EXTENSIONS: dict[str, str] = {
+        ".gz": "gzip",
+        ".zst": "zstd",
+    }
+    LEVELS: dict[str, tuple[int, int, int]] = {
+        # (минимальный, максимальный, по умолчанию)
+        "gzip": (1, 9, 6),
+        "zstd": (1, 22, 3),
+    }
+
+    def __init__(self, file_path: str, compression: str | None = "auto", level: int | None = None,
+                 encoding: str = "utf-8"):
+        self.file_path = file_path
+        self.compression = self.detect_compression(file_path) if compression == "auto" else compression
+        self.level = self._validate_level(level)
+        self.encoding = encoding
+        self.raw_bytes = 0
+        self._file = _CountingFile(open(file_path, "wb"))
+        try:
+            self._stream = self._open_stream()
+        except BaseException:
+            self._file.close()
+            os.remove(file_path)
+            raise
+
+    @classmethod
+    def available_compressions(cls) -> list[str]:
+        """
+        Возвращает список доступных алгоритмов сжатия.
+        :return: Список алгоритмов сжатия
+        """
+        return [name for name in cls.LEVELS if name != "zstd" or zstandard is not None]
+
+    @classmethod
+    def detect_compression(cls, file_path: str) -> str | None:
+        """
+        Определяет алгоритм сжатия по расширению файла.
+        :param file_path: Путь к файлу
+        :return: Алгоритм сжатия или None
+        """
+        return cls.EXTENSIONS.get(os.path.splitext(file_path)[1].lower())
+
+    @property
+    def compressed_bytes(self) -> int:
+        """
+        Возвращает количество байт, фактически записанных на диск.
+        :return: Количество байт
+        """
+        return self._file.bytes_written
+
+    def write(self, text: str) -> None:
+        """
+        Кодирует и записывает часть SQL скрипта.
+        :param text: Часть SQL скрипта
+        """
+        data = text.encode(self.encoding)
+        self.raw_bytes += len(data)
+        self._stream.write(data)
+
+    def close(self) -> None:
+        """
+        Завершает сжатие и закрывает файл.
+        """
+        if self._stream is not self._file:
+            self._stream.close()
+        self._file.close()
+
+    def __enter__(self) -> "SQLFileWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+        if exc_type is not None and os.path.exists(self.file_path):
+            os.remove(self.file_path)
+
+    def _open_stream(self):
+        """
+        Открывает поток сжатия поверх файла.
+        :return: Объект с методами write и close
+        """
+        if self.compression == "gzip":
+            return gzip.GzipFile(filename="", mode="wb", fileobj=self._file, compresslevel=self.level, mtime=0)
+        if self.compression == "zstd":
+            compressor = zstandard.ZstdCompressor(level=self.level)
+            return compressor.stream_writer(self._file, closefd=False)
+        return self._file
+
+    def _validate_level(self, level: int | None) -> int | None:
+        """
+        Проверяет алгоритм и уровень сжатия.
+        :param level: Уровень сжатия
+        :return: Уровень сжатия с учетом значения по умолчанию
+        :raises CompressionNotAvailableError: Если алгоритм сжатия недоступен
+        :raises InvalidCompressionLevelError: Если уровень сжатия вне допустимого диапазона
+        """
+        if self.compression is None:
+            return None
+        if self.compression not in self.LEVELS:
+            raise CompressionNotAvailableError(f"Неизвестный алгоритм сжатия: {self.compression}")
+        if self.compression == "zstd" and zstandard is None:
+            raise CompressionNotAvailableError("Для сжатия zstd установите пакет zstandard")
+        min_level, max_level, default_level = self.LEVELS[self.compression]
+        if level is None:
+            return default_level
+        if not min_level <= level <= max_level:
+            raise InvalidCompressionLevelError(
+                f"Уровень сжатия {self.compression} должен быть от {min_level} до {max_level}"
+            )
+        return level
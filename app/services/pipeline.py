@@ -0,0 +1,406 @@
+import queue
+import threading
+import time
+from typing import Callable, Iterator
+
+from models.table import ColumnPlan, Table
+from services.data_processing import DataProcessing
+from utils.logger import ErrorCollector
+from utils.sql_formatter import SQLRenderer, RenderStats
+
+
+class StageStats:
+    """
+    Загрузка одного этапа конвейера.
+    :param name: Название этапа
+    :param workers: Количество потоков этапа
+    """
+    __slots__ = ("name", "workers", "items", "rows", "busy_seconds", "input_wait_seconds", "output_wait_seconds")
+
+    def __init__(self, name: str, workers: int = 1):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.rows = 0
+        self.busy_seconds = 0.0
+        self.input_wait_seconds = 0.0
+        self.output_wait_seconds = 0.0
+
+    def get_utilization(self, wall_seconds: float) -> float:
+        """
+        Возвращает долю времени, которую потоки этапа работали, а не ждали соседние этапы.
+        :param wall_seconds: Время работы конвейера
+        :return: Доля от 0 до 1
+        """
+        if wall_seconds <= 0:
+            return 0.0
+        return min(self.busy_seconds / (wall_seconds * self.workers), 1.0)
+
+    def to_dict(self, wall_seconds: float) -> dict:
+        return {
+            "name": self.name,
+            "workers": self.workers,
+            "batches": self.items,
+            "rows": self.rows,
+            "busy_seconds": self.busy_seconds,
+            "input_wait_seconds": self.input_wait_seconds,
+            "output_wait_seconds": self.output_wait_seconds,
+            "utilization": self.get_utilization(wall_seconds),
+        }
+
+    def __repr__(self):
+        return f"StageStats(name={self.name!r}, workers={self.workers}, busy_seconds={self.busy_seconds:.3f})"
+
+
+class _Batch:
+    """
+    Пачка строк между этапами конвейера.
+    :param number: Порядковый номер пачки
+    :param start: Номер первой строки пачки в таблице (с 0)
+    :param rows: Количество строк
+    :param columns: Значения включенных колонок (pandas.Series в порядке плана колонок)
+    """
+    __slots__ = ("number", "start", "rows", "columns", "values", "errors")
+
+    def __init__(self, number: int, start: int, rows: int, columns: list):
+        self.number = number
+        self.start = start
+        self.rows = rows
+        self.columns = columns
+        self.values: list[str] = []
+        self.errors: ErrorCollector | None = None
+
+
+# Конец данных для потоков форматирования и записи
+_DONE = object()
+
+
+class SQLPipeline:
+    """
+    Конвейер генерации SQL, в котором чтение строк таблицы, форматирование значений и запись скрипта
+    выполняются одновременно в отдельных потоках:
+
+    - поток чтения нарезает таблицу на пачки строк (для Arrow — с преобразованием колонок в pandas);
+    - потоки форматирования форматируют пачки по колонкам через план колонок;
+    - поток записи собирает пачки по порядку, рендерит шаблон и пишет части скрипта в поток вывода.
+
+    Этапы связаны очередями ограниченного размера, а количество пачек в работе ограничено, поэтому быстрый этап
+    ждет медленный, и память не растет. Исключение в любом этапе останавливает остальные и пробрасывается
+    из `write` (например, `JobCancelledError` из `progress_callback`). Результат совпадает
+    с последовательной генерацией, включая порядок примеров ошибок.
+
+    Форматирование выполняется на Python и держит GIL, поэтому конвейер выигрывает, когда запись (сжатие, диск)
+    отпускает GIL, а дополнительные потоки форматирования обычно не ускоряют генерацию;
+    `stages` и `iter_report` показывают, какой этап узкое место.
+
+    :param data_processing: Обработанные данные
+    :param renderer: Скомпилированный SQL шаблон
+    :param workers: Количество потоков форматирования
+    :param batch_rows: Количество строк в пачке
+    :param queue_size: Размер очередей между этапами (в пачках)
+    """
+    BATCH_ROWS = 5000
+    QUEUE_SIZE = 4
+    # Период проверки остановки конвейера при ожидании очереди
+    POLL_SECONDS = 0.1
+
+    def __init__(
+        self,
+        data_processing: DataProcessing,
+        renderer: SQLRenderer,
+        workers: int = 1,
+        batch_rows: int = BATCH_ROWS,
+        queue_size: int = QUEUE_SIZE
+    ):
+        self.data_processing = data_processing
+        self.renderer = renderer
+        self.workers = max(1, workers)
+        self.batch_rows = max(1, batch_rows)
+        self.queue_size = max(1, queue_size)
+        self.wall_seconds = 0.0
+        self.stages: list[StageStats] = []
+        self._stop = threading.Event()
+        self._error: BaseException | None = None
+        self._error_lock = threading.Lock()
+
+    @property
+    def bottleneck(self) -> StageStats | None:
+        """
+        Возвращает самый загруженный этап (None — конвейер еще не запускался).
+        """
+        if not self.stages:
+            return None
+        return max(self.stages, key=lambda stage: stage.get_utilization(self.wall_seconds))
+
+    def write(
+        self,
+        stream,
+        errors: ErrorCollector | None = None,
+        stats: RenderStats | None = None,
+        progress_callback: Callable[[int], None] | None = None
+    ) -> RenderStats:
+        """
+        Генерирует SQL скрипт и пишет его в поток.
+        :param stream: Поток с методом `write` (файл, SQLFileWriter, SQLDocument)
+        :param errors: Сборщик ошибок форматирования (None — `data_processing.errors`)
+        :param stats: Статистика генерации для заполнения (`format_seconds` — ожидание потоком записи
+            отформатированных строк)
+        :param progress_callback: Вызывается потоком записи с количеством записанных строк после каждой пачки
+        :return: Статистика генерации
+        """
+        errors = errors if errors is not None else self.data_processing.errors
+        stats = stats if stats is not None else RenderStats()
+        table = self.data_processing.table
+        plan = table.plan
+        read_stage = StageStats("read")
+        format_stage = StageStats("format", self.workers)
+        write_stage = StageStats("write")
+        self.stages = [read_stage, format_stage, write_stage]
+        self._stop.clear()
+        self._error = None
+
+        read_queue = queue.Queue(maxsize=self.queue_size)
+        format_queue = queue.Queue(maxsize=self.queue_size)
+        # Пачки в работе: чтение ждет, пока запись не освободит место, даже если пачки приходят не по порядку
+        in_flight = threading.Semaphore(self.queue_size * 2 + self.workers)
+        threads = [
+            threading.Thread(
+                target=self._run_stage, name="tab2sql-pipeline-read",
+                args=(self._read, read_stage, table, plan, read_queue, in_flight)
+            ),
+            *(
+                threading.Thread(
+                    target=self._run_stage, name=f"tab2sql-pipeline-format-{number}",
+                    args=(self._format, format_stage, plan, read_queue, format_queue)
+                )
+                for number in range(self.workers)
+            ),
+            threading.Thread(
+                target=self._run_stage, name="tab2sql-pipeline-write",
+                args=(
+                    self._write, write_stage, table, plan, format_queue, in_flight,
+                    stream, errors, stats, progress_callback
+                )
+            ),
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+        except BaseException:
+            # Прерывание вызывающего потока (например, KeyboardInterrupt) останавливает этапы
+            self._stop.set()
+            raise
+        finally:
+            self.wall_seconds = time.perf_counter() - started
+        if self._error is not None:
+            raise self._error
+        return stats
+
+    def iter_report(self) -> Iterator[str]:
+        """
+        Возвращает отчет о загрузке этапов: работа, ожидание и доля занятости потоков.
+        """
+        names = {"read": "чтение", "format": "форматирование", "write": "запись"}
+        yield f"Конвейер: {self.wall_seconds:.2f} с, потоков форматирования {self.workers}"
+        for stage in self.stages:
+            yield (f"  {names[stage.name]}: занят {stage.get_utilization(self.wall_seconds):.0%}, "
+                   f"работа {stage.busy_seconds:.2f} с, ожидание входа {stage.input_wait_seconds:.2f} с, "
+                   f"ожидание выхода {stage.output_wait_seconds:.2f} с")
+        if self.bottleneck is not None:
+            yield f"  Узкое место: {names[self.bottleneck.name]}"
+
+    def add_spans(self, diagnostics) -> None:
+        """
+        Добавляет работу этапов в замеры текущего этапа диагностики («pipeline.read», «pipeline.format»,
+        «pipeline.write»). Этапы выполняются одновременно, поэтому их время в сумме больше времени генерации.
+        :param diagnostics: Замеры операции (Diagnostics)
+        """
+        for stage in self.stages:
+            diagnostics.add(f"pipeline.{stage.name}", stage.busy_seconds, rows=stage.rows)
+
+    def to_dict(self) -> dict:
+        return {
+            "wall_seconds": self.wall_seconds,
+            "workers": self.workers,
+            "batch_rows": self.batch_rows,
+            "stages": [stage.to_dict(self.wall_seconds) for stage in self.stages],
+        }
+
+    def _run_stage(self, target: Callable, stage: StageStats, *args) -> None:
+        """
+        Выполняет этап в своем потоке. Первое исключение сохраняется для `write` и останавливает остальные этапы.
+        """
+        try:
+            target(stage, *args)
+        except BaseException as e:
+            with self._error_lock:
+                if self._error is None:
+                    self._error = e
+            self._stop.set()
+
+    def _read(
+        self,
+        stage: StageStats,
+        table: Table,
+        plan: ColumnPlan,
+        read_queue: queue.Queue,
+        in_flight: threading.Semaphore
+    ) -> None:
+        for number, start in enumerate(range(0, len(table), self.batch_rows)):
+            if not self._wait(stage, "output", lambda timeout: in_flight.acquire(timeout=timeout)):
+                return
+            started = time.perf_counter()
+            batch = table.slice(start, start + self.batch_rows)
+            columns = batch.get_series(plan.positions)
+            stage.busy_seconds += time.perf_counter() - started
+            stage.items += 1
+            stage.rows += len(batch)
+            if not self._put(stage, read_queue, _Batch(number, start, len(batch), columns)):
+                return
+        for _ in range(self.workers):
+            if not self._put(stage, read_queue, _DONE):
+                return
+
+    def _format(
+        self,
+        stage: StageStats,
+        plan: ColumnPlan,
+        read_queue: queue.Queue,
+        format_queue: queue.Queue
+    ) -> None:
+        while True:
+            batch = self._get(stage, read_queue)
+            if batch is None or batch is _DONE:
+                # Каждый поток форматирования сообщает потоку записи, что закончил работу
+                if batch is _DONE:
+                    self._put(stage, format_queue, _DONE)
+                return
+            started = time.perf_counter()
+            errors = ErrorCollector()
+            rows = DataProcessing.format_columns(batch.columns, batch.rows, batch.start + 1, errors, plan)
+            batch.values = [f"({', '.join(row_values)})" for row_values in rows]
+            batch.columns = []
+            batch.errors = errors
+            with self._error_lock:
+                stage.busy_seconds += time.perf_counter() - started
+                stage.items += 1
+                stage.rows += batch.rows
+            if not self._put(stage, format_queue, batch):
+                return
+
+    def _write(
+        self,
+        stage: StageStats,
+        table: Table,
+        plan: ColumnPlan,
+        format_queue: queue.Queue,
+        in_flight: threading.Semaphore,
+        stream,
+        errors: ErrorCollector,
+        stats: RenderStats,
+        progress_callback: Callable[[int], None] | None
+    ) -> None:
+        started = time.perf_counter()
+        values = self._iter_ordered(stage, format_queue, in_flight, errors, progress_callback)
+        try:
+            # Имена колонок берутся из того же плана, по которому форматировались значения:
+            # изменение колонок в окне во время генерации не должно рассогласовать заголовок и значения
+            for chunk in self.renderer.iter_chunks(table.name, list(plan.output_names), values, stats=stats):
+                stream.write(chunk)
+        finally:
+            # Работа записи — шаблон и вывод: все время потока, кроме ожидания отформатированных пачек
+            stage.busy_seconds = time.perf_counter() - started - stage.input_wait_seconds
+
+    def _iter_ordered(
+        self,
+        stage: StageStats,
+        format_queue: queue.Queue,
+        in_flight: threading.Semaphore,
+        errors: ErrorCollector,
+        progress_callback: Callable[[int], None] | None
+    ) -> Iterator[str]:
+        """
+        Возвращает отформатированные строки в порядке таблицы, придерживая пачки, пришедшие раньше предыдущих.
+        """
+        pending: dict[int, _Batch] = {}
+        next_number = 0
+        finished = 0
+        while finished < self.workers or pending:
+            if next_number not in pending:
+                if finished == self.workers:
+                    return
+                batch = self._get(stage, format_queue)
+                if batch is None:
+                    return
+                if batch is _DONE:
+                    finished += 1
+                else:
+                    pending[batch.number] = batch
+                continue
+            batch = pending.pop(next_number)
+            next_number += 1
+            errors.merge(batch.errors, limit_examples=True)
+            yield from batch.values
+            stage.items += 1
+            stage.rows += batch.rows
+            in_flight.release()
+            if progress_callback is not None:
+                progress_callback(stage.rows)
+
+    def _get(self, stage: StageStats, source: queue.Queue):
+        """
+        Берет элемент из очереди, пока конвейер не остановлен.
+        :return: Элемент очереди или None, если конвейер остановлен
+        """
+        result = []
+
+        def get(timeout: float) -> bool:
+            try:
+                result.append(source.get(timeout=timeout))
+                return True
+            except queue.Empty:
+                return False
+
+        return result[0] if self._wait(stage, "input", get) else None
+
+    def _put(self, stage: StageStats, target: queue.Queue, item) -> bool:
+        """
+        Кладет элемент в очередь, пока конвейер не остановлен.
+        :return: False, если конвейер остановлен
+        """
+        def put(timeout: float) -> bool:
+            try:
+                target.put(item, timeout=timeout)
+                return True
+            except queue.Full:
+                return False
+
+        return self._wait(stage, "output", put)
+
+    def _wait(self, stage: StageStats, side: str, attempt: Callable[[float], bool]) -> bool:
+        """
+        Повторяет блокирующую операцию с тайм-аутом, пока она не выполнится или конвейер не остановится,
+        и учитывает время ожидания этапа.
+        :param side: "input" — ожидание предыдущего этапа, "output" — ожидание следующего
+        :return: False, если конвейер остановлен
+        """
+        started = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                if attempt(self.POLL_SECONDS):
+                    return True
+            return False
+        finally:
+            waited = time.perf_counter() - started
+            with self._error_lock:
+                if side == "input":
+                    stage.input_wait_seconds += waited
+                else:
+                    stage.output_wait_seconds += waited
+
+    def __repr__(self):
+        return f"SQLPipeline(workers={self.workers}, batch_rows={self.batch_rows}, queue_size={self.queue_size})"
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import re
+import time
+
+from models.column import Column
+from utils.utils import user_data_path
+
+
+class ColumnProfile:
+    """
+    Сохраненные настройки источника: план колонок (имена, типы, включение, закрепленные форматы дат),
+    параметры загрузки и имя таблицы. Профиль определяется шаблоном имени файла (цифры заменены на «#»,
+    поэтому ежемесячные выгрузки совпадают) и подписью заголовка.
+
+    :param name_pattern: Шаблон имени файла
+    :param header_signature: Подпись заголовка (хеш имен колонок по порядку)
+    :param columns: План колонок
+    :param load_options: Параметры загрузки (delimiter, header или sheet_name)
+    :param table_name: Имя таблицы, заданное пользователем (None — имя по файлу или листу)
+    :param updated: Время сохранения (Unix time)
+    """
+    VERSION = 2
+
+    def __init__(
+        self,
+        name_pattern: str,
+        header_signature: str,
+        columns: list[dict],
+        load_options: dict | None = None,
+        table_name: str | None = None,
+        updated: float | None = None
+    ):
+        self.name_pattern = name_pattern
+        self.header_signature = header_signature
+        self.columns = columns
+        self.load_options = load_options or {}
+        self.table_name = table_name
+        self.updated = updated if updated is not None else time.time()
+
+    @property
+    def key(self) -> str:
+        return self.get_key(self.name_pattern, self.header_signature)
+
+    @staticmethod
+    def get_key(name_pattern: str, header_signature: str) -> str:
+        return hashlib.sha1(f"{name_pattern}\n{header_signature}".encode("utf-8")).hexdigest()[:20]
+
+    @staticmethod
+    def get_name_pattern(file_path: str) -> str:
+        """
+        Возвращает шаблон имени файла: «export_2024_05.csv» → «export_#_#.csv».
+        :param file_path: Путь к файлу
+        :return: Шаблон имени
+        """
+        return re.sub(r"\d+", "#", os.path.basename(file_path).lower())
+
+    @staticmethod
+    def get_header_signature(column_names: list) -> str:
+        """
+        Возвращает подпись заголовка таблицы.
+        :param column_names: Имена колонок по порядку
+        :return: Подпись заголовка
+        """
+        return hashlib.sha1("\x1f".join(str(name) for name in column_names).encode("utf-8")).hexdigest()
+
+    @classmethod
+    def from_columns(
+        cls,
+        file_path: str,
+        columns: list[Column],
+        load_options: dict | None = None,
+        table_name: str | None = None
+    ) -> "ColumnProfile":
+        """
+        Создает профиль по текущим настройкам колонок.
+        :param file_path: Путь к исходному файлу
+        :param columns: Колонки таблицы
+        :param load_options: Параметры загрузки
+        :param table_name: Имя таблицы, заданное пользователем
+        :return: Профиль
+        """
+        return cls(
+            name_pattern=cls.get_name_pattern(file_path),
+            header_signature=cls.get_header_signature([column.column_name for column in columns]),
+            columns=[
+                {
+                    "column_name": str(column.column_name),
+                    "column_type": column.column_type,
+                    "new_name": column.new_name,
+                    "new_type": column.new_type,
+                    "include": column.include,
+                    "date_format": column.date_format,
+                }
+                for column in columns
+            ],
+            load_options=load_options,
+            table_name=table_name
+        )
+
+    def get_columns(self, column_names: list) -> list[Column]:
+        """
+        Возвращает план колонок для таблицы с заголовком `column_names`.
+        :param column_names: Имена колонок загруженной таблицы (исходные объекты pandas)
+        :return: Список колонок
+        """
+        return [
+            Column(
+                column_name=column_name,
+                column_type=settings["column_type"],
+                new_name=settings["new_name"],
+                new_type=settings["new_type"],
+                include=settings["include"],
+                date_format=settings.get("date_format")
+            )
+            for column_name, settings in zip(column_names, self.columns)
+        ]
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.VERSION,
+            "name_pattern": self.name_pattern,
+            "header_signature": self.header_signature,
+            "columns": self.columns,
+            "load_options": self.load_options,
+            "table_name": self.table_name,
+            "updated": self.updated,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ColumnProfile":
+        return cls(
+            name_pattern=data["name_pattern"],
+            header_signature=data["header_signature"],
+            columns=data["columns"],
+            load_options=data.get("load_options"),
+            table_name=data.get("table_name"),
+            updated=data.get("updated")
+        )
+
+    def __repr__(self):
+        return (f"ColumnProfile(name_pattern={self.name_pattern!r}, columns={len(self.columns)}, "
+                f"load_options={self.load_options})")
+
+
+class ProfileStore:
+    """
+    Хранилище профилей колонок: по одному JSON файлу на профиль в пользовательском каталоге.
+    Поврежденные и несовместимые файлы пропускаются.
+
+    :param directory: Каталог профилей (None — `~/.tab2sql/profiles`)
+    """
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory or user_data_path("profiles")
+
+    def find(self, file_path: str, column_names: list) -> ColumnProfile | None:
+        """
+        Возвращает профиль для файла с заголовком `column_names`.
+        :param file_path: Путь к файлу
+        :param column_names: Имена колонок по порядку
+        :return: Профиль или None
+        """
+        key = ColumnProfile.get_key(
+            ColumnProfile.get_name_pattern(file_path),
+            ColumnProfile.get_header_signature(column_names)
+        )
+        profile = self._read(os.path.join(self.directory, f"{key}.json"))
+        if profile is None or len(profile.columns) != len(column_names):
+            return None
+        return profile
+
+    def find_by_name(self, file_path: str) -> ColumnProfile | None:
+        """
+        Возвращает последний сохраненный профиль с тем же шаблоном имени файла
+        (заголовок еще неизвестен: нужен, чтобы загрузить файл с сохраненными параметрами).
+        :param file_path: Путь к файлу
+        :return: Профиль или None
+        """
+        name_pattern = ColumnProfile.get_name_pattern(file_path)
+        profiles = [profile for profile in self.list() if profile.name_pattern == name_pattern]
+        return max(profiles, key=lambda profile: profile.updated, default=None)
+
+    def list(self) -> list[ColumnProfile]:
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                profile = self._read(entry.path)
+                if profile is not None:
+                    profiles.append(profile)
+        return profiles
+
+    def save(self, profile: ColumnProfile) -> str:
+        """
+        Сохраняет профиль (заменяя профиль с тем же ключом).
+        :param profile: Профиль
+        :return: Путь к файлу профиля
+        :raises OSError: Если файл не удалось записать
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        file_path = os.path.join(self.directory, f"{profile.key}.json")
+        temp_path = f"{file_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(profile.to_dict(), file, ensure_ascii=False, indent=2)
+        os.replace(temp_path, file_path)
+        return file_path
+
+    def delete(self, profile: ColumnProfile) -> None:
+        try:
+            os.remove(os.path.join(self.directory, f"{profile.key}.json"))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _read(file_path: str) -> ColumnProfile | None:
+        try:
+            with open(file_path, encoding="utf-8") as file:
+                data = json.load(file)
+            if data.get("version") not in (1, ColumnProfile.VERSION):
+                return None
+            if data["version"] == 1:
+                # В профилях версии 1 сохранялось и имя таблицы по файлу, а не только заданное пользователем
+                data["table_name"] = None
+            return ColumnProfile.from_dict(data)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
@@ -0,0 +1,362 @@
+import json
+import os
+import queue
+import threading
+import zlib
+from typing import Iterable, Iterator
+
+from services.output import SQLFileWriter
+from utils.errors import ShardingError
+from utils.sql_formatter import SQLRenderer
+
+
+class Shard:
+    """
+    Информация об одном файле шарда.
+    :param index: Порядковый номер шарда (начиная с 1)
+    :param file_path: Путь к файлу шарда
+    """
+
+    def __init__(self, index: int, file_path: str):
+        self.index = index
+        self.file_path = file_path
+        self.rows = 0
+        self.raw_bytes = 0
+        self.file_bytes = 0
+
+    def to_dict(self) -> dict[str, int | str]:
+        return {
+            "index": self.index,
+            "file": os.path.basename(self.file_path),
+            "rows": self.rows,
+            "raw_bytes": self.raw_bytes,
+            "file_bytes": self.file_bytes,
+        }
+
+    def __repr__(self):
+        return f"Shard(index={self.index}, rows={self.rows}, raw_bytes={self.raw_bytes})"
+
+
+class ShardManifest:
+    """
+    Манифест шардированного SQL скрипта: файл подготовки и список шардов.
+    :param table_name: Название таблицы
+    :param template: Название SQL шаблона
+    :param strategy: Способ разбиения
+    :param prepare_file: Путь к файлу подготовки (TRUNCATE/DELETE)
+    """
+
+    def __init__(self, table_name: str, template: str, strategy: str, prepare_file: str):
+        self.table_name = table_name
+        self.template = template
+        self.strategy = strategy
+        self.prepare_file = prepare_file
+        self.shards: list[Shard] = []
+
+    @property
+    def rows(self) -> int:
+        return sum(shard.rows for shard in self.shards)
+
+    @property
+    def raw_bytes(self) -> int:
+        return sum(shard.raw_bytes for shard in self.shards)
+
+    @property
+    def file_bytes(self) -> int:
+        return sum(shard.file_bytes for shard in self.shards)
+
+    def to_dict(self) -> dict:
+        return {
+            "table_name": self.table_name,
+            "template": self.template,
+            "strategy": self.strategy,
+            "prepare_file": os.path.basename(self.prepare_file),
+            "rows": self.rows,
+            "raw_bytes": self.raw_bytes,
+            "file_bytes": self.file_bytes,
+            "shards": [shard.to_dict() for shard in self.shards],
+        }
+
+    def save(self, file_path: str) -> None:
+        """
+        Сохраняет манифест в JSON-файл.
+        :param file_path: Путь к файлу манифеста
+        """
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, ensure_ascii=False, indent=2)
+
+
+class _ShardWorker(threading.Thread):
+    """
+    Поток, записывающий строки одного шарда в отдельный файл.
+    """
+
+    def __init__(
+        self,
+        shard: Shard,
+        renderer: SQLRenderer,
+        table_name: str,
+        columns: list[str],
+        compression_level: int | None,
+        queue_size: int
+    ):
+        super().__init__(name=f"shard-{shard.index}", daemon=True)
+        self.shard = shard
+        self.renderer = renderer
+        self.table_name = table_name
+        self.columns = columns
+        self.compression_level = compression_level
+        self.queue: queue.Queue[list[str] | None] = queue.Queue(maxsize=queue_size)
+        self.error: BaseException | None = None
+        self.closed = False
+        self._finished = False
+
+    def run(self) -> None:
+        try:
+            first_batch = self.queue.get()
+            if first_batch is None:
+                # Шард без строк (шардов больше, чем строк, или в хеш-шард не попал ни один ключ): файл не создается
+                self._finished = True
+                return
+            with SQLFileWriter(self.shard.file_path, level=self.compression_level) as writer:
+                rows = self._iter_rows(first_batch)
+                for chunk in self.renderer.iter_chunks(self.table_name, self.columns, rows, preamble=False):
+                    writer.write(chunk)
+            self.shard.raw_bytes = writer.raw_bytes
+            self.shard.file_bytes = writer.compressed_bytes
+        except BaseException as e:
+            self.error = e
+            self._drain()
+
+    def close(self) -> None:
+        """
+        Сообщает потоку, что строк больше не будет.
+        """
+        if not self.closed:
+            self.closed = True
+            self.queue.put(None)
+
+    def _iter_rows(self, batch: list[str]) -> Iterator[str]:
+        while batch is not None:
+            self.shard.rows += len(batch)
+            yield from batch
+            batch = self.queue.get()
+        self._finished = True
+
+    def _drain(self) -> None:
+        while not self._finished:
+            self._finished = self.queue.get() is None
+
+
+class SQLShardWriter:
+    """
+    Разбивает поток отформатированных строк на несколько самодостаточных INSERT-скриптов
+    для параллельной загрузки. Преамбула шаблона (TRUNCATE/DELETE) записывается в отдельный
+    файл подготовки, рядом сохраняется манифест с количеством строк и байт по шардам.
+
+    :param directory: Каталог для файлов
+    :param base_name: Базовое имя файлов
+    :param renderer: Скомпилированный SQL шаблон
+    :param strategy: Способ разбиения: "round_robin", "size" или "hash"
+    :param shards: Количество шардов (для "round_robin" и "hash")
+    :param max_bytes: Максимальный размер шарда в байтах (для "size")
+    :param key_columns: Колонки для вычисления хеша (для "hash")
+    :param extension: Расширение файлов (".sql", ".sql.gz", ".sql.zst")
+    :param compression_level: Уровень сжатия
+    :raises ShardingError: Если параметры разбиения некорректны
+    """
+    STRATEGIES: dict[str, str] = {
+        "round_robin": "По кругу",
+        "size": "По размеру",
+        "hash": "По ключу",
+    }
+    BATCH_ROWS = 500
+    QUEUE_SIZE = 8
+
+    def __init__(
+        self,
+        directory: str,
+        base_name: str,
+        renderer: SQLRenderer,
+        strategy: str = "round_robin",
+        shards: int = 4,
+        max_bytes: int | None = None,
+        key_columns: list[str] | None = None,
+        extension: str = ".sql",
+        compression_level: int | None = None
+    ):
+        self.directory = directory
+        self.base_name = base_name
+        self.renderer = renderer
+        self.strategy = strategy
+        self.shards = shards
+        self.max_bytes = max_bytes
+        self.key_columns = key_columns or []
+        self.extension = extension
+        self.compression_level = compression_level
+        self._validate()
+
+    @property
+    def manifest_path(self) -> str:
+        """
+        Возвращает путь к файлу манифеста.
+        :return: Путь к файлу манифеста
+        """
+        return self._get_file_path("manifest", extension=".json")
+
+    def write(self, table_name: str, columns: list[str], rows: Iterable[list[str]]) -> ShardManifest:
+        """
+        Записывает файл подготовки, шарды и манифест.
+        :param table_name: Название таблицы
+        :param columns: Список имен колонок
+        :param rows: Итератор строк, каждая строка — список отформатированных значений
+        :return: Манифест шардов
+        :raises ShardingError: Если ключевые колонки отсутствуют среди колонок
+        """
+        key_indexes = self._get_key_indexes(columns)
+        os.makedirs(self.directory, exist_ok=True)
+        manifest = ShardManifest(
+            table_name=table_name,
+            template=self.renderer.name,
+            strategy=self.strategy,
+            prepare_file=self._get_file_path("prepare")
+        )
+        with SQLFileWriter(manifest.prepare_file, level=self.compression_level) as writer:
+            writer.write(self.renderer.preamble(table_name))
+
+        workers: list[_ShardWorker] = []
+        try:
+            try:
+                self._dispatch(table_name, columns, rows, key_indexes, manifest, workers)
+            finally:
+                for worker in workers:
+                    worker.close()
+                for worker in workers:
+                    worker.join()
+            for worker in workers:
+                if worker.error is not None:
+                    raise worker.error
+        except BaseException:
+            self._remove_files(manifest)
+            raise
+        manifest.shards = [shard for shard in manifest.shards if shard.rows]
+        manifest.save(self.manifest_path)
+        return manifest
+
+    @staticmethod
+    def _remove_files(manifest: ShardManifest) -> None:
+        """
+        Удаляет файлы подготовки и шардов после ошибки или отмены.
+        :param manifest: Манифест шардов
+        """
+        for file_path in [manifest.prepare_file, *(shard.file_path for shard in manifest.shards)]:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    def _dispatch(
+        self,
+        table_name: str,
+        columns: list[str],
+        rows: Iterable[list[str]],
+        key_indexes: list[int],
+        manifest: ShardManifest,
+        workers: list[_ShardWorker]
+    ) -> None:
+        """
+        Распределяет строки по шардам пакетами и передает их потокам записи.
+        """
+        buffers: list[list[str]] = []
+        shard_count = 1 if self.strategy == "size" else self.shards
+        for _ in range(shard_count):
+            self._start_worker(table_name, columns, manifest, workers, buffers)
+        separator_bytes = len(self.renderer.template.row_separator.encode("utf-8"))
+        statement = self.renderer.header(table_name, columns) + self.renderer.template.suffix
+        statement_bytes = len(statement.encode("utf-8"))
+
+        current_bytes = 0
+        for row_number, values in enumerate(rows):
+            row = f"({', '.join(values)})"
+            if self.strategy == "round_robin":
+                index = row_number % shard_count
+            elif self.strategy == "hash":
+                key = "\x1f".join(values[i] for i in key_indexes)
+                index = zlib.crc32(key.encode("utf-8")) % shard_count
+            else:
+                index = len(workers) - 1
+                row_bytes = separator_bytes + (len(row) if row.isascii() else len(row.encode("utf-8")))
+                if current_bytes and statement_bytes + current_bytes + row_bytes > self.max_bytes:
+                    self._flush(workers, buffers, index)
+                    workers[index].close()
+                    self._start_worker(table_name, columns, manifest, workers, buffers)
+                    index += 1
+                    current_bytes = 0
+                current_bytes += row_bytes
+            buffers[index].append(row)
+            if len(buffers[index]) >= self.BATCH_ROWS:
+                self._flush(workers, buffers, index)
+
+        for index, buffer in enumerate(buffers):
+            if buffer:
+                self._flush(workers, buffers, index)
+
+    def _start_worker(
+        self,
+        table_name: str,
+        columns: list[str],
+        manifest: ShardManifest,
+        workers: list[_ShardWorker],
+        buffers: list[list[str]]
+    ) -> None:
+        """
+        Создает новый шард и запускает поток его записи.
+        """
+        index = len(manifest.shards) + 1
+        shard = Shard(index, self._get_file_path(f"{index:03d}"))
+        manifest.shards.append(shard)
+        worker = _ShardWorker(shard, self.renderer, table_name, columns, self.compression_level, self.QUEUE_SIZE)
+        worker.start()
+        workers.append(worker)
+        buffers.append([])
+
+    @staticmethod
+    def _flush(workers: list[_ShardWorker], buffers: list[list[str]], index: int) -> None:
+        """
+        Передает накопленный пакет строк потоку записи шарда.
+        :raises Exception: Ошибка потока записи, если она произошла
+        """
+        worker = workers[index]
+        if worker.error is not None:
+            raise worker.error
+        worker.queue.put(buffers[index])
+        buffers[index] = []
+
+    def _get_key_indexes(self, columns: list[str]) -> list[int]:
+        """
+        Возвращает позиции ключевых колонок.
+        :param columns: Список имен колонок
+        :return: Список позиций
+        :raises ShardingError: Если ключевая колонка не найдена
+        """
+        if self.strategy != "hash":
+            return []
+        missing = [column for column in self.key_columns if column not in columns]
+        if missing:
+            raise ShardingError(f"Ключевые колонки не найдены: {', '.join(missing)}")
+        return [columns.index(column) for column in self.key_columns]
+
+    def _get_file_path(self, suffix: str, extension: str | None = None) -> str:
+        return os.path.join(self.directory, f"{self.base_name}_{suffix}{extension or self.extension}")
+
+    def _validate(self) -> None:
+        """
+        Проверяет параметры разбиения.
+        :raises ShardingError: Если параметры разбиения некорректны
+        """
+        if self.strategy not in self.STRATEGIES:
+            raise ShardingError(f"Неизвестный способ разбиения: {self.strategy}")
+        if self.strategy == "size" and (not self.max_bytes or self.max_bytes <= 0):
+            raise ShardingError("Для разбиения по размеру укажите максимальный размер файла")
+        if self.strategy != "size" and self.shards < 1:
+            raise ShardingError("Количество шардов должно быть больше нуля")
+        if self.strategy == "hash" and not self.key_columns:
+            raise ShardingError("Для разбиения по ключу укажите ключевые колонки")
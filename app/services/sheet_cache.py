@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import pickle
+import time
+
+import pandas as pd
+
+from services.arrow_storage import ArrowData
+from utils.utils import user_data_path
+
+
+class SheetCache:
+    """
+    Кэш разобранных листов Excel на диске: повторное открытие неизмененной книги читает готовый DataFrame
+    вместо разбора xlsx. Запись определяется путем, размером и временем изменения книги и параметрами загрузки
+    (лист, заголовок), поэтому измененная книга разбирается заново.
+
+    Листы хранятся в Arrow IPC и читаются через отображение в память, если установлен pyarrow,
+    иначе — в pickle. Когда размер кэша превышает `max_bytes`, удаляются записи, которые дольше всего
+    не открывались. Поврежденные записи удаляются и считаются промахом: ошибки кэша не мешают загрузке.
+
+    :param directory: Каталог кэша (None — `~/.tab2sql/cache/sheets`)
+    :param max_bytes: Максимальный размер кэша
+    """
+    VERSION = 1
+    MAX_BYTES = 1024 * 1024 * 1024
+    EXTENSIONS = {"arrow": ".arrow", "pickle": ".pkl"}
+
+    def __init__(self, directory: str | None = None, max_bytes: int = MAX_BYTES):
+        self.directory = directory or user_data_path("cache", "sheets")
+        self.max_bytes = max_bytes
+
+    @property
+    def format(self) -> str:
+        return "arrow" if ArrowData.is_available() else "pickle"
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(entry.stat().st_size for entry in self._iter_entries())
+
+    def get_key(self, file_path: str, **options) -> str:
+        """
+        Возвращает ключ записи для файла и параметров загрузки.
+        :param file_path: Путь к книге
+        :param options: Параметры загрузки (sheet_name и т.д.)
+        :return: Ключ записи
+        :raises OSError: Если файл недоступен
+        """
+        stat = os.stat(file_path)
+        source = [self.VERSION, self.format, os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns, options]
+        return hashlib.sha1(json.dumps(source, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def get(self, file_path: str, **options) -> tuple[pd.DataFrame, str] | None:
+        """
+        Возвращает лист из кэша.
+        :param file_path: Путь к книге
+        :param options: Параметры загрузки
+        :return: DataFrame и имя таблицы или None, если записи нет
+        """
+        try:
+            key = self.get_key(file_path, **options)
+        except OSError:
+            return None
+        data_path = self._get_data_path(key)
+        meta = self._read_meta(key)
+        if meta is None or not os.path.exists(data_path):
+            return None
+        try:
+            if self.format == "arrow":
+                dataframe = ArrowData.read_ipc(data_path).to_pandas()
+            else:
+                dataframe = pd.read_pickle(data_path)
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            self._remove(key)
+            return None
+        self._touch(key)
+        return dataframe, meta["table_name"]
+
+    def put(self, file_path: str, dataframe: pd.DataFrame, table_name: str, **options) -> None:
+        """
+        Сохраняет лист в кэш и удаляет старые записи, если размер кэша превышен.
+        Ошибки записи (например, нет места на диске) игнорируются.
+        :param file_path: Путь к книге
+        :param dataframe: DataFrame листа (как его возвращает загрузчик)
+        :param table_name: Имя таблицы
+        :param options: Параметры загрузки
+        """
+        try:
+            key = self.get_key(file_path, **options)
+            os.makedirs(self.directory, exist_ok=True)
+            data_path = self._get_data_path(key)
+            temp_path = f"{data_path}.tmp"
+            if self.format == "arrow":
+                ArrowData.from_dataframe(dataframe).write_ipc(temp_path)
+            else:
+                dataframe.to_pickle(temp_path)
+            os.replace(temp_path, data_path)
+            self._write_meta(key, {"table_name": table_name, "source": os.path.abspath(file_path), "options": options})
+        except (OSError, ValueError, TypeError, pickle.PicklingError):
+            return
+        self.evict()
+
+    def get_sheet_names(self, file_path: str) -> list[str] | None:
+        """
+        Возвращает сохраненный список листов книги.
+        :param file_path: Путь к книге
+        :return: Список листов или None
+        """
+        try:
+            meta = self._read_meta(self.get_key(file_path, sheet_names=True))
+        except OSError:
+            return None
+        return meta["sheet_names"] if meta is not None else None
+
+    def put_sheet_names(self, file_path: str, sheet_names: list[str]) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self._write_meta(self.get_key(file_path, sheet_names=True), {"sheet_names": sheet_names})
+        except OSError:
+            return
+
+    def evict(self) -> int:
+        """
+        Удаляет записи, которые дольше всего не открывались, пока размер кэша больше `max_bytes`.
+        :return: Количество освобожденных байт
+        """
+        entries = [entry for entry in self._iter_entries() if entry.name.endswith(tuple(self.EXTENSIONS.values()))]
+        total = sum(entry.stat().st_size for entry in entries)
+        freed = 0
+        for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+            if total - freed <= self.max_bytes:
+                break
+            freed += entry.stat().st_size
+            self._remove(os.path.splitext(entry.name)[0])
+        return freed
+
+    def clear(self) -> tuple[int, int]:
+        """
+        Удаляет все записи кэша.
+        :return: Количество удаленных файлов и освобожденных байт
+        """
+        files, size = 0, 0
+        for entry in list(self._iter_entries()):
+            try:
+                size += entry.stat().st_size
+                os.remove(entry.path)
+                files += 1
+            except OSError:
+                continue
+        return files, size
+
+    def _iter_entries(self):
+        if not os.path.isdir(self.directory):
+            return
+        for entry in os.scandir(self.directory):
+            # Временные файлы остаются после прерванной записи и удаляются вместе с кэшем
+            if entry.is_file() and entry.name.endswith((".json", ".tmp", *self.EXTENSIONS.values())):
+                yield entry
+
+    def _get_data_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{self.EXTENSIONS[self.format]}")
+
+    def _read_meta(self, key: str) -> dict | None:
+        try:
+            with open(os.path.join(self.directory, f"{key}.json"), encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, key: str, meta: dict) -> None:
+        meta_path = os.path.join(self.directory, f"{key}.json")
+        with open(f"{meta_path}.tmp", "w", encoding="utf-8") as file:
+            json.dump(meta, file, ensure_ascii=False, default=str)
+        os.replace(f"{meta_path}.tmp", meta_path)
+
+    def _touch(self, key: str) -> None:
+        # Время изменения файла данных — время последнего открытия для вытеснения
+        now = time.time()
+        try:
+            os.utime(self._get_data_path(key), (now, now))
+        except OSError:
+            pass
+
+    def _remove(self, key: str) -> None:
+        for extension in (".json", *self.EXTENSIONS.values()):
+            try:
+                os.remove(os.path.join(self.directory, f"{key}{extension}"))
+            except FileNotFoundError:
+                pass
+
+    def __repr__(self):
+        return f"SheetCache(directory={self.directory!r}, format={self.format!r}, max_bytes={self.max_bytes})"
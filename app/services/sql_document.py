@@ -0,0 +1,206 @@
+import tempfile
+import threading
+from array import array
+from bisect import bisect_right
+from typing import Iterator
+
+
+class SQLDocument:
+    """
+    Сгенерированный SQL скрипт, хранящийся в единственном экземпляре: небольшой — в памяти,
+    большой — во временном файле на диске. При записи строится индекс смещений начала строк,
+    поэтому любую строку можно прочитать без чтения всего скрипта.
+
+    Объект поддерживает метод `write` и может передаваться как поток в `SQLFormatterFactory.write_sql`.
+    Чтение безопасно из нескольких потоков (окно просмотра и фоновое сохранение читают один файл):
+    каждое позиционирование и чтение выполняется под блокировкой.
+
+    :param max_memory_bytes: Размер, после которого скрипт переносится во временный файл
+    :param encoding: Кодировка SQL скрипта
+    """
+    MAX_MEMORY_BYTES = 8 * 1024 * 1024
+    READ_CHUNK_BYTES = 1024 * 1024
+    # Максимальная длина символа UTF-8: меньшая часть может не вместить ни одного символа
+    MIN_CHUNK_BYTES = 4
+
+    def __init__(self, max_memory_bytes: int | None = None, encoding: str = "utf-8"):
+        self.encoding = encoding
+        self.size_bytes = 0
+        self._file = tempfile.SpooledTemporaryFile(
+            max_size=max_memory_bytes if max_memory_bytes is not None else self.MAX_MEMORY_BYTES,
+            prefix="tab2sql_",
+            suffix=".sql"
+        )
+        # Смещение начала каждой строки в байтах
+        self._line_offsets = array("q", [0])
+        self._lock = threading.Lock()
+
+    @property
+    def line_count(self) -> int:
+        """
+        Возвращает количество строк скрипта (пустой скрипт — одна пустая строка).
+        """
+        return len(self._line_offsets)
+
+    @property
+    def on_disk(self) -> bool:
+        """
+        Возвращает True, если скрипт перенесен во временный файл.
+        """
+        return bool(getattr(self._file, "_rolled", False))
+
+    def write(self, text: str) -> int:
+        """
+        Дописывает текст в конец скрипта и обновляет индекс строк.
+        :param text: Фрагмент SQL скрипта
+        :return: Количество записанных символов
+        """
+        data = text.encode(self.encoding)
+        with self._lock:
+            self._file.seek(self.size_bytes)
+            self._file.write(data)
+        position = data.find(b"\n")
+        while position != -1:
+            self._line_offsets.append(self.size_bytes + position + 1)
+            position = data.find(b"\n", position + 1)
+        self.size_bytes += len(data)
+        return len(text)
+
+    def get_lines(self, start: int, count: int) -> list[str]:
+        """
+        Возвращает строки скрипта без символов перевода строки.
+        :param start: Номер первой строки (с 0)
+        :param count: Количество строк
+        :return: Список строк
+        """
+        start = max(0, min(start, self.line_count))
+        stop = min(start + count, self.line_count)
+        if start >= stop:
+            return []
+        return self.get_text(start, stop).split("\n")[:stop - start]
+
+    def get_text(self, start: int, stop: int) -> str:
+        """
+        Возвращает текст строк с `start` по `stop` (не включая) вместе с переводами строк.
+        :param start: Номер первой строки (с 0)
+        :param stop: Номер строки, перед которой заканчивается текст
+        :return: Текст строк
+        """
+        begin, end = self._get_byte_range(start, stop)
+        return self._read(begin, end - begin).decode(self.encoding)
+
+    def get_range_bytes(self, start: int, stop: int) -> int:
+        """
+        Возвращает размер строк с `start` по `stop` (не включая) в байтах.
+        :param start: Номер первой строки (с 0)
+        :param stop: Номер строки, перед которой заканчивается диапазон
+        :return: Размер в байтах
+        """
+        begin, end = self._get_byte_range(start, stop)
+        return end - begin
+
+    def get_line_at_offset(self, offset: int) -> int:
+        """
+        Возвращает номер строки, содержащей байт со смещением `offset`.
+        :param offset: Смещение в байтах
+        :return: Номер строки (с 0)
+        """
+        return max(0, bisect_right(self._line_offsets, offset) - 1)
+
+    def find(self, text: str, start_line: int = 0, match_case: bool = False) -> int | None:
+        """
+        Ищет первую строку, содержащую текст, читая скрипт построчно начиная с `start_line`.
+        :param text: Искомый текст
+        :param start_line: Номер строки, с которой начинается поиск
+        :param match_case: Учитывать регистр
+        :return: Номер найденной строки или None
+        """
+        if not text or start_line >= self.line_count:
+            return None
+        needle = text if match_case else text.casefold()
+        position = self._line_offsets[start_line]
+        line_number = start_line
+        remaining = self.size_bytes - position
+        while remaining > 0:
+            with self._lock:
+                self._file.seek(position)
+                data = self._file.readline(remaining)
+            position += len(data)
+            remaining -= len(data)
+            line = data.decode(self.encoding)
+            if needle in (line if match_case else line.casefold()):
+                return line_number
+            line_number += 1
+        return None
+
+    def iter_chunks(self, chunk_size: int | None = None) -> Iterator[str]:
+        """
+        Возвращает скрипт по частям, не загружая его в память целиком.
+        :param chunk_size: Размер части в байтах
+        :return: Итератор фрагментов текста
+        :raises ValueError: Если размер части меньше `MIN_CHUNK_BYTES`
+        """
+        chunk_size = chunk_size or self.READ_CHUNK_BYTES
+        if chunk_size < self.MIN_CHUNK_BYTES:
+            raise ValueError(f"Размер части должен быть не меньше {self.MIN_CHUNK_BYTES} байт")
+        return self._iter_chunks(chunk_size)
+
+    def _iter_chunks(self, chunk_size: int) -> Iterator[str]:
+        position = 0
+        while position < self.size_bytes:
+            data = self._read(position, min(chunk_size, self.size_bytes - position))
+            # Не разрываем многобайтовый символ UTF-8 между частями
+            cut = len(data)
+            if position + cut < self.size_bytes:
+                while cut > 0 and data[cut - 1] & 0xC0 == 0x80:
+                    cut -= 1
+                if cut > 0 and data[cut - 1] & 0xC0 == 0xC0:
+                    cut -= 1
+            position += cut
+            yield data[:cut].decode(self.encoding)
+
+    def read_text(self) -> str:
+        """
+        Возвращает скрипт целиком (только для небольших скриптов).
+        :return: Текст SQL скрипта
+        """
+        return self._read(0, self.size_bytes).decode(self.encoding)
+
+    def save(self, stream) -> None:
+        """
+        Копирует скрипт в поток с методом `write` (например, `SQLFileWriter`).
+        :param stream: Поток для записи текста
+        """
+        for chunk in self.iter_chunks():
+            stream.write(chunk)
+
+    def _read(self, position: int, size: int) -> bytes:
+        with self._lock:
+            self._file.seek(position)
+            return self._file.read(size)
+
+    def _get_byte_range(self, start: int, stop: int) -> tuple[int, int]:
+        start = max(0, min(start, self.line_count))
+        stop = max(start, min(stop, self.line_count))
+        begin = self._line_offsets[start] if start < self.line_count else self.size_bytes
+        end = self._line_offsets[stop] if stop < self.line_count else self.size_bytes
+        return begin, end
+
+    def close(self) -> None:
+        """
+        Освобождает память или удаляет временный файл.
+        """
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return self.size_bytes
+
+    def __repr__(self):
+        return (f"SQLDocument(size_bytes={self.size_bytes}, line_count={self.line_count}, "
+                f"on_disk={self.on_disk})")
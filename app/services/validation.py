@@ -0,0 +1,128 @@
+from typing import Iterator
+
+import numpy as np
+
+from models.table import Table
+from utils.errors import FailedValueFormattingError
+
+
+class ColumnValidation:
+    """
+    Результат проверки одной колонки на выборке.
+    :param column_name: Имя колонки в SQL
+    :param column_type: Тип форматирования
+    """
+    MAX_EXAMPLES = 3
+
+    def __init__(self, column_name: str, column_type: str):
+        self.column_name = column_name
+        self.column_type = column_type
+        self.values = 0
+        self.failures = 0
+        self.examples: list[str] = []
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failures / self.values if self.values else 0.0
+
+    def add_failure(self, value: any) -> None:
+        self.failures += 1
+        if len(self.examples) < self.MAX_EXAMPLES:
+            self.examples.append(str(value))
+
+    def __repr__(self):
+        return (f"ColumnValidation(column_name={self.column_name!r}, column_type={self.column_type!r}, "
+                f"values={self.values}, failure_rate={self.failure_rate:.3f})")
+
+
+class ValidationReport:
+    """
+    Результат проверки колонок на выборке перед генерацией.
+    :param columns: Результаты по колонкам
+    :param threshold: Допустимая доля ошибок в колонке
+    """
+
+    def __init__(self, columns: list[ColumnValidation], threshold: float):
+        self.columns = columns
+        self.threshold = threshold
+
+    @property
+    def failed_columns(self) -> list[ColumnValidation]:
+        """
+        Возвращает колонки, доля ошибок в которых больше допустимой (самые проблемные первыми).
+        """
+        failed = [column for column in self.columns if column.failures and column.failure_rate > self.threshold]
+        return sorted(failed, key=lambda column: -column.failure_rate)
+
+    @property
+    def passed(self) -> bool:
+        return not self.failed_columns
+
+    def iter_summary(self) -> Iterator[str]:
+        """
+        Возвращает сводку по колонкам с превышением доли ошибок.
+        :return: Итератор строк сводки
+        """
+        from utils.value_formatter import ValueFormatterFactory
+
+        types = ValueFormatterFactory().types
+        for column in self.failed_columns:
+            examples = ", ".join(f"«{example}»" for example in column.examples)
+            yield (f"Колонка «{column.column_name}» ({types.get(column.column_type, column.column_type)}): "
+                   f"ошибок {column.failures} из {column.values} ({column.failure_rate:.0%}), например {examples}")
+
+    def __repr__(self):
+        return f"ValidationReport(columns={len(self.columns)}, failed={len(self.failed_columns)})"
+
+
+class SampleValidator:
+    """
+    Быстрая проверка настроек колонок перед генерацией: форматирует случайную выборку непустых значений
+    каждой включенной колонки через ее функции форматирования (векторную и по значениям, как при генерации)
+    и считает долю ошибок. Неверный тип колонки (например, DATE для произвольного текста) обнаруживается
+    за доли секунды, а не после форматирования всех строк.
+
+    Пропуски («NULL», NaN, None) в выборку не попадают: они не говорят о неверном типе колонки.
+
+    :param table: Таблица с данными и настройками колонок
+    :param sample_size: Количество значений в выборке каждой колонки
+    :param threshold: Допустимая доля ошибок в колонке
+    :param seed: Зерно генератора случайных чисел (для воспроизводимости)
+    """
+    SAMPLE_SIZE = 1000
+    THRESHOLD = 0.2
+
+    def __init__(self, table: Table, sample_size: int = SAMPLE_SIZE, threshold: float = THRESHOLD, seed: int = 0):
+        self.table = table
+        self.sample_size = sample_size
+        self.threshold = threshold
+        self.seed = seed
+
+    def validate(self) -> ValidationReport:
+        """
+        Проверяет включенные колонки.
+        :return: Результат проверки
+        :raises UnknownColumnTypeError: Если у включенной колонки неизвестный тип
+        """
+        plan = self.table.plan
+        generator = np.random.default_rng(self.seed)
+        columns = []
+        for position, formatter, column_formatter, column_type, column_name in zip(
+            plan.positions, plan.formatters, plan.column_formatters, plan.types, plan.output_names
+        ):
+            validation = ColumnValidation(column_name, column_type)
+            series = self.table.get_series((position,))[0]
+            candidates = np.flatnonzero((series.notna() & (series != "NULL")).to_numpy())
+            sample = np.sort(generator.choice(candidates, min(self.sample_size, len(candidates)), replace=False))
+            values = series.iloc[sample].reset_index(drop=True)
+            validation.values = len(values)
+
+            result = column_formatter(values) if column_formatter is not None else None
+            pending = values.tolist() if result is None else values.iloc[result[1]].tolist()
+            for value in pending:
+                try:
+                    formatter(value)
+                except (ValueError, TypeError, FailedValueFormattingError):
+                    validation.add_failure(value)
+            columns.append(validation)
+        return ValidationReport(columns, self.threshold)
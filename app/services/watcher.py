@@ -0,0 +1,320 @@
+import fnmatch
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable
+
+import pandas as pd
+
+from models.column import Column
+from services.data_processing import DataProcessing
+from services.load_data import DataLoaderFactory
+from services.output import SQLFileWriter
+from utils.logger import ErrorCollector
+from utils.sql_formatter import SQLFormatterFactory, RenderStats
+
+
+class WatchTask:
+    """
+    Задание на конвертацию одного файла папки (передается в рабочий процесс).
+    :param file_path: Путь к исходному файлу
+    :param output_path: Путь к файлу для SQL
+    :param sql_formatter: Тип SQL шаблона
+    :param load_options: Параметры загрузки (delimiter, header, sheet_name)
+    :param columns: Настройки колонок с прошлого запуска (применяются, если заголовок не изменился)
+    :param row_hashes: Хеши строк с прошлого запуска
+    :param content_hash: Подпись содержимого файла с прошлого запуска
+    :param compression_level: Уровень сжатия
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        output_path: str,
+        sql_formatter: str,
+        load_options: dict,
+        columns: list[Column] | None = None,
+        row_hashes: frozenset[int] | None = None,
+        content_hash: str | None = None,
+        compression_level: int | None = None
+    ):
+        self.file_path = file_path
+        self.output_path = output_path
+        self.sql_formatter = sql_formatter
+        self.load_options = load_options
+        self.columns = columns
+        self.row_hashes = row_hashes
+        self.content_hash = content_hash
+        self.compression_level = compression_level
+
+
+class WatchResult:
+    """
+    Результат конвертации файла папки.
+    :param file_path: Путь к исходному файлу
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.output_path: str | None = None
+        self.columns: list[Column] = []
+        self.row_hashes: frozenset[int] = frozenset()
+        self.content_hash: str | None = None
+        self.rows = 0
+        self.new_rows = 0
+        self.removed_rows = 0
+        self.unchanged = False
+        self.seconds = 0.0
+        self.errors = ErrorCollector()
+
+
+def get_content_hash(dataframe: pd.DataFrame, row_hashes: pd.Series) -> str:
+    """
+    Возвращает подпись содержимого таблицы: заголовок (имена и типы колонок) и хеши строк по порядку,
+    поэтому переименование колонок, перестановка и дубликаты строк меняют подпись.
+    :param dataframe: Загруженная таблица
+    :param row_hashes: Хеши строк (`pd.util.hash_pandas_object`)
+    :return: Подпись в шестнадцатеричном виде
+    """
+    header = [[str(name), str(dtype)] for name, dtype in dataframe.dtypes.items()]
+    digest = hashlib.blake2b(json.dumps(header, ensure_ascii=False).encode("utf-8"), digest_size=16)
+    digest.update(row_hashes.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def convert_watched_file(task: WatchTask) -> WatchResult:
+    """
+    Загружает файл и перегенерирует SQL, если заголовок или строки изменились с прошлого запуска.
+    Функция уровня модуля, чтобы ее можно было выполнять в рабочих процессах.
+    :param task: Задание на конвертацию
+    :return: Результат конвертации
+    """
+    started = time.perf_counter()
+    result = WatchResult(task.file_path)
+    dataframe, table_name = DataLoaderFactory().load_data(file_path=task.file_path, **task.load_options)
+    result.rows = len(dataframe)
+    row_hashes = pd.util.hash_pandas_object(dataframe, index=False)
+    result.row_hashes = frozenset(row_hashes.tolist())
+    result.content_hash = get_content_hash(dataframe, row_hashes)
+
+    dp = DataProcessing(dataframe, str(table_name).lower())
+    if task.columns is not None and [c.column_name for c in task.columns] == list(dataframe.columns):
+        dp.table.columns = task.columns
+    result.columns = dp.table.columns
+
+    if task.row_hashes is not None:
+        result.new_rows = len(result.row_hashes - task.row_hashes)
+        result.removed_rows = len(task.row_hashes - result.row_hashes)
+    else:
+        result.new_rows = len(result.row_hashes)
+    result.unchanged = result.content_hash == task.content_hash and os.path.exists(task.output_path)
+    if not result.unchanged:
+        stats = RenderStats()
+        with SQLFileWriter(task.output_path, level=task.compression_level) as writer:
+            SQLFormatterFactory().write_sql(
+                writer,
+                table_name=dp.table.name,
+                columns=dp.valid_columns,
+                values=dp.iter_values(result.errors),
+                sql_formatter=task.sql_formatter,
+                stats=stats
+            )
+        result.output_path = task.output_path
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+class WatchedFile:
+    """
+    Состояние отслеживаемого файла между проходами.
+    :param file_path: Путь к файлу
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        # Подпись (размер, время изменения) последнего прохода и момент, с которого она не меняется
+        self.signature: tuple[int, float] | None = None
+        self.stable_since = 0.0
+        # Подпись, с которой файл был сконвертирован в последний раз
+        self.converted_signature: tuple[int, float] | None = None
+        self.columns: list[Column] | None = None
+        self.row_hashes: frozenset[int] | None = None
+        self.content_hash: str | None = None
+        self.future: Future | None = None
+
+
+class FolderWatcher:
+    """
+    Отслеживает папку опросом и перегенерирует SQL для файлов, у которых изменились размер
+    или время изменения. Файл конвертируется только после того, как его подпись не меняется
+    `settle_seconds` (защита от недописанных файлов). Между проходами хранятся настройки колонок
+    и подпись содержимого (заголовок и строки по порядку), поэтому SQL файла с тем же содержимым
+    не перезаписывается.
+
+    :param directory: Отслеживаемая папка
+    :param output_directory: Папка для SQL файлов
+    :param sql_formatter: Тип SQL шаблона
+    :param patterns: Шаблоны имен файлов
+    :param load_options: Параметры загрузки CSV (delimiter, header)
+    :param extension: Расширение SQL файлов (".sql", ".sql.gz", ".sql.zst")
+    :param compression_level: Уровень сжатия
+    :param workers: Максимальное количество одновременных конвертаций
+    :param interval: Период опроса, секунды
+    :param settle_seconds: Время, в течение которого файл не должен меняться
+    :param log: Функция вывода строк журнала
+    """
+    # Временные файлы редакторов и незавершенных копирований
+    IGNORED_PATTERNS = ("~$*", ".~lock*", "*.tmp", "*.part", "*.crdownload")
+    PATTERNS = ("*.csv", "*.xlsx", "*.xls")
+
+    def __init__(
+        self,
+        directory: str,
+        output_directory: str,
+        sql_formatter: str = 'Тип 1',
+        patterns: tuple[str, ...] = PATTERNS,
+        load_options: dict | None = None,
+        extension: str = ".sql",
+        compression_level: int | None = None,
+        workers: int = 2,
+        interval: float = 2.0,
+        settle_seconds: float = 2.0,
+        log: Callable[[str], None] | None = None
+    ):
+        self.directory = directory
+        self.output_directory = output_directory
+        self.sql_formatter = sql_formatter
+        self.patterns = patterns
+        self.load_options = load_options or {}
+        self.extension = extension
+        self.compression_level = compression_level
+        self.workers = workers
+        self.interval = interval
+        self.settle_seconds = settle_seconds
+        self.log = log or print
+        self.files: dict[str, WatchedFile] = {}
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def pending(self) -> int:
+        """
+        Возвращает количество конвертаций, которые выполняются или ждут в очереди.
+        """
+        return sum(1 for state in self.files.values() if state.future is not None)
+
+    def run(self, should_stop: Callable[[], bool] = lambda: False) -> None:
+        """
+        Опрашивает папку, пока `should_stop` не вернет True (или до KeyboardInterrupt).
+        :param should_stop: Функция проверки остановки
+        """
+        os.makedirs(self.output_directory, exist_ok=True)
+        self.log(f"Отслеживается {self.directory} → {self.output_directory}")
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            while not should_stop():
+                self.poll()
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            self.log("Остановка по запросу пользователя")
+        finally:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def poll(self, now: float | None = None) -> list[str]:
+        """
+        Выполняет один проход: собирает завершенные конвертации и запускает новые.
+        :param now: Текущее время (time.monotonic), для проверки стабильности файла
+        :return: Пути файлов, отправленных на конвертацию
+        """
+        now = time.monotonic() if now is None else now
+        self._collect()
+        submitted = []
+        seen = set()
+        for file_path in self._list_files():
+            seen.add(file_path)
+            state = self.files.setdefault(file_path, WatchedFile(file_path))
+            if self._is_ready(state, now):
+                self._submit(state)
+                submitted.append(file_path)
+        for file_path in set(self.files) - seen:
+            if self.files[file_path].future is None:
+                del self.files[file_path]
+                self.log(f"Файл удален: {os.path.basename(file_path)}")
+        return submitted
+
+    def _list_files(self) -> list[str]:
+        file_paths = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            if any(fnmatch.fnmatch(entry.name, pattern) for pattern in self.IGNORED_PATTERNS):
+                continue
+            if any(fnmatch.fnmatch(entry.name.lower(), pattern) for pattern in self.patterns):
+                file_paths.append(entry.path)
+        return sorted(file_paths)
+
+    def _is_ready(self, state: WatchedFile, now: float) -> bool:
+        """
+        Проверяет, изменился ли файл с последней конвертации и перестал ли он меняться.
+        """
+        try:
+            stat = os.stat(state.file_path)
+        except FileNotFoundError:
+            return False
+        signature = (stat.st_size, stat.st_mtime)
+        if signature != state.signature:
+            state.signature = signature
+            state.stable_since = now
+            return False
+        return (
+            state.future is None
+            and signature != state.converted_signature
+            and now - state.stable_since >= self.settle_seconds
+        )
+
+    def _submit(self, state: WatchedFile) -> None:
+        # Расширение исходного файла остается в имени: data.csv и data.xlsx не пишут в один data.sql
+        name = os.path.basename(state.file_path)
+        load_options = self.load_options if state.file_path.lower().endswith(".csv") else {}
+        task = WatchTask(
+            file_path=state.file_path,
+            output_path=os.path.join(self.output_directory, f"{name}{self.extension}"),
+            sql_formatter=self.sql_formatter,
+            load_options=load_options,
+            columns=state.columns,
+            row_hashes=state.row_hashes,
+            content_hash=state.content_hash,
+            compression_level=self.compression_level
+        )
+        state.converted_signature = state.signature
+        state.future = self._executor.submit(convert_watched_file, task)
+        self.log(f"В очереди: {os.path.basename(state.file_path)} (в работе: {self.pending})")
+
+    def _collect(self) -> None:
+        """
+        Обрабатывает завершенные конвертации и сохраняет состояние файлов.
+        """
+        for state in self.files.values():
+            if state.future is None or not state.future.done():
+                continue
+            future, state.future = state.future, None
+            name = os.path.basename(state.file_path)
+            try:
+                result = future.result()
+            except Exception as e:
+                # Файл будет повторно сконвертирован после следующего изменения
+                self.log(f"Ошибка: {name}: {e}")
+                continue
+            state.columns = result.columns
+            state.row_hashes = result.row_hashes
+            state.content_hash = result.content_hash
+            if result.unchanged:
+                self.log(f"Без изменений: {name} (строк {result.rows})")
+                continue
+            self.log(
+                f"Готово: {name} → {os.path.basename(result.output_path)}: строк {result.rows} "
+                f"(новых {result.new_rows}, удалено {result.removed_rows}), "
+                f"ошибок {result.errors.total}, {result.seconds:.2f} с"
+            )
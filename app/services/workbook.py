@@ -0,0 +1,266 @@
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable
+
+import pandas as pd
+
+from models.column import Column
+from services.data_processing import DataProcessing
+from services.load_data import DataLoaderFactory, LoadExcel
+from services.output import SQLFileWriter
+from utils.logger import ErrorCollector
+from utils.sql_formatter import SQLFormatterFactory, RenderStats
+
+
+class SheetResult:
+    """
+    Результат конвертации одного листа книги.
+    :param sheet_name: Имя листа
+    :param table_name: Название таблицы
+    """
+
+    def __init__(self, sheet_name: str, table_name: str):
+        self.sheet_name = sheet_name
+        self.table_name = table_name
+        self.file_path: str | None = None
+        self.rows = 0
+        self.load_seconds = 0.0
+        self.format_seconds = 0.0
+        self.render_seconds = 0.0
+        self.errors = ErrorCollector()
+        self.skipped = False
+
+    @property
+    def total_seconds(self) -> float:
+        return self.load_seconds + self.format_seconds + self.render_seconds
+
+    def __repr__(self):
+        return (f"SheetResult(sheet_name={self.sheet_name!r}, rows={self.rows}, "
+                f"total_seconds={self.total_seconds:.3f}, errors={len(self.errors)})")
+
+
+class SheetTask:
+    """
+    Задание на конвертацию одного листа (передается в рабочий процесс).
+    :param file_path: Путь к Excel-файлу
+    :param sheet_name: Имя листа
+    :param output_path: Путь к файлу для SQL
+    :param sql_formatter: Тип SQL шаблона
+    :param table_name: Название таблицы (None — по имени листа)
+    :param columns: Настроенные колонки листа (None — определить автоматически)
+    :param compression_level: Уровень сжатия
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        sheet_name: str,
+        output_path: str,
+        sql_formatter: str,
+        table_name: str | None = None,
+        columns: list[Column] | None = None,
+        compression_level: int | None = None
+    ):
+        self.file_path = file_path
+        self.sheet_name = sheet_name
+        self.output_path = output_path
+        self.sql_formatter = sql_formatter
+        self.table_name = table_name
+        self.columns = columns
+        self.compression_level = compression_level
+
+
+def convert_sheet(task: SheetTask, dataframe: pd.DataFrame | None = None) -> SheetResult:
+    """
+    Загружает (если не передан `dataframe`), форматирует и записывает в файл один лист.
+    Функция уровня модуля, чтобы ее можно было выполнять в рабочих процессах.
+    :param task: Задание на конвертацию
+    :param dataframe: Уже загруженные данные листа (с заполнением пропусков "NULL")
+    :return: Результат конвертации листа
+    """
+    started = time.perf_counter()
+    if dataframe is None:
+        dataframe, _ = DataLoaderFactory().load_data(file_path=task.file_path, sheet_name=task.sheet_name)
+    result = SheetResult(task.sheet_name, (task.table_name or task.sheet_name).lower())
+    result.load_seconds = time.perf_counter() - started
+    if dataframe.empty:
+        result.skipped = True
+        return result
+
+    dp = DataProcessing(dataframe, result.table_name)
+    if task.columns is not None:
+        dp.table.columns = task.columns
+    stats = RenderStats()
+    with SQLFileWriter(task.output_path, level=task.compression_level) as writer:
+        SQLFormatterFactory().write_sql(
+            writer,
+            table_name=dp.table.name,
+            columns=dp.valid_columns,
+            values=dp.iter_values(result.errors),
+            sql_formatter=task.sql_formatter,
+            stats=stats
+        )
+    result.file_path = task.output_path
+    result.rows = stats.rows
+    result.format_seconds = stats.format_seconds
+    result.render_seconds = stats.render_seconds
+    return result
+
+
+class WorkbookConverter:
+    """
+    Конвертирует все листы Excel-книги в SQL за один проход.
+    При `workers` <= 1 книга разбирается один раз и листы форматируются последовательно,
+    иначе листы читаются и форматируются параллельно в рабочих процессах.
+
+    :param file_path: Путь к Excel-файлу
+    :param sql_formatter: Тип SQL шаблона
+    :param workers: Количество рабочих процессов (None — по числу ядер)
+    :param column_plans: Настроенные колонки по именам листов
+    :param table_names: Названия таблиц по именам листов
+    :param compression_level: Уровень сжатия
+    """
+    OUTPUT_MODES: dict[str, str] = {
+        "combined": "Один файл",
+        "per_sheet": "Файл на лист",
+    }
+
+    def __init__(
+        self,
+        file_path: str,
+        sql_formatter: str = 'Тип 1',
+        workers: int | None = None,
+        column_plans: dict[str, list[Column]] | None = None,
+        table_names: dict[str, str] | None = None,
+        compression_level: int | None = None
+    ):
+        self.file_path = file_path
+        self.sql_formatter = sql_formatter
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.column_plans = column_plans or {}
+        self.table_names = table_names or {}
+        self.compression_level = compression_level
+        self.parse_seconds = 0.0
+
+    @property
+    def sheet_names(self) -> list[str]:
+        return LoadExcel(self.file_path).get_sheet_names()
+
+    def convert(
+        self,
+        destination: str,
+        mode: str = "combined",
+        extension: str = ".sql",
+        progress_callback: Callable[[int, int, SheetResult], None] | None = None
+    ) -> list[SheetResult]:
+        """
+        Конвертирует все листы книги.
+        :param destination: Путь к файлу (mode="combined") или каталог (mode="per_sheet")
+        :param mode: Режим вывода: "combined" — один скрипт, "per_sheet" — файл на лист
+        :param extension: Расширение файлов для mode="per_sheet"
+        :param progress_callback: Функция (готово, всего, результат листа), вызывается по завершении листа.
+                                  Исключение из нее прерывает конвертацию (например, при отмене задачи)
+        :return: Результаты по листам в порядке листов книги (ошибки форматирования — в `SheetResult.errors`)
+        """
+        sheet_names = self.sheet_names
+        if mode == "combined":
+            work_dir = tempfile.mkdtemp(prefix="tab2sql_", dir=os.path.dirname(os.path.abspath(destination)))
+            extension = ".sql"
+        else:
+            work_dir = destination
+            os.makedirs(work_dir, exist_ok=True)
+        try:
+            tasks = [
+                self._get_task(index, sheet_name, work_dir, extension, mode)
+                for index, sheet_name in enumerate(sheet_names, start=1)
+            ]
+            if self.workers <= 1 or len(tasks) <= 1:
+                results = self._convert_sequential(tasks, progress_callback)
+            else:
+                results = self._convert_parallel(tasks, progress_callback)
+            if mode == "combined":
+                self._merge(results, destination)
+        finally:
+            if mode == "combined":
+                shutil.rmtree(work_dir, ignore_errors=True)
+        return results
+
+    def _get_task(self, index: int, sheet_name: str, work_dir: str, extension: str, mode: str) -> SheetTask:
+        """
+        Создает задание для листа. Временные файлы для объединения именуются по номеру листа.
+        """
+        table_name = self.table_names.get(sheet_name, sheet_name)
+        file_name = f"{table_name.lower()}{extension}" if mode == "per_sheet" else f"{index:03d}{extension}"
+        return SheetTask(
+            file_path=self.file_path,
+            sheet_name=sheet_name,
+            output_path=os.path.join(work_dir, file_name),
+            sql_formatter=self.sql_formatter,
+            table_name=table_name,
+            columns=self.column_plans.get(sheet_name),
+            compression_level=self.compression_level if mode == "per_sheet" else None
+        )
+
+    def _convert_sequential(
+        self,
+        tasks: list[SheetTask],
+        progress_callback: Callable[[int, int, SheetResult], None] | None
+    ) -> list[SheetResult]:
+        """
+        Разбирает книгу один раз и форматирует листы последовательно.
+        """
+        started = time.perf_counter()
+        frames = LoadExcel(self.file_path).get_sheets([task.sheet_name for task in tasks])
+        self.parse_seconds = time.perf_counter() - started
+        results = []
+        for task in tasks:
+            result = convert_sheet(task, dataframe=frames.pop(task.sheet_name).fillna("NULL"))
+            results.append(result)
+            if progress_callback is not None:
+                progress_callback(len(results), len(tasks), result)
+        return results
+
+    def _convert_parallel(
+        self,
+        tasks: list[SheetTask],
+        progress_callback: Callable[[int, int, SheetResult], None] | None
+    ) -> list[SheetResult]:
+        """
+        Читает и форматирует листы параллельно в рабочих процессах.
+        """
+        results: dict[str, SheetResult] = {}
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks))) as executor:
+            futures = [executor.submit(convert_sheet, task) for task in tasks]
+            try:
+                for future in as_completed(futures):
+                    result = future.result()
+                    results[result.sheet_name] = result
+                    if progress_callback is not None:
+                        progress_callback(len(results), len(tasks), result)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+        return [results[task.sheet_name] for task in tasks]
+
+    def _merge(self, results: list[SheetResult], destination: str) -> None:
+        """
+        Объединяет скрипты листов в один файл в порядке листов книги.
+        :param results: Результаты по листам
+        :param destination: Путь к итоговому файлу
+        """
+        with SQLFileWriter(destination, level=self.compression_level) as writer:
+            first = True
+            for result in results:
+                if result.skipped:
+                    continue
+                if not first:
+                    writer.write("\n\n")
+                first = False
+                with open(result.file_path, encoding="utf-8") as file:
+                    while chunk := file.read(1024 * 1024):
+                        writer.write(chunk)
+                result.file_path = destination
@@ -0,0 +1,301 @@
+import io
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from utils.errors import ProfilerNotAvailableError
+from utils.utils import format_bytes
+
+
+def get_rss_bytes() -> int | None:
+    """
+    Возвращает текущий размер резидентной памяти процесса (None, если недоступно: читается из /proc).
+    """
+    try:
+        with open("/proc/self/statm", encoding="ascii") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def format_signed_bytes(size: int) -> str:
+    return f"-{format_bytes(-size)}" if size < 0 else format_bytes(size)
+
+
+class Span:
+    """
+    Замер одного этапа конвейера.
+    :param name: Название этапа
+    :param depth: Уровень вложенности (0 — этап верхнего уровня)
+    :param rows: Количество обработанных строк
+    :param size_bytes: Количество обработанных байт
+    :param seconds: Время выполнения, секунды
+    :param peak_bytes: Пик памяти Python сверх занятой в начале этапа (tracemalloc)
+    :param retained_bytes: Память Python, оставшаяся занятой после этапа (отрицательная — этап освободил память)
+    :param rss_bytes: Резидентная память процесса в конце этапа
+    """
+    __slots__ = ("name", "depth", "rows", "size_bytes", "seconds", "peak_bytes", "retained_bytes", "rss_bytes")
+
+    def __init__(
+        self,
+        name: str,
+        depth: int = 0,
+        rows: int | None = None,
+        size_bytes: int | None = None,
+        seconds: float = 0.0,
+        peak_bytes: int | None = None,
+        retained_bytes: int | None = None,
+        rss_bytes: int | None = None
+    ):
+        self.name = name
+        self.depth = depth
+        self.rows = rows
+        self.size_bytes = size_bytes
+        self.seconds = seconds
+        self.peak_bytes = peak_bytes
+        self.retained_bytes = retained_bytes
+        self.rss_bytes = rss_bytes
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "depth": self.depth,
+            "seconds": self.seconds,
+            "rows": self.rows,
+            "bytes": self.size_bytes,
+            "rows_per_second": self.rows / self.seconds if self.rows and self.seconds else None,
+            "mb_per_second": self.size_bytes / 1024 / 1024 / self.seconds if self.size_bytes and self.seconds else None,
+            "peak_bytes": self.peak_bytes,
+            "retained_bytes": self.retained_bytes,
+            "rss_bytes": self.rss_bytes,
+        }
+
+    def __repr__(self):
+        return f"Span(name={self.name!r}, depth={self.depth}, seconds={self.seconds:.4f}, rows={self.rows})"
+
+
+# Возвращается выключенной диагностикой: запись в него ни на что не влияет
+_NULL_SPAN = Span("")
+
+
+class Diagnostics:
+    """
+    Замеры этапов одной операции (загрузки, генерации, сохранения): именованные вложенные этапы
+    с монотонным таймером, счетчиками строк и байт и, по запросу, профилем cProfile или pyinstrument.
+    Замеряются только этапы целиком, поэтому накладные расходы не зависят от размера таблицы,
+    а выключенная диагностика не замеряет ничего.
+
+    С `trace_memory` для каждого этапа замеряются пик и остаток памяти Python (tracemalloc) и резидентная
+    память процесса, а `record_memory_usage` сохраняет размер колонок DataFrame. tracemalloc замедляет
+    выполнение в несколько раз, поэтому включается только на время этапов верхнего уровня
+    (если его не включил кто-то другой).
+
+    :param name: Название операции
+    :param enabled: Включить замеры
+    :param profile_stages: Этапы, которые нужно профилировать («*» — все этапы верхнего уровня)
+    :param profiler: Профилировщик ("cprofile" или "pyinstrument")
+    :param profile_lines: Количество строк отчета cProfile
+    :param trace_memory: Замерять память этапов
+    """
+    PROFILERS = ("cprofile", "pyinstrument")
+
+    def __init__(
+        self,
+        name: str = "",
+        enabled: bool = True,
+        profile_stages: tuple[str, ...] | set[str] = (),
+        profiler: str = "cprofile",
+        profile_lines: int = 30,
+        trace_memory: bool = False
+    ):
+        self.name = name
+        self.enabled = enabled
+        self.profile_stages = set(profile_stages)
+        self.profiler = profiler
+        self.profile_lines = profile_lines
+        self.trace_memory = trace_memory
+        self.created = time.time()
+        self.spans: list[Span] = []
+        self.profiles: dict[str, str] = {}
+        self.memory_usage: dict[str, dict[str, int]] = {}
+        self._depth = 0
+        self._profiling = False
+        # Пики открытых этапов: tracemalloc хранит один пик, который сбрасывается при входе во вложенный этап
+        self._memory_peaks: list[int] = []
+        self._started_tracing = False
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(span.seconds for span in self.spans if span.depth == 0)
+
+    @contextmanager
+    def span(self, name: str, rows: int | None = None, size_bytes: int | None = None) -> Iterator[Span]:
+        """
+        Замеряет этап. Счетчики можно заполнить внутри блока: `span.rows = ...`.
+        :param name: Название этапа
+        :param rows: Количество строк (если известно заранее)
+        :param size_bytes: Количество байт (если известно заранее)
+        :return: Замер этапа
+        :raises ProfilerNotAvailableError: Если выбранный профилировщик не установлен
+        """
+        if not self.enabled:
+            yield _NULL_SPAN
+            return
+        span = Span(name, self._depth, rows, size_bytes)
+        self.spans.append(span)
+        profiler = self._start_profiler(name)
+        memory_start = self._start_memory() if self.trace_memory else None
+        self._depth += 1
+        started = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.seconds = time.perf_counter() - started
+            self._depth -= 1
+            if memory_start is not None:
+                self._stop_memory(span, memory_start)
+            if profiler is not None:
+                self.profiles[name] = self._stop_profiler(profiler)
+
+    def add(self, name: str, seconds: float, rows: int | None = None, size_bytes: int | None = None) -> None:
+        """
+        Добавляет этап, замеренный отдельно (например, время форматирования из `RenderStats`),
+        на уровне текущего этапа.
+        :param name: Название этапа
+        :param seconds: Время выполнения, секунды
+        :param rows: Количество строк
+        :param size_bytes: Количество байт
+        """
+        if self.enabled:
+            self.spans.append(Span(name, self._depth, rows, size_bytes, seconds))
+
+    def record_memory_usage(self, name: str, dataframe) -> None:
+        """
+        Сохраняет размер колонок DataFrame (`memory_usage(deep=True)`), если замеряется память.
+        Подсчет проходит по всем строковым значениям, поэтому без `trace_memory` не выполняется.
+        :param name: Название таблицы в отчете (например, «load»)
+        :param dataframe: DataFrame
+        """
+        if self.enabled and self.trace_memory:
+            usage = dataframe.memory_usage(deep=True)
+            self.memory_usage[name] = {str(column): int(size) for column, size in usage.items()}
+
+    def format_summary(self, max_spans: int = 4) -> str:
+        """
+        Возвращает краткую сводку для строки состояния.
+        :param max_spans: Количество самых долгих этапов верхнего уровня в сводке
+        :return: Строка вида «Генерация SQL: 2.31 с (generate 2.20 с · display 0.11 с)»
+        """
+        top = sorted((span for span in self.spans if span.depth == 0), key=lambda span: -span.seconds)[:max_spans]
+        details = " · ".join(f"{span.name} {span.seconds:.2f} с" for span in top)
+        return f"{self.name}: {self.total_seconds:.2f} с" + (f" ({details})" if details else "")
+
+    def iter_report(self) -> Iterator[str]:
+        """
+        Возвращает подробный отчет: этапы с отступами по вложенности, скорость обработки и профили.
+        """
+        yield f"{self.name} — {time.strftime('%H:%M:%S', time.localtime(self.created))}, {self.total_seconds:.3f} с"
+        for span in self.spans:
+            values = span.to_dict()
+            line = f"{'  ' * (span.depth + 1)}{span.name}: {span.seconds:.3f} с"
+            if span.rows is not None:
+                line += f", строк {span.rows}"
+            if values["rows_per_second"]:
+                line += f" ({values['rows_per_second']:,.0f} строк/с)"
+            if values["mb_per_second"]:
+                line += f", {values['mb_per_second']:.1f} МБ/с"
+            if span.peak_bytes is not None:
+                line += (f"; память: пик {format_bytes(span.peak_bytes)}, "
+                         f"остается {format_signed_bytes(span.retained_bytes)}")
+            if span.rss_bytes is not None:
+                line += f", RSS {format_bytes(span.rss_bytes)}"
+            yield line
+        for name, usage in self.memory_usage.items():
+            columns = sorted(usage.items(), key=lambda item: -item[1])
+            yield f"  Память DataFrame «{name}»: {format_bytes(sum(usage.values()))}"
+            for column, size in columns[:10]:
+                yield f"    {column}: {format_bytes(size)}"
+            if len(columns) > 10:
+                yield f"    ... еще {len(columns) - 10} колонок: {format_bytes(sum(size for _, size in columns[10:]))}"
+        for name, report in self.profiles.items():
+            yield f"  Профиль этапа «{name}»:"
+            yield report
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "created": self.created,
+            "total_seconds": self.total_seconds,
+            "spans": [span.to_dict() for span in self.spans],
+            "profiles": self.profiles,
+            "memory_usage": self.memory_usage,
+        }
+
+    def dump(self, stream) -> None:
+        """
+        Записывает замеры в поток в формате JSON.
+        :param stream: Поток с методом `write`
+        """
+        json.dump(self.to_dict(), stream, ensure_ascii=False, indent=2)
+
+    def _start_memory(self) -> int:
+        """
+        Запускает tracemalloc для этапа верхнего уровня и сбрасывает пик.
+        :return: Память Python в начале этапа
+        """
+        # Импорт внутри метода: tracemalloc загружает pickle и linecache и замедляет запуск окна
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        current, peak = tracemalloc.get_traced_memory()
+        self._memory_peaks = [max(outer_peak, peak) for outer_peak in self._memory_peaks]
+        self._memory_peaks.append(current)
+        tracemalloc.reset_peak()
+        return current
+
+    def _stop_memory(self, span: Span, start: int) -> None:
+        import tracemalloc
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, self._memory_peaks.pop())
+        self._memory_peaks = [max(outer_peak, peak) for outer_peak in self._memory_peaks]
+        span.peak_bytes = peak - start
+        span.retained_bytes = current - start
+        span.rss_bytes = get_rss_bytes()
+        if self._started_tracing and not self._memory_peaks:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _start_profiler(self, name: str):
+        # Профили не вкладываются: профилируется только внешний из выбранных этапов
+        if self._profiling or (name not in self.profile_stages and "*" not in self.profile_stages):
+            return None
+        if self.profiler == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                raise ProfilerNotAvailableError("Профилировщик pyinstrument не установлен (pip install pyinstrument)")
+            profiler = Profiler()
+            profiler.start()
+        else:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        self._profiling = True
+        return profiler
+
+    def _stop_profiler(self, profiler) -> str:
+        self._profiling = False
+        if self.profiler == "pyinstrument":
+            profiler.stop()
+            return profiler.output_text()
+        import pstats
+        profiler.disable()
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(self.profile_lines)
+        return stream.getvalue()
+
+    def __repr__(self):
+        return f"Diagnostics(name={self.name!r}, spans={len(self.spans)}, total_seconds={self.total_seconds:.3f})"
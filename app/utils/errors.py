@@ -44,6 +44,19 @@ class TypeNotFoundError(DataProcessingError):
     """Тип столбца не найден."""
 
 
+class StorageNotFoundError(DataProcessingError):
+    """Неизвестный способ хранения данных таблицы."""
+
+
+# arrow_storage.py
+class ArrowStorageError(Exception):
+    """Базовый класс для всех исключений в arrow_storage."""
+
+
+class ArrowNotAvailableError(ArrowStorageError):
+    """Пакет pyarrow не установлен."""
+
+
 # value_formatter.py
 class ValueFormatterError(Exception):
     """Базовый класс для всех исключений в value_formatter."""
@@ -64,3 +77,77 @@ class SQLFormatterError(Exception):
 
 class SQLFormatterNotFoundError(SQLFormatterError):
     """Тип форматирования для SQL не найден."""
+
+
+class SQLTemplateError(SQLFormatterError):
+    """Некорректное описание SQL шаблона."""
+
+
+# output.py
+class SQLOutputError(Exception):
+    """Базовый класс для всех исключений в output."""
+
+
+class CompressionNotAvailableError(SQLOutputError):
+    """Алгоритм сжатия недоступен."""
+
+
+class InvalidCompressionLevelError(SQLOutputError):
+    """Уровень сжатия вне допустимого диапазона."""
+
+
+# sharding.py
+class ShardingError(Exception):
+    """Некорректные параметры разбиения SQL на шарды."""
+
+
+# jobs.py
+class JobError(Exception):
+    """Базовый класс для всех исключений в jobs."""
+
+
+class JobCancelledError(JobError):
+    """Задача отменена пользователем."""
+
+
+class JobRunnerBusyError(JobError):
+    """Уже выполняется другая задача."""
+
+
+# cli.py
+class CLIError(Exception):
+    """Базовый класс для всех исключений в cli."""
+
+
+class ColumnOverrideError(CLIError):
+    """Некорректное переопределение колонки (колонка или тип не найдены)."""
+
+
+# diagnostics.py
+class DiagnosticsError(Exception):
+    """Базовый класс для всех исключений в diagnostics."""
+
+
+class ProfilerNotAvailableError(DiagnosticsError):
+    """Выбранный профилировщик не установлен."""
+
+
+# http_service.py
+class HTTPServiceError(Exception):
+    """Базовый класс для всех исключений в http_service."""
+
+
+class BadRequestError(HTTPServiceError):
+    """Некорректный HTTP запрос (метод, заголовки, параметры или план колонок)."""
+
+
+class PayloadTooLargeError(HTTPServiceError):
+    """Размер загружаемого файла превышает допустимый."""
+
+
+class PathNotAllowedError(HTTPServiceError):
+    """Путь к файлу вне разрешенной папки или чтение файлов по пути отключено."""
+
+
+class ServiceBusyError(HTTPServiceError):
+    """Очередь конвертаций заполнена."""
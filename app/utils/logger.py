@@ -1,10 +1,139 @@
-VALUE_FORMATTER_ERRORS = []
+from typing import Iterator
 
+from utils.value_formatter import ValueFormatterFactory
 
-def log_error(logger: list[str] | None, message: str) -> None:
+
+class FormattingErrorRecord:
+    """
+    Компактная запись об ошибке форматирования одного значения.
+    :param row_number: Номер строки
+    :param column_name: Имя колонки
+    :param column_type: Тип форматирования
+    :param value: Входное значение (строковое представление, обрезанное до `ErrorCollector.MAX_VALUE_LENGTH`)
+    """
+    __slots__ = ("row_number", "column_name", "column_type", "value")
+
+    def __init__(self, row_number: int, column_name: str, column_type: str, value: str):
+        self.row_number = row_number
+        self.column_name = column_name
+        self.column_type = column_type
+        self.value = value
+
+    def __getstate__(self):
+        return self.row_number, self.column_name, self.column_type, self.value
+
+    def __setstate__(self, state):
+        self.row_number, self.column_name, self.column_type, self.value = state
+
+    def __repr__(self):
+        return (f"FormattingErrorRecord(row_number={self.row_number}, column_name={self.column_name!r}, "
+                f"column_type={self.column_type!r})")
+
+
+class ErrorCollector:
     """
-    Записывает ошибку в лог нужный логгер.
-    :param logger: Список, куда добавляется сообщение.
-    :param message: Сообщение об ошибке.
+    Сборщик ошибок форматирования одного запуска генерации. Хранит количество ошибок
+    по колонкам и типам, а примеры — только первые `max_examples` для каждой колонки.
+    Текст сообщений формируется только при просмотре.
+
+    :param max_examples: Максимальное количество примеров на колонку
     """
-    logger.append(message)
+    MAX_EXAMPLES = 100
+    MAX_VALUE_LENGTH = 100
+
+    def __init__(self, max_examples: int | None = None):
+        self.max_examples = max_examples if max_examples is not None else self.MAX_EXAMPLES
+        self.total = 0
+        self.column_counts: dict[str, int] = {}
+        self.type_counts: dict[str, int] = {}
+        self.examples: list[FormattingErrorRecord] = []
+
+    @property
+    def example_count(self) -> int:
+        return len(self.examples)
+
+    def add(self, row_number: int, column_name: str, column_type: str, input_value: any) -> None:
+        """
+        Учитывает ошибку форматирования значения.
+        :param row_number: Номер строки
+        :param column_name: Имя колонки
+        :param column_type: Тип форматирования
+        :param input_value: Входное значение
+        """
+        self.total += 1
+        column_count = self.column_counts.get(column_name, 0) + 1
+        self.column_counts[column_name] = column_count
+        self.type_counts[column_type] = self.type_counts.get(column_type, 0) + 1
+        if column_count <= self.max_examples:
+            value = str(input_value)
+            if len(value) > self.MAX_VALUE_LENGTH:
+                value = value[:self.MAX_VALUE_LENGTH] + "…"
+            self.examples.append(FormattingErrorRecord(row_number, column_name, column_type, value))
+
+    def merge(self, other: "ErrorCollector", limit_examples: bool = False) -> None:
+        """
+        Добавляет ошибки другого сборщика (например, из рабочего процесса).
+        :param other: Сборщик ошибок
+        :param limit_examples: Оставлять не больше `max_examples` примеров на колонку, как если бы ошибки
+            добавлялись в этот сборщик по порядку (для частей одной таблицы)
+        """
+        previous_counts = dict(self.column_counts)
+        self.total += other.total
+        for column_name, count in other.column_counts.items():
+            self.column_counts[column_name] = self.column_counts.get(column_name, 0) + count
+        for column_type, count in other.type_counts.items():
+            self.type_counts[column_type] = self.type_counts.get(column_type, 0) + count
+        if not limit_examples:
+            self.examples.extend(other.examples)
+            return
+        for record in other.examples:
+            column_count = previous_counts.get(record.column_name, 0)
+            if column_count < self.max_examples:
+                self.examples.append(record)
+            previous_counts[record.column_name] = column_count + 1
+
+    def get_messages(self, start: int = 0, count: int | None = None) -> list[str]:
+        """
+        Возвращает текст сообщений для части примеров.
+        :param start: Номер первого примера
+        :param count: Количество примеров (None — до конца)
+        :return: Список сообщений
+        """
+        stop = len(self.examples) if count is None else start + count
+        return [self.format_message(record) for record in self.examples[start:stop]]
+
+    def iter_summary(self) -> Iterator[str]:
+        """
+        Возвращает сводку: количество ошибок по колонкам и по типам.
+        :return: Итератор строк сводки
+        """
+        types = ValueFormatterFactory().types
+        for column_name, count in sorted(self.column_counts.items(), key=lambda item: -item[1]):
+            yield f"Колонка «{column_name}»: {count}"
+        for column_type, count in sorted(self.type_counts.items(), key=lambda item: -item[1]):
+            yield f"Тип «{types.get(column_type, column_type)}»: {count}"
+
+    @staticmethod
+    def format_message(record: FormattingErrorRecord) -> str:
+        """
+        Формирует текст сообщения об ошибке.
+        :param record: Запись об ошибке
+        :return: Сообщение об ошибке
+        """
+        readable_type = ValueFormatterFactory().types.get(record.column_type, record.column_type)
+        return (
+            f"Ошибка преобразования [{record.row_number}, {record.column_name}]: "
+            f"входное значение «{record.value}» в тип «{readable_type}»"
+        )
+
+    def clear(self) -> None:
+        self.total = 0
+        self.column_counts.clear()
+        self.type_counts.clear()
+        self.examples.clear()
+
+    def __len__(self):
+        return self.total
+
+    def __repr__(self):
+        return f"ErrorCollector(total={self.total}, columns={len(self.column_counts)}, examples={len(self.examples)})"
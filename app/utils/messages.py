@@ -26,3 +26,54 @@ DELIMITER_CHANGED = "Разделитель успешно изменён на 
 TABLE_NAME_CHANGED = "Название таблицы успешно изменено на «{table_name}»"
 SQL_GENERATION_ERROR = "Не удалось сгенерировать SQL"
 SQL_COPIED_TO_CLIPBOARD = "SQL скопирован в буфер обмена"
+SQL_RENDER_STATS = "Строк: {rows} · значения: {format_seconds:.2f} с · шаблон: {render_seconds:.2f} с"
+SQL_SAVED = "SQL сохранен в файл:\n{file_path}\n\nРазмер скрипта: {raw_size}\nРазмер файла: {file_size}"
+SQL_SHARDS_SAVED = "Создано файлов: {shards}\nСтрок: {rows}\nРазмер скриптов: {raw_size}\nРазмер файлов: {file_size}\n\nМанифест: {manifest}"
+ALL_SHEETS_MODE = "Сохранить все листы в один файл?\n\n«Да» — один общий скрипт\n«Нет» — отдельный файл на каждый лист"
+ALL_SHEETS_REPORT = "Листов: {sheets} · строк: {rows} · время: {seconds:.2f} с"
+SHEET_REPORT_LINE = (
+    "{sheet_name}: строк {rows}, чтение {load_seconds:.2f} с, значения {format_seconds:.2f} с, "
+    "шаблон {render_seconds:.2f} с, ошибок {errors}"
+)
+SHEET_SKIPPED_LINE = "{sheet_name}: нет данных, пропущен"
+SQL_ESTIMATE = (
+    "Строк: {rows} (выборка: {sample_rows})\n"
+    "Ожидаемый размер скрипта: {size}\n"
+    "Ожидаемое время генерации: {seconds:.1f} с\n\n"
+    "Самые медленные колонки (мкс на значение):\n{columns}"
+)
+SQL_ESTIMATE_COLUMN = "  {column_name} ({column_type}): {us_per_value:.1f} мкс, {bytes_per_value:.0f} Б"
+SQL_TOO_LARGE_FOR_VIEWER = (
+    "Ожидаемый размер скрипта — {size}, время генерации — {seconds:.0f} с.\n"
+    "Такой объем будет медленно отображаться в окне просмотра.\n\n"
+    "Сохранить SQL сразу в файл?"
+)
+SAMPLE_VALIDATION_FAILED = (
+    "Проверка выборки значений: в колонках ниже больше {threshold:.0%} значений не удалось преобразовать\n"
+    "(при генерации они будут заменены на NULL). Возможно, выбран неверный тип колонки.\n\n"
+    "{columns}\n\n"
+    "Продолжить генерацию?"
+)
+JOB_IN_PROGRESS = "Дождитесь завершения текущей операции или отмените ее."
+JOB_PROGRESS_STAGE = "{stage}… {seconds:.0f} с"
+JOB_PROGRESS_ROWS = "{stage}: {done} из {total} · осталось ~{eta}"
+SQL_TEXT_NOT_FOUND = "Текст «{text}» не найден."
+INVALID_LINE_NUMBER = "Укажите номер строки целым числом."
+NO_COLUMNS_SELECTED = "Выберите колонки флажками слева или кнопкой «Выбрать все»."
+EMPTY_COLUMN_PATTERN = "Укажите шаблон имени колонки, например: *_id или date*"
+SQL_NOT_GENERATED = "Сначала сгенерируйте SQL."
+SQL_TOO_LARGE_FOR_CLIPBOARD = (
+    "Размер скрипта — {size}, в буфер обмена можно скопировать не больше {max_size}.\n\n"
+    "Скопировать диапазон строк? Весь скрипт можно сохранить в файл кнопкой «Сохранить...»."
+)
+INVALID_LINE_RANGE = "Укажите номера первой и последней строки диапазона."
+LINE_RANGE_TOO_LARGE = "Диапазон больше {max_size}. Уменьшите количество строк."
+FORMATTING_ERRORS_SUMMARY = "Всего ошибок: {total} (показаны первые примеры по каждой колонке: {examples})\n{summary}"
+PROFILE_APPLIED = "Профиль колонок применен (сохранен {updated})"
+PROFILE_NOT_FOUND = "Профиль колонок сохранится при генерации SQL"
+PROFILE_SAVE_ERROR = "Не удалось сохранить профиль колонок:\n{error}"
+PROFILE_FORGOTTEN = "Профиль удален, типы колонок определены заново."
+DIAGNOSTICS_EMPTY = "Замеров пока нет: они появятся после загрузки файла или генерации SQL."
+DIAGNOSTICS_EXPORT_ERROR = "Не удалось сохранить диагностику:\n{error}"
+SHEET_CACHE_CLEAR = "Разобранные листы Excel хранятся в кэше ({size}), чтобы книги открывались быстрее.\nОчистить кэш?"
+SHEET_CACHE_CLEARED = "Кэш листов очищен, освобождено {size}."
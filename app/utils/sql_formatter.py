@@ -1,67 +1,380 @@
+import json
+import os
+import time
+from itertools import islice
+from typing import Iterable, Iterator, TextIO
+
 from utils import validate_keys
-from utils.errors import SQLFormatterNotFoundError
+from utils.errors import SQLFormatterNotFoundError, SQLTemplateError
+from utils.keys_validator import KeyMismatchError
+from utils.utils import user_data_path
+
+BUILTIN_SQL_TEMPLATES: list[dict[str, str | int]] = [
+    {
+        "name": "Тип 1",
+        "prefix": "TRUNCATE TABLE {table_name};\n\n",
+        "insert": "INSERT\n  INTO {table_name} (\n           {columns}\n       )\nVALUES ",
+        "column_separator": "\n         , ",
+        "row_separator": "\n     , ",
+        "suffix": ";",
+    },
+    {
+        "name": "Тип 2",
+        "prefix": "TRUNCATE TABLE {table_name};\n\n",
+        "insert": "INSERT INTO {table_name} ({columns})\nVALUES ",
+        "column_separator": ", ",
+        "row_separator": ",\n       ",
+        "suffix": ";",
+    },
+    {
+        "name": "Тип 3",
+        "prefix": "DELETE\n  FROM {table_name};\n\n",
+        "insert": "INSERT\n  INTO {table_name} (\n           {columns}\n       )\nVALUES ",
+        "column_separator": "\n         , ",
+        "row_separator": "\n     , ",
+        "suffix": ";",
+    },
+    {
+        "name": "Тип 4",
+        "prefix": "DELETE FROM {table_name};\n\n",
+        "insert": "INSERT INTO {table_name} ({columns})\nVALUES ",
+        "column_separator": ", ",
+        "row_separator": ",\n       ",
+        "suffix": ";",
+    },
+]
 
 
-class SQLFormatter:
+class RenderStats:
     """
-    Класс для форматирования SQL запросов
-    :param table_name: Название таблицы
-    :param columns: Список имен колонок
-    :param values: Список значений
+    Статистика генерации SQL: время форматирования значений отдельно от времени сборки шаблона.
     """
 
-    def __init__(self, table_name: str, columns: list[str], values: list[str]):
-        self.table_name = table_name
-        self.columns = columns
-        self.values = values
-
-    def formatter_1(self):
-        columns = "\n         , ".join(self.columns)
-        values = "\n     , ".join(self.values)
-        return (
-            f"TRUNCATE TABLE {self.table_name};\n\n"
-            f"INSERT\n  INTO {self.table_name} (\n"
-            f"           {columns}\n       )\n"
-            f"VALUES {values};"
-        )
+    def __init__(self) -> None:
+        self.rows = 0
+        self.format_seconds = 0.0
+        self.render_seconds = 0.0
 
-    def formatter_2(self):
-        columns = ", ".join(self.columns)
-        values = ",\n       ".join(self.values)
-        return (
-            f"TRUNCATE TABLE {self.table_name};\n\n"
-            f"INSERT INTO {self.table_name} ({columns})\n"
-            f"VALUES {values};"
-        )
+    def __repr__(self):
+        return (f"RenderStats(rows={self.rows}, format_seconds={self.format_seconds:.3f}, "
+                f"render_seconds={self.render_seconds:.3f})")
+
+
+class SQLTemplate:
+    """
+    Декларативное описание SQL шаблона.
 
-    def formatter_3(self):
-        columns = "\n         , ".join(self.columns)
-        values = "\n     , ".join(self.values)
-        return (
-            f"DELETE\n  FROM {self.table_name};\n\n"
-            f"INSERT\n  INTO {self.table_name} (\n"
-            f"           {columns}\n       )\n"
-            f"VALUES {values};"
+    :param name: Название шаблона (отображается в интерфейсе)
+    :param prefix: Текст перед первым INSERT (например, TRUNCATE), поддерживает {table_name}
+    :param insert: Заголовок INSERT, поддерживает {table_name} и {columns}
+    :param column_separator: Разделитель имен колонок
+    :param row_separator: Разделитель строк значений
+    :param suffix: Текст, завершающий каждый INSERT
+    :param batch_size: Максимальное количество строк в одном INSERT (0 — без ограничения)
+    :param statement_separator: Разделитель между INSERT при разбиении на пакеты
+    """
+    DEFAULTS: dict[str, str | int] = {
+        "prefix": "",
+        "suffix": ";",
+        "batch_size": 0,
+        "statement_separator": "\n\n",
+    }
+    FIELDS: tuple[str, ...] = (
+        "name", "prefix", "insert", "column_separator", "row_separator", "suffix", "batch_size",
+        "statement_separator",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        insert: str,
+        column_separator: str,
+        row_separator: str,
+        prefix: str = "",
+        suffix: str = ";",
+        batch_size: int = 0,
+        statement_separator: str = "\n\n"
+    ):
+        self.name = name
+        self.prefix = prefix
+        self.insert = insert
+        self.column_separator = column_separator
+        self.row_separator = row_separator
+        self.suffix = suffix
+        self.batch_size = batch_size
+        self.statement_separator = statement_separator
+
+    @classmethod
+    def from_dict(cls, data: dict[str, str | int]) -> "SQLTemplate":
+        """
+        Создает шаблон из словаря (например, прочитанного из JSON-файла).
+        :param data: Описание шаблона
+        :return: Экземпляр SQLTemplate
+        :raises KeyMismatchError: Если есть пропущенные или лишние ключи
+        """
+        fields = {**cls.DEFAULTS, **data}
+        validate_keys(
+            expected=set(cls.FIELDS),
+            expected_name="SQLTemplate.FIELDS",
+            actual=set(fields.keys()),
+            actual_name="template"
         )
+        return cls(**fields)
+
+    def to_dict(self) -> dict[str, str | int]:
+        """
+        Возвращает описание шаблона в виде словаря.
+        :return: Словарь с полями шаблона
+        """
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def compile(self) -> "SQLRenderer":
+        """
+        Компилирует шаблон в рендерер.
+        :return: Экземпляр SQLRenderer
+        """
+        return SQLRenderer(self)
+
+    def __repr__(self):
+        return f"SQLTemplate(name={self.name!r}, batch_size={self.batch_size})"
+
+
+class SQLRenderer:
+    """
+    Скомпилированный SQL шаблон. Собирает скрипт по частям, не держа все строки в памяти.
+    :param template: Описание шаблона
+    :raises SQLTemplateError: Если шаблон содержит неизвестные подстановки или некорректный размер пакета
+    """
+    CHUNK_ROWS = 1000
+
+    def __init__(self, template: SQLTemplate):
+        self.template = template
+        self._validate()
+        self._batch_size = template.batch_size or None
 
-    def formatter_4(self):
-        columns = ", ".join(self.columns)
-        values = ",\n       ".join(self.values)
-        return (
-            f"DELETE FROM {self.table_name};\n\n"
-            f"INSERT INTO {self.table_name} ({columns})\n"
-            f"VALUES {values};"
+    @property
+    def name(self) -> str:
+        return self.template.name
+
+    def preamble(self, table_name: str) -> str:
+        """
+        Возвращает текст, предшествующий вставке данных (TRUNCATE/DELETE).
+        :param table_name: Название таблицы
+        :return: Текст преамбулы
+        """
+        return self.template.prefix.format(table_name=table_name)
+
+    def header(self, table_name: str, columns: list[str]) -> str:
+        """
+        Возвращает заголовок INSERT с перечнем колонок.
+        :param table_name: Название таблицы
+        :param columns: Список имен колонок
+        :return: Заголовок INSERT
+        """
+        return self.template.insert.format(
+            table_name=table_name,
+            columns=self.template.column_separator.join(columns)
         )
 
+    def iter_chunks(
+        self,
+        table_name: str,
+        columns: list[str],
+        values: Iterable[str],
+        stats: RenderStats | None = None,
+        preamble: bool = True
+    ) -> Iterator[str]:
+        """
+        Генерирует SQL скрипт частями.
+        Время получения значений из `values` учитывается в `stats.format_seconds`,
+        время сборки шаблона — в `stats.render_seconds`.
+        :param table_name: Название таблицы
+        :param columns: Список имен колонок
+        :param values: Итератор строк значений вида "(val_1, val_2, ...)"
+        :param stats: Статистика для заполнения
+        :param preamble: Добавлять ли преамбулу (TRUNCATE/DELETE)
+        :return: Итератор частей SQL скрипта
+        """
+        stats = stats if stats is not None else RenderStats()
+        template = self.template
+        started = time.perf_counter()
+        header = self.header(table_name, columns)
+        preamble_text = self.preamble(table_name) if preamble else ""
+        stats.render_seconds += time.perf_counter() - started
+        if preamble_text:
+            yield preamble_text
+
+        rows_iterator = iter(values)
+        statement_rows = 0
+        statements = 0
+        while True:
+            size = self.CHUNK_ROWS
+            if self._batch_size is not None:
+                size = min(size, self._batch_size - statement_rows)
+            format_started = time.perf_counter()
+            rows = list(islice(rows_iterator, size))
+            render_started = time.perf_counter()
+            stats.format_seconds += render_started - format_started
+            if not rows:
+                break
+            parts = []
+            if statement_rows == 0:
+                if statements:
+                    parts.append(template.statement_separator)
+                parts.append(header)
+            else:
+                parts.append(template.row_separator)
+            parts.append(template.row_separator.join(rows))
+            statement_rows += len(rows)
+            stats.rows += len(rows)
+            if self._batch_size is not None and statement_rows >= self._batch_size:
+                parts.append(template.suffix)
+                statements += 1
+                statement_rows = 0
+            chunk = "".join(parts)
+            stats.render_seconds += time.perf_counter() - render_started
+            yield chunk
+
+        if statement_rows:
+            yield template.suffix
+        elif not statements:
+            yield header + template.suffix
+
+    def render(self, table_name: str, columns: list[str], values: Iterable[str],
+               stats: RenderStats | None = None) -> str:
+        """
+        Возвращает SQL скрипт целиком.
+        :param table_name: Название таблицы
+        :param columns: Список имен колонок
+        :param values: Итератор строк значений
+        :param stats: Статистика для заполнения
+        :return: SQL скрипт
+        """
+        return "".join(self.iter_chunks(table_name, columns, values, stats=stats))
+
+    def _validate(self) -> None:
+        """
+        Проверяет типы полей, подстановки шаблона и размер пакета.
+        :raises SQLTemplateError: Если шаблон некорректен
+        """
+        for field in self.template.FIELDS:
+            if field != "batch_size" and not isinstance(getattr(self.template, field), str):
+                raise SQLTemplateError(f"Поле «{field}» шаблона «{self.template.name}» должно быть строкой")
+        try:
+            self.template.prefix.format(table_name="")
+            self.template.insert.format(table_name="", columns="")
+        except (KeyError, IndexError, ValueError, AttributeError, TypeError) as e:
+            raise SQLTemplateError(f"Некорректная подстановка в шаблоне «{self.template.name}»: {e}")
+        if not isinstance(self.template.batch_size, int) or self.template.batch_size < 0:
+            raise SQLTemplateError(f"Некорректный размер пакета в шаблоне «{self.template.name}»")
+
+
+class SQLTemplateRegistry:
+    """
+    Реестр SQL шаблонов. Шаблоны компилируются один раз при первом обращении.
+    """
+    FILE_EXTENSION = ".json"
+
+    def __init__(self):
+        self._templates: dict[str, SQLTemplate] = {}
+        self._renderers: dict[str, SQLRenderer] = {}
+        self.load_errors: list[str] = []
+
+    @property
+    def names(self) -> list[str]:
+        """
+        Возвращает список названий зарегистрированных шаблонов.
+        :return: Список названий шаблонов
+        """
+        return list(self._templates.keys())
+
+    def register(self, template: SQLTemplate, replace: bool = False) -> None:
+        """
+        Регистрирует шаблон.
+        :param template: Описание шаблона
+        :param replace: Разрешить замену шаблона с тем же названием
+        :raises SQLTemplateError: Если шаблон некорректен или шаблон с таким названием уже зарегистрирован
+        """
+        template.compile()
+        if template.name in self._templates and not replace:
+            raise SQLTemplateError(f"Шаблон «{template.name}» уже зарегистрирован")
+        self._templates[template.name] = template
+        self._renderers.pop(template.name, None)
+
+    def get(self, name: str) -> SQLRenderer:
+        """
+        Возвращает скомпилированный рендерер шаблона.
+        :param name: Название шаблона
+        :return: Экземпляр SQLRenderer
+        :raises SQLFormatterNotFoundError: Если шаблон не найден
+        """
+        if name not in self._templates:
+            raise SQLFormatterNotFoundError("Тип SQL шаблона для форматирования не найден")
+        if name not in self._renderers:
+            self._renderers[name] = self._templates[name].compile()
+        return self._renderers[name]
+
+    def load_file(self, file_path: str) -> list[SQLTemplate]:
+        """
+        Загружает шаблоны из JSON-файла (объект или список объектов).
+        :param file_path: Путь к файлу
+        :return: Список загруженных шаблонов
+        :raises SQLTemplateError: Если файл не удалось прочитать или разобрать
+        """
+        try:
+            with open(file_path, encoding="utf-8") as file:
+                data = json.load(file)
+            items = data if isinstance(data, list) else [data]
+            templates = [SQLTemplate.from_dict(item) for item in items]
+        except (OSError, ValueError, TypeError, KeyMismatchError) as e:
+            raise SQLTemplateError(f"Не удалось загрузить шаблон из {file_path}: {e}")
+        for template in templates:
+            self.register(template, replace=True)
+        return templates
+
+    def load_directory(self, directory: str) -> None:
+        """
+        Загружает все JSON-шаблоны из каталога. Ошибки сохраняются в `load_errors`.
+        :param directory: Путь к каталогу
+        """
+        if not os.path.isdir(directory):
+            return
+        for file_name in sorted(os.listdir(directory)):
+            if not file_name.lower().endswith(self.FILE_EXTENSION):
+                continue
+            try:
+                self.load_file(os.path.join(directory, file_name))
+            except SQLTemplateError as e:
+                self.load_errors.append(str(e))
+
+
+def _create_default_registry() -> SQLTemplateRegistry:
+    registry = SQLTemplateRegistry()
+    for template in BUILTIN_SQL_TEMPLATES:
+        registry.register(SQLTemplate.from_dict(template))
+    registry.load_directory(user_data_path("templates"))
+    return registry
+
+
+_REGISTRY: SQLTemplateRegistry | None = None
+
+
+def get_template_registry() -> SQLTemplateRegistry:
+    """
+    Возвращает реестр шаблонов: встроенные шаблоны и пользовательские из ~/.tab2sql/templates.
+    :return: Экземпляр SQLTemplateRegistry
+    """
+    global _REGISTRY
+    if _REGISTRY is None:
+        _REGISTRY = _create_default_registry()
+    return _REGISTRY
+
 
 class SQLFormatterFactory:
     """Класс для выбора SQL шаблона для форматирования"""
-    VALID_SQL_FORMATTERS = [
-        "Тип 1",
-        "Тип 2",
-        "Тип 3",
-        "Тип 4"
-    ]
+
+    def __init__(self, registry: SQLTemplateRegistry | None = None):
+        self.registry = registry if registry is not None else get_template_registry()
 
     @property
     def types(self) -> list[str]:
@@ -69,31 +382,75 @@ class SQLFormatterFactory:
         Возвращает список возможных типов SQL шаблонов
         :return: Список возможных типов SQL шаблонов
         """
-        return self.VALID_SQL_FORMATTERS
+        return self.registry.names
 
-    def get_sql(self, table_name: str, columns: list[str], values: list[str], sql_formatter: str = 'Тип 1'):
+    def get_renderer(self, sql_formatter: str = 'Тип 1') -> SQLRenderer:
+        """
+        Возвращает скомпилированный рендерер SQL шаблона
+        :param sql_formatter: Тип SQL шаблона для форматирования
+        :return: Экземпляр SQLRenderer
+        :raises SQLFormatterNotFoundError: Если тип SQL шаблона для форматирования не найден
+        """
+        return self.registry.get(sql_formatter)
+
+    def iter_sql(
+        self,
+        table_name: str,
+        columns: list[str],
+        values: Iterable[str],
+        sql_formatter: str = 'Тип 1',
+        stats: RenderStats | None = None
+    ) -> Iterator[str]:
+        """
+        Возвращает SQL запрос частями для потоковой записи
+        :param table_name: Название таблицы
+        :param columns: Список имен колонок
+        :param values: Итератор значений
+        :param sql_formatter: Тип SQL шаблона для форматирования
+        :param stats: Статистика генерации для заполнения
+        :return: Итератор частей SQL запроса
+        :raises SQLFormatterNotFoundError: Если тип SQL шаблона для форматирования не найден
+        """
+        return self.get_renderer(sql_formatter).iter_chunks(table_name, columns, values, stats=stats)
+
+    def write_sql(
+        self,
+        stream: TextIO,
+        table_name: str,
+        columns: list[str],
+        values: Iterable[str],
+        sql_formatter: str = 'Тип 1',
+        stats: RenderStats | None = None
+    ) -> None:
+        """
+        Записывает SQL запрос в поток, не собирая его целиком в памяти
+        :param stream: Текстовый поток для записи
+        :param table_name: Название таблицы
+        :param columns: Список имен колонок
+        :param values: Итератор значений
+        :param sql_formatter: Тип SQL шаблона для форматирования
+        :param stats: Статистика генерации для заполнения
+        :raises SQLFormatterNotFoundError: Если тип SQL шаблона для форматирования не найден
+        """
+        for chunk in self.iter_sql(table_name, columns, values, sql_formatter, stats=stats):
+            stream.write(chunk)
+
+    def get_sql(
+        self,
+        table_name: str,
+        columns: list[str],
+        values: Iterable[str],
+        sql_formatter: str = 'Тип 1',
+        stats: RenderStats | None = None
+    ) -> str:
         """
         Возвращает SQL запрос на основе списка имен колонок и значений
         :param table_name: Название таблицы
         :param columns: Список имен колонок
         :param values: Список значений
         :param sql_formatter: Тип SQL шаблона для форматирования
+        :param stats: Статистика генерации для заполнения
         :return: SQL запрос
-        :raises KeyMismatchError: Если есть пропущенные или лишние ключи
-        :raises SQLFormatterNotFoundError: Если тип SQL шаблона для форматирования не найден
-        """
-        formatters = {
-            'Тип 1': SQLFormatter(table_name, columns, values).formatter_1,
-            'Тип 2': SQLFormatter(table_name, columns, values).formatter_2,
-            'Тип 3': SQLFormatter(table_name, columns, values).formatter_3,
-            'Тип 4': SQLFormatter(table_name, columns, values).formatter_4,
-        }
-        validate_keys(
-            expected=set(self.types),
-            expected_name="types",
-            actual=set(formatters.keys()),
-            actual_name="formatters"
-        )
-        if sql_formatter not in self.types:
-            raise SQLFormatterNotFoundError("Тип SQL шаблона для форматирования не найден")
-        return formatters[sql_formatter]()
+        :raises SQLFormatterNotFoundError: Если тип SQL шаблона для форматирования не найден
+        """
+        return self.get_renderer(sql_formatter).render(table_name, columns, values, stats=stats)
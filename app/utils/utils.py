@@ -1,3 +1,4 @@
+import importlib
 import os
 import sys
 
@@ -11,3 +12,40 @@ def resource_path(relative_path):
         base_path = os.path.abspath("./app/")
 
     return os.path.join(base_path, relative_path)
+
+
+def user_data_path(*parts: str) -> str:
+    """
+    Возвращает путь внутри пользовательского каталога приложения.
+    Каталог можно переопределить переменной окружения TAB2SQL_HOME.
+    :param parts: Части пути относительно каталога приложения
+    :return: Абсолютный путь
+    """
+    base_path = os.environ.get("TAB2SQL_HOME") or os.path.join(os.path.expanduser("~"), ".tab2sql")
+    return os.path.join(base_path, *parts)
+
+
+def format_bytes(size: int) -> str:
+    """
+    Возвращает размер в человекочитаемом виде.
+    :param size: Размер в байтах
+    :return: Строка вида «12.3 МБ»
+    """
+    value = float(size)
+    for unit in ("Б", "КБ", "МБ", "ГБ"):
+        if value < 1024 or unit == "ГБ":
+            return f"{value:.0f} {unit}" if unit == "Б" else f"{value:.1f} {unit}"
+        value /= 1024
+
+
+def preload_modules(module_names: tuple[str, ...] | list[str]) -> None:
+    """
+    Импортирует модули заранее (например, в фоновом потоке после показа окна).
+    Недоступные модули пропускаются: ошибка проявится при их реальном использовании.
+    :param module_names: Имена модулей
+    """
+    for module_name in module_names:
+        try:
+            importlib.import_module(module_name)
+        except ImportError:
+            pass
@@ -1,27 +1,39 @@
+import math
 import re
 from datetime import datetime
+from typing import TYPE_CHECKING, Callable
 
 from utils import validate_keys
 from utils.errors import UnknownColumnTypeError, FailedValueFormattingError
 
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
 
 class ValueFormatter:
     """
     Класс для форматирования значений.
     :param value: Входное значение для форматирования
+    :param date_format: Закрепленный формат даты, который проверяется первым
     """
+    DATE_FORMATS = (
+        '%d.%m.%Y', '%Y-%m-%d', '%d/%m/%Y', '%Y/%m/%d',
+        '%d.%m.%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y %H:%M:%S', '%Y/%m/%d %H:%M:%S'
+    )
 
-    def __init__(self, value: any) -> None:
+    def __init__(self, value: any, date_format: str | None = None) -> None:
         self.value = value
+        self.date_format = date_format
 
     def str_formatter(self) -> str:
         """
-        Форматирует значение как строку с одинарными кавычками
+        Форматирует значение как строку с одинарными кавычками (кавычки внутри строки удваиваются)
         :return: Форматированное строковое значение
         """
         if self.value == 'NULL':
             return 'NULL'
-        return f"'{str(self.value).strip()}'"
+        return self.quote(self.value)
 
     def str_r_formatter(self) -> str:
         """
@@ -34,28 +46,28 @@ class ValueFormatter:
             self.value = float(self.value)
             self.value = self._get_round_value()
         finally:
-            return f"'{str(self.value).strip()}'"
+            return self.quote(self.value)
 
     def int_formatter(self) -> str:
         """
         Преобразует значение в целое число
         :return: Форматированное целое число
         """
-        return str(int(float(self.value)))
+        return str(int(self._get_float()))
 
     def float_formatter(self) -> str:
         """
         Преобразует значение в число с плавающей точкой
         :return: Форматированное число с плавающей точкой без округления
         """
-        return str(float(self.value))
+        return str(self._get_float())
 
     def float_r_formatter(self) -> str:
         """
         Преобразует значение в число с плавающей точкой, округляя, если оканчивается на .0
         :return: Форматированное число с плавающей точкой с округлением
         """
-        self.value = float(self.value)
+        self.value = self._get_float()
         self.value = self._get_round_value()
         return str(self.value)
 
@@ -96,6 +108,27 @@ class ValueFormatter:
         elif value in false_values:
             return "FALSE"
 
+    @staticmethod
+    def quote(value: any) -> str:
+        """
+        Возвращает строковый литерал SQL: значение без пробелов по краям в одинарных кавычках,
+        кавычки внутри значения удваиваются (O'Brien -> 'O''Brien')
+        :param value: Значение
+        :return: Строковый литерал
+        """
+        return f"""'{str(value).strip().replace("'", "''")}'"""
+
+    def _get_float(self) -> float:
+        """
+        Преобразует значение в конечное число: NaN и бесконечность в SQL не вставляются
+        :return: Число с плавающей точкой
+        :raises ValueError: Если значение не число или не конечное число
+        """
+        value = float(self.value)
+        if not math.isfinite(value):
+            raise ValueError(f"Значение {value} не является конечным числом")
+        return value
+
     def _get_round_value(self) -> int | float:
         """
         Возвращает округленное значение, если значение оканчивается на .0
@@ -110,10 +143,9 @@ class ValueFormatter:
         :param output_type: Тип даты для форматирования SQL
         :return: Форматированная дата или None
         """
-        date_formats = [
-            '%d.%m.%Y', '%Y-%m-%d', '%d/%m/%Y', '%Y/%m/%d',
-            '%d.%m.%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y %H:%M:%S', '%Y/%m/%d %H:%M:%S'
-        ]
+        date_formats = self.DATE_FORMATS
+        if self.date_format:
+            date_formats = (self.date_format, *date_formats)
         for date_format in date_formats:
             try:
                 date_sting = datetime.strptime(str(self.value).strip(), date_format)
@@ -122,6 +154,163 @@ class ValueFormatter:
                 continue
 
 
+class ColumnFormatter:
+    """
+    Векторное форматирование колонки (pandas.Series) целиком для типов, у которых оно совпадает
+    с форматированием по значениям ValueFormatter. Методы возвращают форматированные значения и позиции значений,
+    которые не удалось преобразовать векторно: их нужно отформатировать через ValueFormatter
+    (он и определит, ошибка это или значение, которое понимает только float, например «1_000»).
+    Если тип данных колонки не поддерживается, методы возвращают None.
+    """
+    # Значения, которые может разобрать float: в них есть цифра (любой системы письма) или nan/inf
+    FLOAT_PATTERN = re.compile(r"\d|nan|inf", re.IGNORECASE)
+
+    @staticmethod
+    def str_formatter(series: "pd.Series") -> tuple[list[str], list[int]] | None:
+        """
+        Форматирует колонку как строковые литералы SQL (см. `ValueFormatter.quote`), значения «NULL» — как NULL
+        :param series: Значения колонки
+        :return: Форматированные значения и позиции значений для форматирования по одному (нет)
+        """
+        return ColumnFormatter._quote(series), []
+
+    @staticmethod
+    def str_r_formatter(series: "pd.Series") -> tuple[list[str], list[int]] | None:
+        """
+        Форматирует колонку как строковые литералы SQL, числа — с округлением целых значений (как FLOAT (R))
+        :param series: Значения колонки
+        :return: Форматированные значения и позиции значений для форматирования по одному
+        """
+        numbers = ColumnFormatter._to_numeric(series)
+        if numbers is None:
+            return None
+        array, failed = numbers
+        if not failed.any():
+            return [f"'{value}'" for value in ColumnFormatter._round(array)], []
+        values = ColumnFormatter._quote(series)
+        numeric = (~failed).nonzero()[0]
+        for position, value in zip(numeric.tolist(), ColumnFormatter._round(array[numeric])):
+            values[position] = f"'{value}'"
+        # Строки, которые pd.to_numeric не разобрал, но, возможно, разберет float («1_000», «inf»),
+        # форматируются по одному, остальные остаются строками
+        source = series.to_numpy()
+        positions = [
+            position for position in failed.nonzero()[0].tolist()
+            if ColumnFormatter.FLOAT_PATTERN.search(str(source[position]))
+        ]
+        return values, positions
+
+    @staticmethod
+    def int_formatter(series: "pd.Series") -> tuple[list[str], list[int]] | None:
+        """
+        Форматирует колонку как целые числа (дробная часть отбрасывается)
+        :param series: Значения колонки
+        :return: Форматированные значения и позиции значений для форматирования по одному
+        """
+        numbers = ColumnFormatter._to_numeric(series)
+        if numbers is None:
+            return None
+        array, failed = numbers
+        if array.dtype.kind in "iu":
+            return list(map(str, array.tolist())), failed.nonzero()[0].tolist()
+        array[failed] = 0
+        return list(map(str, map(int, array.tolist()))), failed.nonzero()[0].tolist()
+
+    @staticmethod
+    def float_formatter(series: "pd.Series") -> tuple[list[str], list[int]] | None:
+        """
+        Форматирует колонку как числа с плавающей точкой без округления
+        :param series: Значения колонки
+        :return: Форматированные значения и позиции значений для форматирования по одному
+        """
+        numbers = ColumnFormatter._to_numeric(series)
+        if numbers is None:
+            return None
+        array, failed = numbers
+        return list(map(str, array.astype("float64").tolist())), failed.nonzero()[0].tolist()
+
+    @staticmethod
+    def float_r_formatter(series: "pd.Series") -> tuple[list[str], list[int]] | None:
+        """
+        Форматирует колонку как числа с плавающей точкой, округляя целые значения (оканчивающиеся на .0)
+        :param series: Значения колонки
+        :return: Форматированные значения и позиции значений для форматирования по одному
+        """
+        numbers = ColumnFormatter._to_numeric(series)
+        if numbers is None:
+            return None
+        array, failed = numbers
+        array[failed] = 0
+        return ColumnFormatter._round(array), failed.nonzero()[0].tolist()
+
+    @staticmethod
+    def _round(array: "np.ndarray") -> list[str]:
+        """
+        Форматирует конечные числа, округляя целые значения (1.0 -> 1)
+        :param array: Массив чисел
+        :return: Форматированные значения
+        """
+        import numpy as np
+
+        if array.dtype.kind in "iu":
+            return list(map(str, array.tolist()))
+        integral = array == np.trunc(array)
+        if integral.all():
+            return list(map(str, map(int, array.tolist())))
+        values = list(map(str, array.tolist()))
+        positions = integral.nonzero()[0]
+        for position, value in zip(positions.tolist(), map(str, map(int, array[positions].tolist()))):
+            values[position] = value
+        return values
+
+    @staticmethod
+    def _quote(series: "pd.Series") -> list[str]:
+        """
+        Форматирует колонку как строковые литералы SQL за один проход по строкам без вызова ValueFormatter
+        для каждого значения; значения «NULL» находятся сравнением всей колонки
+        :param series: Значения колонки
+        :return: Форматированные значения
+        """
+        values = [f"""'{value.strip().replace("'", "''")}'""" for value in map(str, series.tolist())]
+        if series.dtype.kind == "O":
+            for position in (series.to_numpy() == "NULL").nonzero()[0].tolist():
+                values[position] = "NULL"
+        return values
+
+    @staticmethod
+    def _to_numeric(series: "pd.Series") -> tuple["np.ndarray", "np.ndarray"] | None:
+        """
+        Преобразует колонку в массив чисел за один проход. Целые колонки остаются целыми, логические
+        и строковые (object) преобразуются в float64. Строки разбираются тем же float, что и в ValueFormatter,
+        а pd.to_numeric только отмечает значения, которые не являются числами.
+        :param series: Значения колонки
+        :return: Массив чисел и маска значений для форматирования по одному (не числа, NaN, бесконечность)
+                 или None, если тип данных колонки не числовой и не строковый
+        """
+        import numpy as np
+        import pandas as pd
+
+        kind = series.dtype.kind
+        if kind in "iu":
+            array = series.to_numpy()
+            return array, np.zeros(len(array), dtype=bool)
+        if kind in "fb":
+            array = series.to_numpy(dtype="float64", copy=True)
+            return array, ~np.isfinite(array)
+        if kind != "O":
+            return None
+        values = series.to_numpy()
+        array = pd.to_numeric(series, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        failed = ~np.isfinite(array)
+        try:
+            # pd.to_numeric округляет длинные десятичные строки иначе, чем float, поэтому значения
+            # разбираются заново: astype вызывает float для каждого значения
+            array[~failed] = values[~failed].astype("float64")
+        except (ValueError, TypeError):
+            return None
+        return array, failed
+
+
 class ValueFormatterFactory:
     """
     Фабрика для получения функции форматирования по типу колонки.
@@ -137,6 +326,27 @@ class ValueFormatterFactory:
         "func": "FUNCTION",
         "bool": "BOOLEAN",
     }
+    # Методы ValueFormatter по типам колонок
+    FORMATTER_METHODS: dict[str, str] = {
+        "str": "str_formatter",
+        "str_r": "str_r_formatter",
+        "int": "int_formatter",
+        "float": "float_formatter",
+        "float_r": "float_r_formatter",
+        "date": "date_formatter",
+        "timestamp": "timestamp_formatter",
+        "func": "func_formatter",
+        "bool": "bool_formatter",
+    }
+
+    # Методы ColumnFormatter по типам колонок (для остальных типов векторного форматирования нет)
+    COLUMN_FORMATTER_METHODS: dict[str, str] = {
+        "str": "str_formatter",
+        "str_r": "str_r_formatter",
+        "int": "int_formatter",
+        "float": "float_formatter",
+        "float_r": "float_r_formatter",
+    }
 
     @property
     def types(self) -> dict[str, str]:
@@ -146,37 +356,74 @@ class ValueFormatterFactory:
         """
         return self.VALID_FORMATTER_TYPES
 
-    def get_value(self, column_type: str, input_value: any) -> str:
+    @staticmethod
+    def detect_date_format(values: list[any]) -> str | None:
         """
-        Возвращает функцию форматирования значения по типу колонки
+        Определяет формат даты, которому соответствуют все значения выборки
+        :param values: Выборка значений колонки (без пустых)
+        :return: Формат даты или None, если общего формата нет
+        """
+        for date_format in ValueFormatter.DATE_FORMATS:
+            try:
+                for value in values:
+                    datetime.strptime(str(value).strip(), date_format)
+            except ValueError:
+                continue
+            return date_format if values else None
+        return None
+
+    def get_formatter(self, column_type: str, date_format: str | None = None) -> Callable[[any], str]:
+        """
+        Возвращает функцию форматирования значений колонки. Тип проверяется один раз,
+        поэтому функцию можно вызывать для каждого значения колонки без повторного поиска.
         :param column_type: Тип в котором нужно произвести форматирование
-        :param input_value: Входное значение для форматирования
-        :return: Отформатированное значение в виде строки
+        :param date_format: Закрепленный формат даты (для типов date и timestamp)
+        :return: Функция, которая возвращает отформатированное значение в виде строки
+                 (если значение не удалось преобразовать — FailedValueFormattingError, ValueError или TypeError)
         :raises KeyMismatchError: Если колонка не соответствует списку возможных типов
         :raises UnknownColumnTypeError: Если передан неизвестный тип колонки
-        :raises FailedValueFormattingError: Если не удалось преобразовать значение
         """
-        formatters = {
-            "str": ValueFormatter(input_value).str_formatter,
-            "str_r": ValueFormatter(input_value).str_r_formatter,
-            "int": ValueFormatter(input_value).int_formatter,
-            "float": ValueFormatter(input_value).float_formatter,
-            "float_r": ValueFormatter(input_value).float_r_formatter,
-            "date": ValueFormatter(input_value).date_formatter,
-            "timestamp": ValueFormatter(input_value).timestamp_formatter,
-            "func": ValueFormatter(input_value).func_formatter,
-            "bool": ValueFormatter(input_value).bool_formatter,
-        }
         validate_keys(
             expected=set(self.types.keys()),
             expected_name="types",
-            actual=set(formatters.keys()),
+            actual=set(self.FORMATTER_METHODS.keys()),
             actual_name="formatters"
         )
         type_ = column_type.lower()
-        if type_ not in formatters:
-            raise UnknownColumnTypeError(f"Неизвестный тип колонки: {column_type}")
-        returned_value = formatters[type_]()
-        if returned_value is None:
-            raise FailedValueFormattingError()
-        return formatters[type_]()
+        if type_ not in self.FORMATTER_METHODS:
+            raise UnknownColumnTypeError(f"Неизвестный тип колонки: {column_type}")
+        method = getattr(ValueFormatter, self.FORMATTER_METHODS[type_])
+
+        def formatter(value: any) -> str:
+            # ValueFormatter изменяет self.value, поэтому для каждого значения нужен новый объект
+            returned_value = method(ValueFormatter(value, date_format))
+            if returned_value is None:
+                raise FailedValueFormattingError()
+            return returned_value
+
+        return formatter
+
+    def get_column_formatter(
+        self,
+        column_type: str
+    ) -> Callable[["pd.Series"], tuple[list[str], list[int]] | None] | None:
+        """
+        Возвращает функцию векторного форматирования колонки целиком (см. ColumnFormatter)
+        :param column_type: Тип в котором нужно произвести форматирование
+        :return: Функция или None, если для типа нет векторного форматирования
+        """
+        method = self.COLUMN_FORMATTER_METHODS.get(column_type.lower())
+        return getattr(ColumnFormatter, method) if method is not None else None
+
+    def get_value(self, column_type: str, input_value: any, date_format: str | None = None) -> str:
+        """
+        Форматирует значение по типу колонки
+        :param column_type: Тип в котором нужно произвести форматирование
+        :param input_value: Входное значение для форматирования
+        :param date_format: Закрепленный формат даты (для типов date и timestamp)
+        :return: Отформатированное значение в виде строки
+        :raises KeyMismatchError: Если колонка не соответствует списку возможных типов
+        :raises UnknownColumnTypeError: Если передан неизвестный тип колонки
+        :raises FailedValueFormattingError: Если не удалось преобразовать значение
+        """
+        return self.get_formatter(column_type, date_format)(input_value)
@@ -108,6 +108,46 @@ class WidgetBuilder:
         cb.pack(**pack_options)
         return cb
 
+    @staticmethod
+    def spinbox(
+        parent: Frame,
+        from_: int,
+        to: int,
+        pack_options: dict[str, Any] | None = None,
+        **widget_options: Any
+    ) -> ttk.Spinbox:
+        """Создает `ttk.Spinbox` с заданными настройками.
+        :param parent: Родительский виджет
+        :param from_: Минимальное значение
+        :param to: Максимальное значение
+        :param pack_options: Настройки для упаковки
+        :param widget_options: Настройки для виджета
+        :return: Созданный виджет
+        """
+        if pack_options is None:
+            pack_options = {}
+        sb = ttk.Spinbox(parent, from_=from_, to=to, **widget_options)
+        sb.pack(**pack_options)
+        return sb
+
+    @staticmethod
+    def progressbar(
+        parent: Frame,
+        pack_options: dict[str, Any] | None = None,
+        **widget_options: Any
+    ) -> ttk.Progressbar:
+        """Создает `ttk.Progressbar` с заданными настройками.
+        :param parent: Родительский виджет
+        :param pack_options: Настройки для упаковки
+        :param widget_options: Настройки для виджета
+        :return: Созданный виджет
+        """
+        if pack_options is None:
+            pack_options = {}
+        pb = ttk.Progressbar(parent, **widget_options)
+        pb.pack(**pack_options)
+        return pb
+
     @staticmethod
     def checkbutton(
         parent: Frame,
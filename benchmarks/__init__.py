@@ -0,0 +1,16 @@
+"""
+Бенчмарки конвейера Tab2SQL: детерминированные синтетические CSV/XLSX, замеры по этапам
+(загрузка, определение типов, форматирование значений, шаблон), пропускная способность,
+пиковая память и сравнение с сохраненным базовым результатом.
+
+Запуск из корня репозитория:
+    python -m benchmarks --suite quick
+    python -m benchmarks --suite full --repeat 3 --output results.json
+    python -m benchmarks --suite quick --save-baseline
+"""
+import os
+import sys
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import APP_DIR
+from benchmarks.cases import SUITES, get_cases
+from benchmarks.compare import compare
+from benchmarks.generators import DatasetSpec, write_dataset
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, "baseline.json")
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "tab2sql_benchmarks")
+
+
+def run_in_process(spec: DatasetSpec, file_path: str, sql_formatter: str, trace_memory: bool = False) -> dict:
+    """
+    Выполняет кейс в отдельном процессе интерпретатора.
+    """
+    process = subprocess.run(
+        [sys.executable, "-m", "benchmarks.worker", json.dumps(spec.to_dict()), file_path, sql_formatter]
+        + (["memory"] if trace_memory else []),
+        cwd=os.path.dirname(BENCHMARKS_DIR),
+        capture_output=True,
+        text=True
+    )
+    if process.returncode != 0:
+        sys.stderr.write(process.stderr)
+        raise SystemExit(f"Кейс {spec.name} завершился с ошибкой")
+    return json.loads(process.stdout)
+
+
+def merge_repeats(runs: list[dict]) -> dict:
+    """
+    Объединяет повторы кейса: для каждого этапа берется самый быстрый прогон, для памяти — наибольший пик.
+    """
+    result = dict(runs[0])
+    result["stages"] = {
+        stage: min((run["stages"][stage] for run in runs), key=lambda values: values["seconds"])
+        for stage in runs[0]["stages"]
+    }
+    result["total_seconds"] = sum(values["seconds"] for values in result["stages"].values())
+    peaks = [run["peak_rss_bytes"] for run in runs if run["peak_rss_bytes"] is not None]
+    result["peak_rss_bytes"] = max(peaks) if peaks else None
+    result["repeats"] = len(runs)
+    return result
+
+
+def merge_memory(result: dict, memory_run: dict) -> None:
+    """
+    Добавляет в результат память этапов из отдельного прогона с tracemalloc
+    (tracemalloc замедляет выполнение, поэтому время берется из обычных прогонов).
+    """
+    for stage, values in memory_run["stages"].items():
+        result["stages"][stage] = {
+            **result["stages"][stage],
+            "peak_bytes": values["peak_bytes"],
+            "retained_bytes": values["retained_bytes"],
+        }
+    result["memory_usage"] = memory_run["memory_usage"]
+
+
+def print_case(name: str, result: dict) -> None:
+    peak = result["peak_rss_bytes"]
+    print(f"{name}: {result['rows']} × {result['columns']}, {result['total_seconds']:.2f} с"
+          + (f", пик памяти {peak / 1024 / 1024:.0f} МБ" if peak else ""))
+    for stage, values in result["stages"].items():
+        line = f"  {stage:<10} {values['seconds']:8.3f} с"
+        if values["rows_per_second"]:
+            line += f"  {values['rows_per_second']:12,.0f} строк/с"
+        if values.get("mb_per_second"):
+            line += f"  {values['mb_per_second']:8.1f} МБ/с"
+        if "peak_bytes" in values:
+            line += (f"  пик {values['peak_bytes'] / 1024 / 1024:8.1f} МБ"
+                     f"  остается {values['retained_bytes'] / 1024 / 1024:8.1f} МБ")
+        print(line)
+    if "memory_usage" in result:
+        usage = sorted(result["memory_usage"].items(), key=lambda item: -item[1])
+        print("  DataFrame: " + ", ".join(f"{column} {size / 1024 / 1024:.1f} МБ" for column, size in usage[:5])
+              + (f" и еще {len(usage) - 5}" if len(usage) > 5 else ""))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Бенчмарки конвейера Tab2SQL")
+    parser.add_argument("--suite", choices=SUITES, default="quick", help="Набор кейсов (по умолчанию quick)")
+    parser.add_argument("--case", action="append", default=[], help="Выполнить только указанные кейсы")
+    parser.add_argument("--repeat", type=int, default=1, help="Количество повторов каждого кейса")
+    parser.add_argument("-t", "--template", default="Тип 1", help="SQL шаблон")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Каталог для синтетических файлов")
+    parser.add_argument("-o", "--output", help="Файл для результатов JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Файл базового результата")
+    parser.add_argument("--save-baseline", action="store_true", help="Сохранить результаты как базовые")
+    parser.add_argument("--threshold", type=float, default=0.3,
+                        help="Допустимое замедление этапа относительно базового результата (0.3 — 30%%)")
+    parser.add_argument("--memory-threshold", type=float, default=0.2, help="Допустимый рост пиковой памяти")
+    parser.add_argument("--memory", action="store_true",
+                        help="Дополнительно замерить память этапов (отдельный прогон с tracemalloc)")
+    args = parser.parse_args()
+
+    cases = [spec for spec in get_cases(args.suite) if not args.case or spec.name in args.case]
+    if not cases:
+        parser.error("нет кейсов с такими именами")
+
+    results = {
+        "version": 1,
+        "suite": args.suite,
+        "template": args.template,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "app_dir": APP_DIR,
+        "cases": {},
+    }
+    for spec in cases:
+        file_path = write_dataset(spec, args.data_dir)
+        runs = [run_in_process(spec, file_path, args.template) for _ in range(max(1, args.repeat))]
+        results["cases"][spec.name] = merge_repeats(runs)
+        if args.memory:
+            merge_memory(results["cases"][spec.name], run_in_process(spec, file_path, args.template, trace_memory=True))
+        print_case(spec.name, results["cases"][spec.name])
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+        print(f"Базовый результат сохранен: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("Базовый результат не найден, сравнение пропущено (создайте его с --save-baseline)")
+        return 0
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    regressions = compare(results, baseline, args.threshold, args.memory_threshold)
+    if regressions:
+        print(f"Ухудшения относительно {args.baseline}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"Ухудшений относительно базового результата нет (порог {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+from benchmarks.generators import ColumnSpec, DatasetSpec
+
+
+def _mixed_columns(null_density: float = 0.05) -> list[ColumnSpec]:
+    return [
+        ColumnSpec("int", null_density),
+        ColumnSpec("float", null_density),
+        ColumnSpec("str", null_density),
+        ColumnSpec("str", null_density),
+        ColumnSpec("date", null_density),
+        ColumnSpec("timestamp", null_density),
+        ColumnSpec("bool", null_density),
+        ColumnSpec("float", null_density),
+    ]
+
+
+def get_cases(suite: str) -> list[DatasetSpec]:
+    """
+    Возвращает кейсы набора. В «quick» те же формы данных, что и в «full», но меньше строк.
+    :param suite: Имя набора ("quick" или "full")
+    :return: Описания наборов данных
+    """
+    scale = {"quick": 1, "full": 10}[suite]
+    date_formats = ("%d.%m.%Y", "%Y-%m-%d", "%d/%m/%Y", "%Y/%m/%d")
+    return [
+        # Высокая таблица смешанных типов
+        DatasetSpec("tall_mixed", rows=20_000 * scale, columns=_mixed_columns()),
+        # Широкая таблица: сотни колонок, мало строк
+        DatasetSpec("wide", rows=500 * scale, columns=[ColumnSpec(kind) for kind in ("int", "float", "str") * 70]),
+        # Половина значений пустые
+        DatasetSpec("null_heavy", rows=20_000 * scale, columns=_mixed_columns(null_density=0.5)),
+        # Даты во всех поддерживаемых форматах: чем дальше формат в списке, тем дольше разбор
+        DatasetSpec(
+            "date_formats",
+            rows=10_000 * scale,
+            columns=[ColumnSpec("date", date_format=date_format) for date_format in date_formats]
+        ),
+        # Те же смешанные данные в xlsx
+        DatasetSpec("xlsx_mixed", rows=5_000 * scale, columns=_mixed_columns(), file_format="xlsx"),
+    ]
+
+
+SUITES = ("quick", "full")
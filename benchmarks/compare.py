@@ -0,0 +1,62 @@
+class Regression:
+    """
+    Ухудшение показателя относительно базового результата.
+    :param case: Имя кейса
+    :param metric: Показатель (этап или память)
+    :param baseline: Базовое значение
+    :param current: Текущее значение
+    """
+
+    def __init__(self, case: str, metric: str, baseline: float, current: float):
+        self.case = case
+        self.metric = metric
+        self.baseline = baseline
+        self.current = current
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+    def __str__(self):
+        return f"{self.case}.{self.metric}: {self.baseline:.4g} → {self.current:.4g} (×{self.ratio:.2f})"
+
+
+def compare(
+    results: dict,
+    baseline: dict,
+    threshold: float = 0.3,
+    memory_threshold: float = 0.2,
+    min_seconds: float = 0.05,
+    min_bytes: int = 1024 * 1024
+) -> list[Regression]:
+    """
+    Сравнивает время этапов и пиковую память (процесса и этапов, если замерялась) с базовым результатом.
+    Кейсы, которых нет в базовом результате, этапы быстрее `min_seconds` (шум таймера)
+    и рост пика памяти этапа меньше `min_bytes` не сравниваются.
+    :param results: Текущие результаты
+    :param baseline: Базовые результаты
+    :param threshold: Допустимое относительное замедление этапа (0.3 — на 30%)
+    :param memory_threshold: Допустимый относительный рост пиковой памяти
+    :param min_seconds: Минимальная абсолютная разница времени, которая считается замедлением
+    :param min_bytes: Минимальный абсолютный рост пика памяти этапа, который считается ухудшением
+    :return: Список ухудшений
+    """
+    regressions = []
+    for name, case in results["cases"].items():
+        base_case = baseline.get("cases", {}).get(name)
+        if base_case is None or base_case.get("spec") != case.get("spec"):
+            continue
+        for stage, values in case["stages"].items():
+            base_stage = base_case["stages"].get(stage)
+            if base_stage is None:
+                continue
+            current, base = values["seconds"], base_stage["seconds"]
+            if current > base * (1 + threshold) and current - base > min_seconds:
+                regressions.append(Regression(name, f"{stage}.seconds", base, current))
+            current, base = values.get("peak_bytes"), base_stage.get("peak_bytes")
+            if current and base and current > base * (1 + memory_threshold) and current - base > min_bytes:
+                regressions.append(Regression(name, f"{stage}.peak_bytes", base, current))
+        current, base = case.get("peak_rss_bytes"), base_case.get("peak_rss_bytes")
+        if current and base and current > base * (1 + memory_threshold):
+            regressions.append(Regression(name, "peak_rss_bytes", base, current))
+    return regressions
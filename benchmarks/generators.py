@@ -0,0 +1,170 @@
+import csv
+import hashlib
+import json
+import os
+import random
+import string
+from datetime import datetime, timedelta
+
+# Тип форматирования Tab2SQL, который назначается колонке каждого вида в бенчмарке
+KIND_TYPES: dict[str, str] = {
+    "int": "int",
+    "float": "float_r",
+    "str": "str",
+    "date": "date",
+    "timestamp": "timestamp",
+    "bool": "bool",
+}
+BOOL_VALUES = ("true", "false", "да", "нет", "1", "0")
+NAMES_WITH_QUOTES = ("O'Brien", "D'Artagnan", "L'Oréal")
+START_DATE = datetime(2000, 1, 1)
+
+
+class ColumnSpec:
+    """
+    Описание синтетической колонки.
+    :param kind: Вид значений (int, float, str, date, timestamp, bool)
+    :param null_density: Доля пустых значений от 0 до 1
+    :param date_format: Формат дат (для date и timestamp)
+    """
+
+    def __init__(self, kind: str, null_density: float = 0.0, date_format: str | None = None):
+        if kind not in KIND_TYPES:
+            raise ValueError(f"Неизвестный вид колонки: {kind}")
+        self.kind = kind
+        self.null_density = null_density
+        self.date_format = date_format or ("%d.%m.%Y %H:%M:%S" if kind == "timestamp" else "%d.%m.%Y")
+
+    def to_dict(self) -> dict:
+        return {"kind": self.kind, "null_density": self.null_density, "date_format": self.date_format}
+
+
+class DatasetSpec:
+    """
+    Описание синтетического набора данных. Одинаковое описание всегда дает одинаковый файл.
+    :param name: Имя набора (имя кейса бенчмарка)
+    :param rows: Количество строк
+    :param columns: Колонки
+    :param file_format: Формат файла ("csv" или "xlsx")
+    :param delimiter: Разделитель CSV
+    :param seed: Зерно генератора случайных чисел
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rows: int,
+        columns: list[ColumnSpec],
+        file_format: str = "csv",
+        delimiter: str = ";",
+        seed: int = 0
+    ):
+        self.name = name
+        self.rows = rows
+        self.columns = columns
+        self.file_format = file_format
+        self.delimiter = delimiter
+        self.seed = seed
+
+    @property
+    def column_names(self) -> list[str]:
+        return [f"{column.kind}_{index}" for index, column in enumerate(self.columns)]
+
+    @property
+    def column_types(self) -> list[str]:
+        return [KIND_TYPES[column.kind] for column in self.columns]
+
+    @property
+    def load_options(self) -> dict:
+        return {"delimiter": self.delimiter, "header": True} if self.file_format == "csv" else {}
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Возвращает хеш описания: файл пересоздается, если описание набора изменилось.
+        """
+        return hashlib.sha1(json.dumps(self.to_dict(), sort_keys=True).encode("utf-8")).hexdigest()[:10]
+
+    def get_file_name(self) -> str:
+        return f"{self.name}_{self.rows}x{len(self.columns)}_{self.fingerprint}.{self.file_format}"
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "rows": self.rows,
+            "columns": [column.to_dict() for column in self.columns],
+            "file_format": self.file_format,
+            "delimiter": self.delimiter,
+            "seed": self.seed,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DatasetSpec":
+        return cls(
+            name=data["name"],
+            rows=data["rows"],
+            columns=[ColumnSpec(**column) for column in data["columns"]],
+            file_format=data["file_format"],
+            delimiter=data["delimiter"],
+            seed=data["seed"]
+        )
+
+
+def generate_value(column: ColumnSpec, rng: random.Random):
+    """
+    Возвращает одно значение колонки (None — пустое значение).
+    """
+    if column.null_density and rng.random() < column.null_density:
+        return None
+    if column.kind == "int":
+        return rng.randint(-1_000_000, 1_000_000)
+    if column.kind == "float":
+        # Каждое десятое значение целое, чтобы проверялось округление FLOAT (R)
+        return float(rng.randint(-1000, 1000)) if rng.random() < 0.1 else round(rng.uniform(-1e5, 1e5), 4)
+    if column.kind == "str":
+        if rng.random() < 0.01:
+            return rng.choice(NAMES_WITH_QUOTES)
+        return "".join(rng.choices(string.ascii_letters + " ", k=rng.randint(3, 20))).strip() or "x"
+    if column.kind in ("date", "timestamp"):
+        value = START_DATE + timedelta(days=rng.randint(0, 9000), seconds=rng.randint(0, 86399))
+        return value.strftime(column.date_format)
+    return rng.choice(BOOL_VALUES)
+
+
+def iter_rows(spec: DatasetSpec):
+    rng = random.Random(spec.seed)
+    for _ in range(spec.rows):
+        yield [generate_value(column, rng) for column in spec.columns]
+
+
+def write_dataset(spec: DatasetSpec, directory: str) -> str:
+    """
+    Создает файл набора данных, если его еще нет.
+    :param spec: Описание набора
+    :param directory: Каталог для файлов
+    :return: Путь к файлу
+    """
+    os.makedirs(directory, exist_ok=True)
+    file_path = os.path.join(directory, spec.get_file_name())
+    if os.path.exists(file_path):
+        return file_path
+    temp_path = f"{file_path}.part"
+    if spec.file_format == "csv":
+        with open(temp_path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file, delimiter=spec.delimiter)
+            writer.writerow(spec.column_names)
+            for row in iter_rows(spec):
+                writer.writerow(["" if value is None else value for value in row])
+    elif spec.file_format == "xlsx":
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(spec.name[:31])
+        sheet.append(spec.column_names)
+        for row in iter_rows(spec):
+            sheet.append(row)
+        workbook.save(temp_path)
+    else:
+        raise ValueError(f"Неизвестный формат файла: {spec.file_format}")
+    os.replace(temp_path, file_path)
+    return file_path
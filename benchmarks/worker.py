@@ -0,0 +1,114 @@
+"""
+Выполняет один кейс бенчмарка в отдельном процессе (чтобы пиковая память относилась только к нему)
+и печатает результат в stdout в формате JSON:
+    python -m benchmarks.worker '<описание набора JSON>' <путь к файлу> <SQL шаблон> [memory]
+С аргументом memory для этапов замеряется память через tracemalloc (время при этом не показательно).
+"""
+import json
+import os
+import sys
+
+# Импорт пакета benchmarks добавляет каталог app в sys.path
+from benchmarks.generators import DatasetSpec
+
+
+class CountingSink:
+    """
+    Поток с методом `write`, который только считает байты SQL скрипта.
+    """
+
+    def __init__(self):
+        self.size_bytes = 0
+
+    def write(self, text: str) -> int:
+        self.size_bytes += len(text.encode("utf-8"))
+        return len(text)
+
+
+def get_peak_rss_bytes() -> int | None:
+    """
+    Возвращает пиковый размер резидентной памяти процесса (None, если недоступно, например в Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux возвращает килобайты, macOS — байты
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def get_stage(span, rows: int) -> dict:
+    stage = {"seconds": span.seconds, "rows_per_second": rows / span.seconds if span.seconds else None}
+    if span.size_bytes is not None:
+        stage["bytes"] = span.size_bytes
+        stage["mb_per_second"] = span.size_bytes / 1024 / 1024 / span.seconds if span.seconds else None
+    if span.peak_bytes is not None:
+        stage["peak_bytes"] = span.peak_bytes
+        stage["retained_bytes"] = span.retained_bytes
+    return stage
+
+
+def run_case(spec: DatasetSpec, file_path: str, sql_formatter: str, trace_memory: bool = False) -> dict:
+    """
+    Прогоняет набор данных через конвейер и замеряет каждый этап отдельно.
+    Значения форматируются в список до шаблона, чтобы время и память форматирования и шаблона разделялись.
+    :param spec: Описание набора
+    :param file_path: Путь к файлу набора
+    :param sql_formatter: Тип SQL шаблона
+    :param trace_memory: Замерять пик и остаток памяти этапов и размер колонок DataFrame
+    :return: Результат кейса
+    """
+    from services.data_processing import DataProcessing
+    from services.load_data import DataLoaderFactory
+    from utils import SQLFormatterFactory
+    from utils.diagnostics import Diagnostics
+    from utils.logger import ErrorCollector
+
+    diagnostics = Diagnostics(spec.name, trace_memory=trace_memory)
+    input_bytes = os.path.getsize(file_path)
+    with diagnostics.span("load", size_bytes=input_bytes):
+        df, table_name = DataLoaderFactory().load_data(file_path=file_path, **spec.load_options)
+    diagnostics.record_memory_usage("load", df)
+
+    with diagnostics.span("inference"):
+        dp = DataProcessing(df, str(table_name).lower())
+        for column, column_type in zip(dp.table.columns, spec.column_types):
+            column.new_type = column_type
+
+    errors = ErrorCollector()
+    with diagnostics.span("format") as span:
+        values = list(dp.iter_values(errors))
+        span.size_bytes = sum(len(value) for value in values)
+
+    sink = CountingSink()
+    with diagnostics.span("render") as span:
+        SQLFormatterFactory().write_sql(sink, dp.table.name, dp.valid_columns, iter(values), sql_formatter)
+        span.size_bytes = sink.size_bytes
+
+    rows = len(df)
+    result = {
+        "spec": spec.to_dict(),
+        "rows": rows,
+        "columns": len(spec.columns),
+        "input_bytes": input_bytes,
+        "output_bytes": sink.size_bytes,
+        "errors": errors.total,
+        "stages": {span.name: get_stage(span, rows) for span in diagnostics.spans},
+        "total_seconds": diagnostics.total_seconds,
+        "peak_rss_bytes": get_peak_rss_bytes(),
+    }
+    if trace_memory:
+        result["memory_usage"] = diagnostics.memory_usage["load"]
+    return result
+
+
+def main() -> int:
+    spec = DatasetSpec.from_dict(json.loads(sys.argv[1]))
+    result = run_case(spec, sys.argv[2], sys.argv[3], trace_memory=sys.argv[4:] == ["memory"])
+    sys.stdout.write(json.dumps(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Проверка бюджета времени запуска: импортирует модуль окна приложения в отдельном процессе
+с `python -X importtime`, разбирает отчет и завершается с кодом 1, если суммарное время
+импорта превышает бюджет или при запуске загружаются тяжелые модули (pandas, openpyxl).
+
+Запуск из корня репозитория:
+    python scripts/check_import_time.py
+    python scripts/check_import_time.py --budget-ms 150 --module gui.main_window
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+FORBIDDEN_MODULES = ("pandas", "openpyxl", "numpy")
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def measure(module: str) -> list[tuple[str, int, int, int]]:
+    """
+    Импортирует модуль в отдельном процессе и возвращает отчет `-X importtime`.
+    :param module: Имя модуля
+    :return: Список (модуль, собственное время в мкс, накопленное время в мкс, отступ в отчете);
+             у модулей верхнего уровня отступ равен 1
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True
+    )
+    if process.returncode != 0:
+        sys.stderr.write(process.stderr)
+        raise SystemExit(f"Не удалось импортировать {module}")
+    records = []
+    for line in process.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            records.append((name, int(self_us), int(cumulative_us), len(indent)))
+    return records
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Проверка бюджета времени импорта при запуске")
+    parser.add_argument("--module", default="gui.main_window", help="Модуль, импортируемый при запуске")
+    parser.add_argument("--budget-ms", type=float, default=200.0, help="Бюджет суммарного времени импорта, мс")
+    parser.add_argument("--top", type=int, default=10, help="Сколько самых медленных модулей показать")
+    args = parser.parse_args()
+
+    records = measure(args.module)
+    # Накопленное время модулей верхнего уровня не пересекается, их сумма — общее время импорта
+    total_ms = sum(cumulative for _, _, cumulative, level in records if level == 1) / 1000
+    loaded = {name.split(".")[0] for name, *_ in records}
+    forbidden = [name for name in FORBIDDEN_MODULES if name in loaded]
+
+    print(f"{args.module}: {total_ms:.1f} мс (бюджет {args.budget_ms:.0f} мс), модулей: {len(records)}")
+    for name, self_us, cumulative_us, _ in sorted(records, key=lambda record: -record[1])[:args.top]:
+        print(f"  {self_us / 1000:8.1f} мс  {cumulative_us / 1000:8.1f} мс  {name}")
+
+    failed = False
+    if forbidden:
+        print(f"Ошибка: при запуске загружаются {', '.join(forbidden)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"Ошибка: время импорта превышает бюджет на {total_ms - args.budget_ms:.1f} мс")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())